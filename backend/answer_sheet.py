@@ -0,0 +1,79 @@
+from typing import Iterable, Optional
+
+import numpy as np
+
+# Cevap kodları: 0 = boş, 1..5 = A..E. Anahtarda tanınmayan harfler 255 alır (hiçbir
+# öğrenci cevabıyla eşleşmez).
+SECENEKLER = ('A', 'B', 'C', 'D', 'E')
+BOS = 'BOŞ'
+BOS_KODU = 0
+BILINMEYEN_KODU = 255
+
+_HARFLER = (BOS,) + SECENEKLER
+_KODLAR = {harf: kod for kod, harf in enumerate(_HARFLER)}
+
+
+def kodla(harf: Optional[str]) -> int:
+    if harf is None:
+        return BOS_KODU
+    return _KODLAR.get(harf, BILINMEYEN_KODU)
+
+
+def kodlari_coz(kodlar: Iterable[int]) -> list:
+    return [_HARFLER[k] if k < len(_HARFLER) else '?' for k in kodlar]
+
+
+# Bir formun (ya da bir dersin) okunan cevapları: soru sırasıyla uint8 cevap kodları ve
+# paralel float32 okuma güvenleri. Okuma hattında ve puanlamada sözlük yerine bu taşınır;
+# harflere sadece kayıt satırlarında (scoring.soru_detaylari) kodlari_coz ile çevrilir.
+# Soru numaraları 1'den başlar.
+class CevapDizisi:
+    __slots__ = ('kodlar', 'guvenler')
+
+    def __init__(self, kodlar: np.ndarray, guvenler: Optional[np.ndarray] = None):
+        self.kodlar = np.asarray(kodlar, dtype=np.uint8)
+        self.guvenler = (np.zeros(len(self.kodlar), dtype=np.float32) if guvenler is None
+                         else np.asarray(guvenler, dtype=np.float32))
+
+    # Hiç okunamamış bölüm: tüm sorular boş, güven 0
+    @classmethod
+    def bos(cls, soru_sayisi: int) -> 'CevapDizisi':
+        return cls(np.zeros(soru_sayisi, dtype=np.uint8))
+
+    # Seçim indekslerinden (0..4, işaretsiz -1) - secim_kararlari çıktısı
+    @classmethod
+    def secimlerden(cls, secimler: np.ndarray, guvenler: Optional[np.ndarray] = None) -> 'CevapDizisi':
+        return cls(np.asarray(secimler) + 1, guvenler)
+
+    # Dersleri soru sırasıyla tek diziye ekler
+    @classmethod
+    def birlestir(cls, parcalar: Iterable['CevapDizisi']) -> 'CevapDizisi':
+        parcalar = list(parcalar)
+        if not parcalar:
+            return cls.bos(0)
+        return cls(np.concatenate([p.kodlar for p in parcalar]),
+                   np.concatenate([p.guvenler for p in parcalar]))
+
+    def __len__(self) -> int:
+        return len(self.kodlar)
+
+    def __getstate__(self):
+        return self.kodlar, self.guvenler
+
+    def __setstate__(self, durum):
+        self.kodlar, self.guvenler = durum
+
+    def harf(self, soru_no: int) -> str:
+        if 1 <= soru_no <= len(self.kodlar):
+            return _HARFLER[self.kodlar[soru_no - 1]]
+        return BOS
+
+    def isaretli_sayisi(self) -> int:
+        return int(np.count_nonzero(self.kodlar))
+
+    def bos_sayisi(self) -> int:
+        return len(self.kodlar) - self.isaretli_sayisi()
+
+    # Formun güveni = en belirsiz sorunun güveni
+    def guven(self) -> float:
+        return float(self.guvenler.min()) if len(self.guvenler) else 0.0
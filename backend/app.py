@@ -1,15 +1,28 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 import jwt
 import os
-import cv2
 from datetime import datetime, timedelta
 from werkzeug.utils import secure_filename
-import traceback
+import logging
+import json
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from database import Database
 from form_templates import list_templates, get_template
-from image_processor import OptikFormOkuyucu
+from image_processor import OptikFormOkuyucu, ISLEME_PROFILLERI
+from strategy_stats import StratejiIstatistikleri
+from scoring import anahtar_derle, basari_yuzdeleri, ders_ozeti, puanla, soru_detaylari, toplam_puanlar
+from station_cache import IstasyonOnbellegi
+from debug_sink import DebugKaydedici
+from log_config import logging_ayarla
+from jobs import IsKuyrugu, KuyrukDolu
+from previews import ONIZLEME_BOYUTLARI, onizleme_al, onizleme_ozeti, onizlemeleri_uret
+
+logging_ayarla()
+logger = logging.getLogger('omr.api')
 
 app = Flask(__name__)
 CORS(app)
@@ -17,16 +30,133 @@ CORS(app)
 app.config['SECRET_KEY'] = 'optic-form-secret-key-2024'
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+# Toplu yükleme: istek sınırı sadece o uçta yükseltilir; tek görüntü sınırı her dosyaya,
+# açılmış bayt bütçesi ZIP'ten çıkanlar dahil tüm görüntülere uygulanır
+app.config['MAX_FILE_SIZE'] = 16 * 1024 * 1024
+app.config['MAX_BULK_REQUEST_SIZE'] = int(os.environ.get('MAX_BULK_REQUEST_MB', '256')) * 1024 * 1024
+app.config['MAX_BULK_BYTES'] = int(os.environ.get('MAX_BULK_MB', '256')) * 1024 * 1024
+app.config['MAX_BULK_FILES'] = int(os.environ.get('MAX_BULK_FILES', '200'))
 
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 db = Database()
-form_okuyucu = OptikFormOkuyucu(debug_mode=True)
+# Debug görüntüleri örneklenir: DEBUG_SAMPLING = hepsi | her_n | basarisiz | dusuk_guven.
+# Varsayılan dusuk_guven: sadece başarısız ya da güveni düşük okumalar diske yazılır.
+debug_kaydedici = DebugKaydedici(
+    os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'debug_images')),
+    politika=os.environ.get('DEBUG_SAMPLING', 'dusuk_guven'),
+    her_n=int(os.environ.get('DEBUG_SAMPLE_EVERY', '10'))
+)
+# Tespit yarışı isteğe bağlıdır: DETECTION_RACE=1. Varsayılan sıralı denemede stratejiler
+# öğrenilen başarı/süre sırasıyla (StratejiIstatistikleri) denenir. Yarışta hepsi aynı anda
+# koşar ve skoru en yüksek dörtgen kazanır; öğrenilen sıra sadece eşit skorda ve CPU dolu
+# olduğu için yarışa girilmediğinde etkilidir.
+form_okuyucu = OptikFormOkuyucu(debug_mode=True,
+                                yaris_modu=os.environ.get('DETECTION_RACE', '0') == '1',
+                                strateji_istatistikleri=StratejiIstatistikleri(db),
+                                debug_kaydedici=debug_kaydedici,
+                                istasyon_onbellegi=IstasyonOnbellegi())
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# İzin verilen biçimlerin (JPEG, PNG) dosya imzaları
+IMAGE_SIGNATURES = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n')
+
+def has_image_signature(data):
+    return data.startswith(IMAGE_SIGNATURES)
+
+# Toplu yükleme sınırı aşıldı: (mesaj, HTTP durum kodu)
+class BulkLimitExceeded(Exception):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+# Toplu yüklemenin görüntüleri: [(dosya adı, bayt | None, hata | None)], yükleme sırasıyla.
+# ZIP arşivleri açılır (klasörler, gizli dosyalar ve görüntü olmayan girdiler atlanır);
+# tek görüntü sınırını aşan, geçersiz ya da uzantısı tutup içeriği JPEG/PNG olmayan dosyalar
+# hata ile döner (diske hiç yazılmaz), diğerlerinin okunmasını engellemez. Form sayısı ya da açılmış bayt bütçesi aşılırsa açma hemen durur
+# (BulkLimitExceeded). Boyutlar girdi başlığından değil, gerçekten açılan baytlardan ölçülür.
+def collect_bulk_images(files):
+    images = []
+    max_size = app.config['MAX_FILE_SIZE']
+    max_files = app.config['MAX_BULK_FILES']
+    budget = app.config['MAX_BULK_BYTES']
+    
+    def add(name, stream):
+        nonlocal budget
+        if len(images) >= max_files:
+            raise BulkLimitExceeded(f"En fazla {max_files} form yüklenebilir", 400)
+        # En fazla sınırın bir bayt fazlası okunur: sınırı aşan girdi tamamen açılmaz
+        data = stream.read(min(max_size, budget) + 1)
+        if len(data) > budget:
+            raise BulkLimitExceeded('Toplu yükleme boyut sınırı aşıldı', 413)
+        budget -= len(data)
+        if len(data) > max_size:
+            images.append((name, None, 'Dosya çok büyük'))
+        elif not has_image_signature(data):
+            images.append((name, None, 'Geçersiz görüntü dosyası'))
+        else:
+            images.append((name, data, None))
+    
+    for file in files:
+        if not file or not file.filename:
+            continue
+        
+        if file.filename.lower().endswith('.zip'):
+            try:
+                with zipfile.ZipFile(file.stream) as archive:
+                    for info in archive.infolist():
+                        name = os.path.basename(info.filename)
+                        if info.is_dir() or not name or name.startswith('.') or \
+                                info.filename.startswith('__MACOSX/') or not allowed_file(name):
+                            continue
+                        with archive.open(info) as entry:
+                            add(name, entry)
+            except zipfile.BadZipFile:
+                images.append((file.filename, None, 'Geçersiz ZIP arşivi'))
+        elif not allowed_file(file.filename):
+            images.append((file.filename, None, 'Geçersiz dosya formatı (Sadece jpg, jpeg, png, zip)'))
+        else:
+            add(file.filename, file.stream)
+    
+    return images
+
+# Yüklenen orijinallerin diske yazımı ve önizlemelerinin üretimi istek yolunda beklenmez
+upload_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix='upload-save')
+
+def _write_upload(data, filepath):
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(data)
+        logger.debug("Dosya kaydedildi: %s", filepath)
+    except OSError as e:
+        logger.error("Dosya kaydedilemedi: %s - %s", filepath, e)
+        raise
+    
+    # Üretilemezse ilk görüntülemede tekrar denenir
+    try:
+        onizlemeleri_uret(filepath, data)
+    except Exception as e:
+        logger.warning("Önizlemeler üretilemedi: %s - %s", filepath, e)
+
+def save_upload_async(data, filepath):
+    return upload_writer.submit(_write_upload, data, filepath)
+
+# Asenkron okuma işleri (async=1): sınırlı kuyruk, sabit sayıda işçi
+job_queue = IsKuyrugu(
+    isci_sayisi=int(os.environ.get('JOB_WORKERS', '2')),
+    max_bekleyen=int(os.environ.get('JOB_QUEUE_SIZE', '32'))
+)
+
+# Toplu yüklemede formlar bu havuzda paralel okunur (iş kuyruğundan bağımsız)
+bulk_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('BULK_WORKERS', '2')),
+                                   thread_name_prefix='bulk-read')
+
+# SSE akışında olay yokken keep-alive aralığı (saniye)
+SSE_KEEPALIVE_SECONDS = 15
+
 def generate_token(user_id):
     payload = {
         'user_id': user_id,
@@ -146,16 +276,18 @@ def create_answer_key():
         existing_key = db.get_answer_key_by_name(user_id, exam_name)
         
         if existing_key:
-            # Mevcut cevap anahtarını güncelle
-            success = db.update_answer_key(
+            # Mevcut cevap anahtarını güncelle - kayıtlı sonuçlar aynı işlemde yeniden puanlanır
+            regraded = db.update_answer_key(
                 existing_key['id'], user_id, school_type, subjects, form_template
             )
             
-            if success:
+            if regraded is not None:
                 return jsonify({
                     'success': True,
                     'answer_key_id': existing_key['id'],
                     'updated': True,
+                    'regraded_results': regraded[0],
+                    'changed_results': regraded[1],
                     'message': f'"{exam_name}" cevap anahtarı güncellendi'
                 }), 200
             else:
@@ -177,10 +309,37 @@ def create_answer_key():
                 return jsonify({'error': 'Cevap anahtarı oluşturulamadı'}), 500
             
     except Exception as e:
-        print(f"Error: {e}")
-        traceback.print_exc()
+        logger.exception("Cevap anahtarı kaydetme hatası: %s", e)
         return jsonify({'error': str(e)}), 500
 
+# Anahtarın kayıtlı tüm sonuçlarını kayıtlı öğrenci cevaplarından yeniden puanlar
+@app.route('/answer-keys/<int:answer_key_id>/regrade', methods=['POST'])
+def regrade_answer_key(answer_key_id):
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
+    
+    try:
+        answer_key = db.get_answer_key_details(answer_key_id)
+        if not answer_key or answer_key['user_id'] != user_id:
+            return jsonify({'error': 'Cevap anahtarı bulunamadı'}), 404
+        
+        regraded = db.regrade_answer_key(answer_key_id)
+        if regraded is None:
+            return jsonify({'error': 'Sonuçlar yeniden puanlanamadı'}), 500
+        
+        return jsonify({
+            'success': True,
+            'answer_key_id': answer_key_id,
+            'regraded_results': regraded[0],
+            'changed_results': regraded[1]
+        }), 200
+        
+    except Exception as e:
+        logger.exception("Yeniden puanlama hatası: %s", e)
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/form-templates', methods=['GET'])
 def get_form_templates():
     try:
@@ -232,14 +391,14 @@ def get_answer_key_by_name(exam_name):
 
 @app.route('/read-optic-form', methods=['POST'])
 def read_optic_form():
-    print("\n📥 Form okuma isteği alındı...")
+    logger.debug("Form okuma isteği alındı...")
     
     user_id = get_current_user()
     if not user_id:
-        print("❌ Yetkisiz erişim")
+        logger.warning("Yetkisiz erişim")
         return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    print(f"✅ Kullanıcı ID: {user_id}")
+    logger.debug("Kullanıcı ID: %s", user_id)
     
     try:
         # Dosya kontrolü
@@ -253,152 +412,366 @@ def read_optic_form():
         if not allowed_file(file.filename):
             return jsonify({'error': 'Geçersiz dosya formatı (Sadece jpg, jpeg, png)'}), 400
         
-        print(f"📄 Dosya: {file.filename}")
+        logger.debug("Dosya: %s", file.filename)
         
         # Cevap anahtarı ID'si
         answer_key_id = request.form.get('answer_key_id')
         if not answer_key_id:
             return jsonify({'error': 'Cevap anahtarı ID gerekli'}), 400
         
-        print(f"🔑 Cevap anahtarı ID: {answer_key_id}")
+        logger.debug("Cevap anahtarı ID: %s", answer_key_id)
         
-        # Dosyayı kaydet
-        filename = secure_filename(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        print(f"💾 Dosya kaydedildi: {filepath}")
+        # İşleme profili (fast / balanced / thorough) - verilmezse okuyucunun varsayılanı
+        profile = request.form.get('profile') or None
+        if profile and profile not in ISLEME_PROFILLERI:
+            return jsonify({'error': f"Geçersiz profil (Seçenekler: {', '.join(ISLEME_PROFILLERI)})"}), 400
         
         # Cevap anahtarını al
         answer_key = db.get_answer_key_details(int(answer_key_id))
         if not answer_key:
             return jsonify({'error': 'Cevap anahtarı bulunamadı'}), 404
         
-        print(f"📋 Cevap anahtarı: {answer_key.get('exam_name')}")
+        logger.debug("Cevap anahtarı: %s", answer_key.get('exam_name'))
         
-        #  GÖRÜNTÜ İŞLEME - Optik formu oku
-        print("\n Görüntü işleme başlıyor...")
-        okuma_sonucu = form_okuyucu.form_oku(filepath)
+        # Görüntü bellekte çözülür; orijinal dosya okuma sürerken arka planda kaydedilir
+        image_bytes = file.read()
+        filename = secure_filename(f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}")
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        save_upload_async(image_bytes, filepath)
         
-        if not okuma_sonucu['success']:
-            return jsonify({
-                'error': okuma_sonucu.get('error', 'Form okunamadı')
-            }), 400
-        
-        # Öğrenci bilgileri
-        student_info = okuma_sonucu['student_info']
-        student_answers = okuma_sonucu['answers']
-        
-        print(f" Öğrenci: {student_info.get('name', '')} {student_info.get('surname', '')}")
-        print(f" Okunan cevap sayısı: {len(student_answers)}")
-        
-        # CEVAPLARI KARŞILAŞTIR
-        print("\n Cevaplar karşılaştırılıyor...")
-        karsilastirma = compare_answers(answer_key, student_answers)
-        
-        print(f" Doğru: {karsilastirma['correct_count']}")
-        print(f" Yanlış: {karsilastirma['total_questions'] - karsilastirma['correct_count'] - sum(1 for a in student_answers.values() if a == 'BOŞ')}")
-        print(f" Boş: {sum(1 for a in student_answers.values() if a == 'BOŞ')}")
-        print(f" Başarı: %{karsilastirma['success_rate']}")
-        
-        # SONUÇLARI KAYDET
-        student_name = student_info.get('name', '')
-        student_surname = student_info.get('surname', '')
-        full_name = f"{student_name} {student_surname}".strip() or 'Bilinmiyor'
-        
-        student_data = {
-            'name': full_name,
-            'number': student_info.get('student_number', 'Bilinmiyor'),
-            'total_score': karsilastirma['total_score'],
-            'success_rate': karsilastirma['success_rate']
-        }
-        
-        print(f" Sonuçlar veritabanına kaydediliyor...")
-        result_id = db.save_student_result(
-            int(answer_key_id),
-            student_data,
-            karsilastirma['detailed_answers'],
-            filepath
-        )
-        print(f" Kaydedildi (ID: {result_id})")
-        
-        # Yanıt
-        response = {
-            'success': True,
-            'result_id': result_id,
-            'student_name': full_name,
-            'student_number': student_data['number'],
-            'total_score': karsilastirma['total_score'],
-            'success_rate': karsilastirma['success_rate'],
-            'subject_scores': karsilastirma['subject_scores'],
-            'details': f"{karsilastirma['correct_count']}/{karsilastirma['total_questions']} doğru"
-        }
-        
-        print(f"\n İşlem tamamlandı!\n")
-        return jsonify(response)
+        # Strateji sıralaması cihaza göre öğrenilir; cihaz bilgisi yoksa kullanıcı bazında
+        device = request.headers.get('X-Device-Id') or f"user-{user_id}"
+        # İstasyon modu (isteğe bağlı): sabit kameralı istasyonda son kağıt dörtgeni yeniden kullanılır
+        station_id = request.form.get('station_id') or request.headers.get('X-Station-Id')
+        station = f"user-{user_id}:{station_id}" if station_id else None
+        # İsteğe bağlı: aşama süreleri ve kazanan tespit stratejisi (timings=1)
+        include_timings = request.form.get('timings') == '1' or request.args.get('timings') == '1'
+        
+        # Kuyrukta çalışırken ilerleme olayları işe yazılır ve iş iptal edilebilir
+        def grade(job=None):
+            return grade_form(answer_key, image_bytes, filename, filepath, profile, device, station,
+                              include_timings,
+                              progress=job.ilerleme if job else None,
+                              cancelled=(lambda: job.iptal_istendi) if job else None)
+        
+        # Akış modu (stream=1): iş kuyruğa alınır ve aşama olayları bu yanıtta SSE olarak akar;
+        # istemci bağlantıyı keserse kalan okuma iptal edilir
+        if request.form.get('stream') == '1' or request.args.get('stream') == '1':
+            try:
+                job = job_queue.gonder(grade, sahip=user_id)
+            except KuyrukDolu:
+                return jsonify({'error': 'Sunucu meşgul, lütfen tekrar deneyin'}), 503
+            return job_event_stream(job, cancel_on_disconnect=True)
+        
+        # Asenkron mod (async=1): iş kuyruğa alınır, sonuç GET /jobs/<id> ile sorgulanır
+        if request.form.get('async') == '1' or request.args.get('async') == '1':
+            try:
+                job = job_queue.gonder(grade, sahip=user_id)
+            except KuyrukDolu:
+                return jsonify({'error': 'Sunucu meşgul, lütfen tekrar deneyin'}), 503
+            logger.debug("Form okuma işi kuyruğa alındı: %s", job.id)
+            status_url = f"/jobs/{job.id}"
+            return jsonify({'success': True, 'job_id': job.id, 'status': job.durum,
+                            'status_url': status_url}), 202, {'Location': status_url}
+        
+        body, status = grade()
+        return jsonify(body), status
         
     except Exception as e:
-        print(f"\n HATA: {e}")
-        traceback.print_exc()
+        logger.exception("Form okuma isteği hatası: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
-def compare_answers(answer_key, student_answers):
-    total_score = 0
-    correct_count = 0
-    total_questions = 0
-    subject_scores = {}
-    detailed_answers = []
+# Okuma, puanlama ve kayıt: (yanıt gövdesi, HTTP durum kodu). İstek iş parçacığında ya da
+# iş kuyruğunda çalışır; request nesnesine erişmez. progress(stage, **data) aşama olaylarını
+# alır; cancelled() True dönerse okuma kesilir (OkumaIptalEdildi) ve sonuç kaydedilmez.
+def grade_form(answer_key, image_bytes, filename, filepath, profile=None, device=None, station=None,
+               include_timings=False, progress=None, cancelled=None):
+    #  GÖRÜNTÜ İŞLEME - Optik formu oku
+    logger.debug("Görüntü işleme başlıyor...")
+    baglam = form_okuyucu.baglam_olustur(profile, device, station, ilerleme=progress, iptal=cancelled)
+    okuma_sonucu = form_okuyucu.form_oku_bytes(image_bytes, profile, device, baglam=baglam, ad=filename,
+                                               istasyon=station)
     
-    question_counter = 1
+    if not okuma_sonucu['success']:
+        return {'error': okuma_sonucu.get('error', 'Form okunamadı')}, 400
     
-    for subject in answer_key['subjects']:
-        subject_id = subject['id']
-        subject_name = subject['subject_name']
-        correct_answers = subject['answers']
-        points = subject['points']
-        
-        subject_score = 0
-        subject_correct = 0
-        
-        for i, correct_answer in enumerate(correct_answers):
-            student_answer = student_answers.get(question_counter, 'BOŞ')
-            
-            is_correct = (student_answer == correct_answer)
-            points_earned = points[i] if is_correct else 0
-            
-            if is_correct:
-                correct_count += 1
-                subject_correct += 1
-                subject_score += points_earned
-                total_score += points_earned
+    # Öğrenci bilgileri
+    student_info = okuma_sonucu['student_info']
+    # Okuyucu cevapları kodlu dizi (CevapDizisi) olarak döner
+    student_answers = okuma_sonucu['answers']
+    
+    logger.debug("Öğrenci: %s %s", student_info.get('name', ''), student_info.get('surname', ''))
+    logger.debug("Okunan cevap sayısı: %s", len(student_answers))
+    
+    # CEVAPLARI KARŞILAŞTIR
+    logger.debug("Cevaplar karşılaştırılıyor...")
+    karsilastirma = compare_answers(answer_key, student_answers)
+    
+    logger.debug("Doğru: %s, Yanlış: %s, Boş: %s, Başarı: %%%s", karsilastirma['correct_count'],
+                 karsilastirma['wrong_count'], karsilastirma['blank_count'], karsilastirma['success_rate'])
+    
+    # İptal kayıttan önce son kez kontrol edilir; kayıttan sonra okuma kesilmez
+    baglam.bildir('scored', total_score=karsilastirma['total_score'],
+                  success_rate=karsilastirma['success_rate'])
+    
+    # SONUÇLARI KAYDET
+    student_name = student_info.get('name', '')
+    student_surname = student_info.get('surname', '')
+    full_name = f"{student_name} {student_surname}".strip() or 'Bilinmiyor'
+    
+    student_data = {
+        'name': full_name,
+        'number': student_info.get('student_number', 'Bilinmiyor'),
+        'total_score': karsilastirma['total_score'],
+        'success_rate': karsilastirma['success_rate']
+    }
+    
+    logger.debug("Sonuçlar veritabanına kaydediliyor...")
+    result_id = db.save_student_result(
+        int(answer_key['id']),
+        student_data,
+        karsilastirma['detailed_answers'],
+        filepath
+    )
+    logger.debug("Kaydedildi (ID: %s)", result_id)
+    if progress:
+        progress('saved', result_id=result_id)
+    
+    # Yanıt
+    response = {
+        'success': True,
+        'result_id': result_id,
+        'student_name': full_name,
+        'student_number': student_data['number'],
+        'total_score': karsilastirma['total_score'],
+        'success_rate': karsilastirma['success_rate'],
+        'subject_scores': karsilastirma['subject_scores'],
+        'details': f"{karsilastirma['correct_count']}/{karsilastirma['total_questions']} doğru"
+    }
+    
+    if include_timings:
+        response['timings'] = okuma_sonucu.get('timings')
+        response['strategy'] = okuma_sonucu.get('strategy')
+    
+    logger.debug("İşlem tamamlandı!")
+    return response, 200
+
+
+# Toplu okuma: çok sayıda görüntü ve/veya ZIP arşivi tek cevap anahtarıyla okunur. Formlar
+# paralel işlenir; her form bitince bir NDJSON satırı yazılır, son satır özettir.
+@app.route('/read-optic-form/bulk', methods=['POST'])
+def read_optic_form_bulk():
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
+    
+    # Genel 16 MB istek sınırı bu uçta yükseltilir; gövde aşağıda ilk form erişiminde ayrıştırılır
+    request.max_content_length = app.config['MAX_BULK_REQUEST_SIZE']
+    
+    answer_key_id = request.form.get('answer_key_id')
+    if not answer_key_id:
+        return jsonify({'error': 'Cevap anahtarı ID gerekli'}), 400
+    
+    profile = request.form.get('profile') or None
+    if profile and profile not in ISLEME_PROFILLERI:
+        return jsonify({'error': f"Geçersiz profil (Seçenekler: {', '.join(ISLEME_PROFILLERI)})"}), 400
+    
+    answer_key = db.get_answer_key_details(int(answer_key_id))
+    if not answer_key:
+        return jsonify({'error': 'Cevap anahtarı bulunamadı'}), 404
+    
+    # Dosyalar 'files' (çoklu) ya da 'file' alanlarından alınır
+    try:
+        images = collect_bulk_images(request.files.getlist('files') + request.files.getlist('file'))
+    except BulkLimitExceeded as e:
+        return jsonify({'error': str(e)}), e.status
+    if not images:
+        return jsonify({'error': 'Dosya bulunamadı'}), 400
+    
+    device = request.headers.get('X-Device-Id') or f"user-{user_id}"
+    station_id = request.form.get('station_id') or request.headers.get('X-Station-Id')
+    station = f"user-{user_id}:{station_id}" if station_id else None
+    include_timings = request.form.get('timings') == '1' or request.args.get('timings') == '1'
+    
+    logger.debug("Toplu okuma: %d dosya, cevap anahtarı %s", len(images), answer_key_id)
+    
+    # Okumalar yanıt akışı başlamadan kuyruğa alınır; request nesnesine sonra erişilmez
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    started = time.perf_counter()
+    
+    def grade_one(filename, filepath, image_bytes):
+        try:
+            return grade_form(answer_key, image_bytes, filename, filepath, profile, device, station,
+                              include_timings)
+        except Exception as e:
+            logger.exception("Toplu okuma hatası (%s): %s", filename, e)
+            return {'error': str(e)}, 500
+    
+    futures = {}
+    rejected = []
+    for index, (name, image_bytes, error) in enumerate(images):
+        if error:
+            rejected.append((index, name, {'error': error}, 400))
+            continue
+        filename = secure_filename(f"{timestamp}_{index:03d}_{name}")
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        save_upload_async(image_bytes, filepath)
+        futures[bulk_executor.submit(grade_one, filename, filepath, image_bytes)] = (index, name)
+    
+    def line(index, name, body, status):
+        return json.dumps({'index': index, 'filename': name, 'http_status': status,
+                           'success': status == 200, **body}, ensure_ascii=False) + '\n'
+    
+    def generate():
+        scores = []
+        try:
+            for index, name, body, status in rejected:
+                yield line(index, name, body, status)
             
-            detailed_answers.append({
-                'subject_id': subject_id,
-                'question_number': question_counter,
-                'student_answer': student_answer,
-                'correct_answer': correct_answer,
-                'is_correct': is_correct,
-                'points_earned': points_earned
-            })
+            for future in as_completed(futures):
+                index, name = futures[future]
+                body, status = future.result()
+                if status == 200:
+                    scores.append(body['total_score'])
+                yield line(index, name, body, status)
             
-            question_counter += 1
-            total_questions += 1
-        
-        subject_scores[subject_name] = {
-            'score': subject_score,
-            'correct': subject_correct,
-            'total': len(correct_answers)
-        }
+            yield json.dumps({
+                'summary': True,
+                'total': len(images),
+                'succeeded': len(scores),
+                'failed': len(images) - len(scores),
+                'average_score': round(sum(scores) / len(scores), 2) if scores else None,
+                'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+            }, ensure_ascii=False) + '\n'
+        finally:
+            # İstemci bağlantıyı kestiyse henüz başlamamış okumalar iptal edilir
+            cancelled = sum(future.cancel() for future in futures)
+            if cancelled:
+                logger.info("Toplu okuma yarıda kaldı: %d form iptal edildi", cancelled)
+    
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# Asenkron okuma işinin durumu ve bitince sonucu
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
     
-    success_rate = (correct_count / total_questions * 100) if total_questions > 0 else 0
+    job = job_queue.al(job_id)
+    if not job or job.sahip != user_id:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    
+    return jsonify(job.ozet())
+
+
+# İşi iptal eder: bekleyen iş hiç çalışmaz, çalışan okuma bir sonraki aşama sınırında kesilir
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
+    
+    job = job_queue.al(job_id)
+    if not job or job.sahip != user_id:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    
+    if not job.tamamlandi:
+        job.iptal_et()
+    return jsonify(job.ozet())
+
+
+# İşin aşama olayları (SSE). cancel_on_disconnect=1 verilirse bağlantı kopunca iş iptal edilir.
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def get_job_events(job_id):
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
+    
+    job = job_queue.al(job_id)
+    if not job or job.sahip != user_id:
+        return jsonify({'error': 'İş bulunamadı'}), 404
+    
+    return job_event_stream(job, cancel_on_disconnect=request.args.get('cancel_on_disconnect') == '1')
+
+
+def sse_message(event, data, event_id=None):
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Olaylar 'progress' mesajları olarak akar (id = olay sırası; yeniden bağlanan istemci
+# Last-Event-ID ile kaldığı yerden devam eder). stage 'retry' okumanın tam çözünürlükle
+# tekrarlandığını bildirir; ilerleme sıfırlanır, aşamalar baştan gelir. Son mesajın adı işin durumudur (done / failed /
+# cancelled) ve GET /jobs/<id> gövdesini taşır. Olay yokken gönderilen keep-alive satırları
+# kopan bağlantının fark edilmesini sağlar: yazma hatası üreteci kapatır.
+def job_event_stream(job, cancel_on_disconnect=False):
+    try:
+        sent = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        sent = 0
+    
+    def generate():
+        nonlocal sent
+        finished = False
+        try:
+            yield sse_message('queued', {'job_id': job.id, 'status_url': f"/jobs/{job.id}"})
+            while True:
+                events = job.olaylari_bekle(sent, SSE_KEEPALIVE_SECONDS)
+                for event in events:
+                    yield sse_message('progress', event, sent)
+                    sent += 1
+                if job.tamamlandi and sent >= len(job.olaylar):
+                    break
+                if not events:
+                    yield ': keep-alive\n\n'
+            finished = True
+            yield sse_message(job.durum, job.ozet())
+        finally:
+            if not finished and cancel_on_disconnect and not job.tamamlandi:
+                logger.info("İstemci bağlantıyı kesti, iş iptal ediliyor: %s", job.id)
+                job.iptal_et()
+    
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+# İş kuyruğu derinliği, çalışan işler ve son işlerin bekleme/çalışma süreleri
+@app.route('/jobs/stats', methods=['GET'])
+def get_job_stats():
+    user_id = get_current_user()
+    if not user_id:
+        return jsonify({'error': 'Yetkisiz erişim'}), 401
+    
+    stats = job_queue.istatistikler()
+    # İstasyon modu: istasyon başına önbellekteki kağıt dörtgeninin isabet/ıska sayıları
+    stats['station_cache'] = form_okuyucu.istasyon_onbellegi.istatistikler()
+    return jsonify(stats)
+
+
+# Okunan cevapları (CevapDizisi) anahtara göre puanlar; hesaplama scoring modülünde dizilerle yapılır
+def compare_answers(answer_key, student_answers):
+    anahtar = anahtar_derle(answer_key)
+    sonuc = puanla(student_answers, anahtar)
+    
+    correct_count = int(sonuc['dogru'].sum())
+    total_questions = anahtar.soru_sayisi
+    success_rate = float(basari_yuzdeleri(sonuc, anahtar)[0])
     
     return {
-        'total_score': round(total_score, 2),
+        'total_score': round(float(toplam_puanlar(sonuc)[0]), 2),
         'correct_count': correct_count,
+        'wrong_count': int(sonuc['yanlis'].sum()),
+        'blank_count': int(sonuc['bos'].sum()),
+        'net': round(float(sonuc['net'].sum()), 2),
         'total_questions': total_questions,
         'success_rate': round(success_rate, 2),
-        'subject_scores': subject_scores,
-        'detailed_answers': detailed_answers
+        'subject_scores': ders_ozeti(anahtar, sonuc),
+        'detailed_answers': soru_detaylari(anahtar, sonuc)
     }
 
 @app.route('/results/<int:answer_key_id>', methods=['GET'])
@@ -425,6 +798,24 @@ def get_all_results():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Kayıttaki görüntü yolu backend klasörüne görelidir
+def resolve_image_path(image_path):
+    if not os.path.isabs(image_path):
+        image_path = os.path.join(os.path.dirname(__file__), image_path)
+    return image_path
+
+# Önizlemenin içerik özetiyle sürümlenmiş adresi; içerik değişirse adres de değişir.
+# Önizleme üretilemiyorsa None.
+def student_image_url(result_id, image_path, size):
+    preview_path = onizleme_al(image_path, size)
+    if not preview_path:
+        return None
+    return f"/student-image/{result_id}?size={size}&v={onizleme_ozeti(preview_path)}"
+
+# Sonuç detayı. Görüntü yanıta gömülmez: image_url (1200 px) ve thumbnail_url (600 px)
+# sürümlü adreslerdir, istemci görüntüyü ayrıca ve önbelleğe alarak çeker. Eski istemciler
+# için include_image=1 ile 600 px önizleme image_base64 olarak eklenir. Yanıt ETag taşır;
+# sonuç değişmediyse koşullu istek 304 alır.
 @app.route('/student-result/<int:result_id>', methods=['GET'])
 def get_student_result_detail(result_id):
     import base64
@@ -432,7 +823,7 @@ def get_student_result_detail(result_id):
     # Auth kontrol
     user_id = get_current_user()
     if not user_id:
-        print(f" Auth başarısız, user_id: {user_id}")
+        logger.warning("Auth başarısız, user_id: %s", user_id)
         
     
     try:
@@ -440,58 +831,51 @@ def get_student_result_detail(result_id):
         if result:
             
             image_path = result.get('image_path')
-            print(f" Result ID: {result_id}, Image path: {image_path}")
+            logger.debug("Result ID: %s, Image path: %s", result_id, image_path)
             
+            result['image_url'] = None
+            result['thumbnail_url'] = None
             if image_path:
-                if not os.path.isabs(image_path):
-                    image_path = os.path.join(os.path.dirname(__file__), image_path)
-                
-                print(f" Checking image at: {image_path}")
-                print(f" File exists: {os.path.exists(image_path)}")
+                image_path = resolve_image_path(image_path)
                 
                 if os.path.exists(image_path):
                     try:
-                        img = cv2.imread(image_path)
-                        if img is not None:
-                            max_size = 600
-                            h, w = img.shape[:2]
-                            print(f" Original size: {w}x{h}")
-                            
-                            if max(h, w) > max_size:
-                                scale = max_size / max(h, w)
-                                new_w = int(w * scale)
-                                new_h = int(h * scale)
-                                img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-                                print(f" Resized to: {new_w}x{new_h}")
-                            
-                            # JPEG olarak encode et - daha düşük kalite (50%)
-                            _, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 50])
-                            img_base64 = base64.b64encode(buffer).decode('utf-8')
+                        # Önizlemeler yüklemede üretilir; eski yüklemeler için burada bir kez
+                        result['image_url'] = student_image_url(result_id, image_path, 1200)
+                        result['thumbnail_url'] = student_image_url(result_id, image_path, 600)
+                        
+                        if request.args.get('include_image') == '1' and result['thumbnail_url']:
+                            with open(onizleme_al(image_path, 600), 'rb') as f:
+                                img_base64 = base64.b64encode(f.read()).decode('utf-8')
                             result['image_base64'] = img_base64
-                            print(f" Görsel base64 oluşturuldu: {len(img_base64) / 1024:.1f} KB")
-                        else:
-                            print(f" cv2.imread başarısız: {image_path}")
+                            logger.debug("Görsel base64 oluşturuldu: %.1f KB", len(img_base64) / 1024)
                     except Exception as e:
-                        print(f" Görsel base64 hatası: {e}")
-                        traceback.print_exc()
+                        logger.exception("Görsel önizleme hatası: %s", e)
                 else:
-                    print(f" Dosya bulunamadı: {image_path}")
+                    logger.warning("Dosya bulunamadı: %s", image_path)
             else:
-                print(f" Image path None")
+                logger.debug("Image path None")
             
-            return jsonify({'success': True, 'result': result})
+            response = jsonify({'success': True, 'result': result})
+            response.add_etag()
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
         else:
             return jsonify({'error': 'Sonuç bulunamadı'}), 404
     except Exception as e:
-        print(f"API hatası: {e}")
-        traceback.print_exc()
+        logger.exception("API hatası: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
+# Sonuç görüntüsünün önizlemesi (size=600 | 1200, varsayılan 1200). ETag içerik özetidir.
+# Sürümlü adres (v = güncel özet) bir yıl, değişmez olarak önbelleğe alınabilir; sürümsüz
+# istekte istemci her seferinde doğrular ve içerik değişmediyse 304 alır.
 @app.route('/student-image/<int:result_id>', methods=['GET'])
 def get_student_image(result_id):
-    from flask import send_file
-    from io import BytesIO
+    size = request.args.get('size', 1200, type=int)
+    if size not in ONIZLEME_BOYUTLARI:
+        return jsonify({'error': f"Geçersiz boyut (Seçenekler: {', '.join(map(str, ONIZLEME_BOYUTLARI))})"}), 400
     
     try:
         # Sonuç bilgisini al
@@ -502,35 +886,29 @@ def get_student_image(result_id):
         conn.close()
         
         if row and row['image_path']:
-            image_path = row['image_path']
-            # Tam yol oluştur
-            if not os.path.isabs(image_path):
-                image_path = os.path.join(os.path.dirname(__file__), image_path)
+            image_path = resolve_image_path(row['image_path'])
             
             if os.path.exists(image_path):
-                # Görseli küçült ve sıkıştır
-                img = cv2.imread(image_path)
-                if img is not None:
-                    # Maksimum boyut 1200px
-                    max_size = 1200
-                    h, w = img.shape[:2]
-                    if max(h, w) > max_size:
-                        scale = max_size / max(h, w)
-                        new_w = int(w * scale)
-                        new_h = int(h * scale)
-                        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_AREA)
-                    
-                    # JPEG olarak sıkıştır (kalite %80)
-                    _, buffer = cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 80])
-                    img_io = BytesIO(buffer.tobytes())
-                    img_io.seek(0)
-                    return send_file(img_io, mimetype='image/jpeg')
-                else:
-                    return send_file(image_path, mimetype='image/jpeg')
+                preview_path = onizleme_al(image_path, size)
+                # Önizleme üretilemiyorsa orijinal gönderilir
+                if not preview_path:
+                    return send_file(os.path.abspath(image_path), mimetype='image/jpeg')
+                
+                digest = onizleme_ozeti(preview_path)
+                versioned = request.args.get('v') == digest
+                # max_age verilmezse send_file no-cache ekler (her seferinde doğrulama)
+                response = send_file(os.path.abspath(preview_path), mimetype='image/jpeg',
+                                     conditional=True, etag=digest,
+                                     max_age=365 * 24 * 3600 if versioned else None)
+                response.cache_control.public = False
+                response.cache_control.private = True
+                if versioned:
+                    response.cache_control.immutable = True
+                return response
         
         return jsonify({'error': 'Görsel bulunamadı'}), 404
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("Görsel gönderme hatası: %s", e)
         return jsonify({'error': str(e)}), 500
 
 @app.route('/health', methods=['GET'])
@@ -0,0 +1,274 @@
+import cv2
+import numpy as np
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from form_templates import get_template
+
+
+# Yarıçapa göre dolu disk ofset tablosu. cv2.circle ile çizildiği için
+# piksel kümesi eski maske tabanlı ölçümle birebir aynıdır.
+@lru_cache(maxsize=64)
+def _disk_ofsetleri(yaricap: int) -> Tuple[np.ndarray, np.ndarray]:
+    boyut = 2 * yaricap + 1
+    maske = np.zeros((boyut, boyut), dtype=np.uint8)
+    cv2.circle(maske, (yaricap, yaricap), yaricap, 255, -1)
+    dy, dx = np.nonzero(maske)
+    return dy - yaricap, dx - yaricap
+
+
+# Tespit edilen tüm dairelerin doluluk istatistiklerini tek seferde hesaplar.
+# daireler: (N, 3) cx, cy, r. Dönüş: (N, 3) avg, std, min - ölçülemeyen daireler NaN.
+# Her daire için ölçüm, dairenin sınırlayıcı karesinin (görüntüye kırpılmış) merkezine
+# oturan en büyük disk üzerinden yapılır. Merkezi görüntü içindeki dairelerde sonuç eski
+# daire başına maske döngüsüyle aynıdır; merkezi görüntü dışında kalan daireler NaN'dır
+# (eski döngüde negatif dilim sınırı görüntünün öbür kenarına sarıyordu).
+def daire_istatistikleri(gri: np.ndarray, daireler: np.ndarray) -> np.ndarray:
+    h, w = gri.shape[:2]
+    n = len(daireler)
+    sonuc = np.full((n, 3), np.nan, dtype=np.float64)
+    if n == 0:
+        return sonuc
+    
+    daireler = np.asarray(daireler, dtype=np.float64)
+    cx, cy, r = daireler[:, 0], daireler[:, 1], daireler[:, 2]
+    
+    # Kırpılmış sınırlayıcı kare (int() sıfıra doğru yuvarlar - np.trunc ile aynı)
+    x1 = np.maximum(0, np.trunc(cx - r)).astype(np.int64)
+    y1 = np.maximum(0, np.trunc(cy - r)).astype(np.int64)
+    x2 = np.minimum(w, np.trunc(cx + r)).astype(np.int64)
+    y2 = np.minimum(h, np.trunc(cy + r)).astype(np.int64)
+    roi_w, roi_h = x2 - x1, y2 - y1
+    
+    mcx, mcy = roi_w // 2, roi_h // 2
+    mr = np.minimum(mcx, mcy)
+    
+    for yaricap in np.unique(mr[(mr >= 2) & (roi_w > 0) & (roi_h > 0)]):
+        idx = np.nonzero(mr == yaricap)[0]
+        dy, dx = _disk_ofsetleri(int(yaricap))
+        
+        # (daire, piksel) yerel koordinatları; disk kare dışına taşıyorsa o pikseller sayılmaz
+        yerel_x = mcx[idx, None] + dx[None, :]
+        yerel_y = mcy[idx, None] + dy[None, :]
+        gecerli = (yerel_x < roi_w[idx, None]) & (yerel_y < roi_h[idx, None])
+        
+        pikseller = gri[np.minimum(y1[idx, None] + yerel_y, h - 1),
+                        np.minimum(x1[idx, None] + yerel_x, w - 1)].astype(np.float64)
+        
+        adet = gecerli.sum(axis=1)
+        ortalama = np.where(gecerli, pikseller, 0).sum(axis=1) / adet
+        sapma = np.sqrt(np.where(gecerli, (pikseller - ortalama[:, None]) ** 2, 0).sum(axis=1) / adet)
+        en_kucuk = np.where(gecerli, pikseller, np.inf).min(axis=1)
+        
+        sonuc[idx, 0] = ortalama
+        sonuc[idx, 1] = sapma
+        sonuc[idx, 2] = en_kucuk
+    
+    return sonuc
+
+
+# Şablondaki bölüm tanımını bölge boyutuna göre sabit bir baloncuk kafesine çevirir.
+# tur: 'answers' (satır = soru, sütun = şık) veya 'names' (satır = harf, sütun = karakter).
+# sutun_sayisi: isim bölgesinde okunacak karakter sayısı; verilmezse şablondaki columns.
+# Dönüş: (satır, sütun, 2) x/y merkezleri ve yarıçap. Aynı boyut için önbellekten gelir.
+@lru_cache(maxsize=32)
+def kafes_derle(sablon_adi: str, tur: str, h: int, w: int,
+                sutun_sayisi: Optional[int] = None) -> Tuple[np.ndarray, float]:
+    sablon = get_template(sablon_adi)
+    if sablon is None:
+        raise ValueError(f"Bilinmeyen şablon: {sablon_adi}")
+    kafes = sablon['bubble_lattice']
+    
+    if tur == 'answers':
+        bolum = sablon['answer_sections'][0]
+        satir_sayisi = bolum['questions']
+        sutun_x = np.array(kafes['choice_x'], dtype=np.float64) * w
+        yaricap_orani = kafes['answer_radius']
+    elif tur == 'names':
+        bolum = sablon['name_section']
+        satir_sayisi = bolum['rows']
+        sutun_sayisi = sutun_sayisi or bolum['columns']
+        sutun_x = (np.arange(sutun_sayisi) + 0.5) * (w / sutun_sayisi)
+        yaricap_orani = kafes['name_radius']
+    else:
+        raise ValueError(f"Bilinmeyen kafes türü: {tur}")
+    
+    satir_yuksekligi = h / satir_sayisi
+    satir_y = (np.arange(satir_sayisi) + 0.5) * satir_yuksekligi
+    
+    merkezler = np.empty((satir_sayisi, len(sutun_x), 2), dtype=np.float64)
+    merkezler[:, :, 0] = sutun_x[None, :]
+    merkezler[:, :, 1] = satir_y[:, None]
+    merkezler.setflags(write=False)
+    
+    return merkezler, yaricap_orani * satir_yuksekligi
+
+
+# Bir izdüşüm profilinde her beklenen konumun çevresindeki tepeyi bulur.
+# profil baloncuk çapında yumuşatılmıştır (tepe = baloncuk merkezi); karşıtlık kontrolü
+# baloncuk arası boşlukları silmeyen hafif yumuşatılmış ham_profil üzerinde yapılır.
+# Tepeler yeterince belirgin ve düzenli değilse None döner.
+def _tepeleri_hizala(profil: np.ndarray, ham_profil: np.ndarray, beklenen: np.ndarray,
+                     pencere: float) -> Optional[np.ndarray]:
+    n = len(profil)
+    bulunan = np.empty(len(beklenen), dtype=np.float64)
+    
+    for i, konum in enumerate(beklenen):
+        bas = max(0, int(konum - pencere))
+        son = min(n, int(konum + pencere) + 1)
+        if son <= bas:
+            return None
+        bulunan[i] = bas + int(np.argmax(profil[bas:son]))
+    
+    if len(bulunan) > 1:
+        araliklar = np.diff(bulunan)
+        ortanca = float(np.median(araliklar))
+        if ortanca <= 0 or np.max(np.abs(araliklar - ortanca)) > 0.35 * ortanca:
+            return None
+        
+        # Tepe/vadi karşıtlığı: baloncuk sıraları arası boşluktan belirgin şekilde koyu olmalı
+        vadiler = ((bulunan[:-1] + bulunan[1:]) / 2).astype(np.int64)
+        tepe = float(np.mean(ham_profil[bulunan.astype(np.int64)]))
+        vadi = float(np.mean(ham_profil[vadiler]))
+        if tepe < 1.25 * vadi + 1:
+            return None
+    
+    return bulunan
+
+
+# Derlenmiş kafesi bölgedeki basılı baloncuklara hizalar. Sütun ve satır konumları
+# mürekkep izdüşümlerinin tepelerine kaydırılır; hizalama kontrolü geçmezse None döner.
+def kafes_hizala(esik: np.ndarray, merkezler: np.ndarray, yaricap: float) -> Optional[np.ndarray]:
+    satir_sayisi, sutun_sayisi = merkezler.shape[:2]
+    pencere_boyu = max(3, int(2 * yaricap) | 1)
+    kutu = np.ones(pencere_boyu, dtype=np.float64) / pencere_boyu
+    kucuk_kutu = np.ones(3, dtype=np.float64) / 3
+    
+    ham_sutun = np.convolve(esik.sum(axis=0, dtype=np.float64), kucuk_kutu, mode='same')
+    ham_satir = np.convolve(esik.sum(axis=1, dtype=np.float64), kucuk_kutu, mode='same')
+    sutun_profili = np.convolve(ham_sutun, kutu, mode='same')
+    satir_profili = np.convolve(ham_satir, kutu, mode='same')
+    
+    sutun_x = merkezler[0, :, 0]
+    satir_y = merkezler[:, 0, 1]
+    sutun_araligi = float(np.median(np.diff(sutun_x))) if sutun_sayisi > 1 else 4 * yaricap
+    satir_araligi = float(np.median(np.diff(satir_y))) if satir_sayisi > 1 else 4 * yaricap
+    
+    yeni_x = _tepeleri_hizala(sutun_profili, ham_sutun, sutun_x, 0.4 * sutun_araligi)
+    if yeni_x is None:
+        return None
+    yeni_y = _tepeleri_hizala(satir_profili, ham_satir, satir_y, 0.4 * satir_araligi)
+    if yeni_y is None:
+        return None
+    
+    hizali = np.empty_like(merkezler)
+    hizali[:, :, 0] = yeni_x[None, :]
+    hizali[:, :, 1] = yeni_y[:, None]
+    return hizali
+
+
+# Tespit edilen daireleri (satır, sütun) hücrelerine yerleştirir. Aynı hücreye düşen
+# dairelerden en koyusu (en düşük avg) kalır; dairesi olmayan hücreler NaN / -1'dir.
+# satirlar/sutunlar: daire başına hücre indeksleri (aralık dışındakiler atılır).
+# Dönüş: ((satır, sütun, 3) avg/std/min, (satır, sütun) hücreye yerleşen dairenin indeksi)
+def izgaraya_yerlestir(satirlar: np.ndarray, sutunlar: np.ndarray, istatistikler: np.ndarray,
+                       satir_sayisi: int, sutun_sayisi: int) -> Tuple[np.ndarray, np.ndarray]:
+    matris = np.full((satir_sayisi, sutun_sayisi, 3), np.nan, dtype=np.float64)
+    kaynak = np.full((satir_sayisi, sutun_sayisi), -1, dtype=np.int64)
+    
+    gecerli = np.nonzero((satirlar >= 0) & (satirlar < satir_sayisi) &
+                         (sutunlar >= 0) & (sutunlar < sutun_sayisi) &
+                         ~np.isnan(istatistikler[:, 0]))[0]
+    if len(gecerli) == 0:
+        return matris, kaynak
+    
+    hucre = satirlar[gecerli] * sutun_sayisi + sutunlar[gecerli]
+    # Hücreye, sonra parlaklığa göre sırala - her hücrenin ilk elemanı en koyu daire
+    sira = np.lexsort((istatistikler[gecerli, 0], hucre))
+    hucreler, ilk = np.unique(hucre[sira], return_index=True)
+    secilen = gecerli[sira[ilk]]
+    
+    matris.reshape(-1, 3)[hucreler] = istatistikler[secilen]
+    kaynak.reshape(-1)[hucreler] = secilen
+    return matris, kaynak
+
+
+# Her satır (soru ya da karakter sütunu) için işaretli seçeneği belirler.
+# avg/std/mn: (satır, seçenek) matrisleri. Dönüş: seçenek indeksi, işaretsizse -1.
+# Kriterler daire tabanlı okuyucudakiyle aynıdır: 1-2-3 zorunlu, toplamda en az 4'ü geçmeli.
+# NaN hücreler (dairesi bulunamayan seçenekler) yok sayılır; diğerlerinin ortalaması sadece
+# ölçülen seçeneklerden alınır, tek ölçülen seçenekte 255 kabul edilir.
+def secim_kararlari(avg: np.ndarray, std: np.ndarray, mn: np.ndarray, mutlak_esik: float,
+                    min_fark: float = 25, oran_esik: float = 0.85) -> np.ndarray:
+    satirlar = np.arange(avg.shape[0])
+    olculen = ~np.isnan(avg)
+    en_koyu_idx = np.argmin(np.where(olculen, avg, np.inf), axis=1)
+    en_koyu = np.where(olculen.any(axis=1), avg[satirlar, en_koyu_idx], np.inf)
+    
+    adet = olculen.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        diger_ortalama = np.where(adet > 1, (np.where(olculen, avg, 0).sum(axis=1) - en_koyu) / (adet - 1),
+                                  255.0)
+    
+    kriter1 = en_koyu < mutlak_esik
+    kriter2 = (diger_ortalama - en_koyu) > min_fark
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kriter3 = np.where(diger_ortalama > 0, en_koyu / diger_ortalama < oran_esik, False)
+    kriter4 = std[satirlar, en_koyu_idx] < 50
+    kriter5 = mn[satirlar, en_koyu_idx] < 100
+    
+    gecen = kriter1.astype(np.int64) + kriter2 + kriter3 + kriter4 + kriter5
+    kesin_isaretli = kriter1 & kriter2 & kriter3 & (gecen >= 4)
+    
+    return np.where(kesin_isaretli, en_koyu_idx, -1)
+
+
+# Satır başına okuma güveni (0..1). İşaretli satırda en koyu ile ikinci en koyu baloncuk
+# arasındaki fark, boş satırda en koyu baloncuğun eşiğin ne kadar üstünde kaldığı ölçek
+# gri seviyesine bölünür. Hiç ölçülemeyen (tamamı NaN) satırın güveni 0'dır.
+def secim_guvenleri(avg: np.ndarray, secimler: np.ndarray, mutlak_esik: float,
+                    olcek: float = 50.0) -> np.ndarray:
+    olculemedi = np.all(np.isnan(avg), axis=1)
+    sirali = np.sort(np.where(np.isnan(avg), 255.0, avg), axis=1)
+    en_koyu = sirali[:, 0]
+    ikinci = sirali[:, 1] if avg.shape[1] > 1 else np.full_like(en_koyu, 255.0)
+    
+    guven = np.where(secimler >= 0, ikinci - en_koyu, en_koyu - mutlak_esik) / olcek
+    guven = np.clip(guven, 0.0, 1.0)
+    guven[olculemedi] = 0.0
+    return guven
+
+
+# Bölgeyi kafes üzerinden okur: derle, hizala, örnekle.
+# esik: bölgenin ters adaptif eşiği (0/255); verilmezse burada hesaplanır.
+# sutun_sayisi: isim bölgesinin karakter sayısı (kafes_derle).
+# Dönüş: (hizalı merkezler, yarıçap, (satır, sütun, 3) avg/std/min) ya da hizalanamazsa None.
+def kafes_ornekle(gri: np.ndarray, sablon_adi: str, tur: str, esik: Optional[np.ndarray] = None,
+                  sutun_sayisi: Optional[int] = None) -> Optional[Tuple[np.ndarray, float, np.ndarray]]:
+    h, w = gri.shape[:2]
+    merkezler, yaricap = kafes_derle(sablon_adi, tur, h, w, sutun_sayisi)
+    
+    if esik is None:
+        blurred = cv2.GaussianBlur(gri, (3, 3), 0)
+        esik = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                     cv2.THRESH_BINARY_INV, 15, 5)
+    
+    # Kutu kenar çizgileri izdüşümde baloncuklardan güçlü tepe verir - uzun çizgileri çıkar
+    yatay = cv2.morphologyEx(esik, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, w // 3), 1)))
+    dikey = cv2.morphologyEx(esik, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, max(3, h // 3))))
+    esik = cv2.subtract(esik, cv2.bitwise_or(yatay, dikey)) // 255
+    
+    hizali = kafes_hizala(esik, merkezler, yaricap)
+    if hizali is None:
+        return None
+    
+    satir_sayisi, sutun_sayisi = hizali.shape[:2]
+    daireler = np.empty((satir_sayisi * sutun_sayisi, 3), dtype=np.float64)
+    daireler[:, :2] = hizali.reshape(-1, 2)
+    daireler[:, 2] = yaricap
+    
+    istatistikler = daire_istatistikleri(gri, daireler)
+    if np.isnan(istatistikler).any():
+        return None
+    
+    return hizali, yaricap, istatistikler.reshape(satir_sayisi, sutun_sayisi, 3)
@@ -1,8 +1,16 @@
 import sqlite3
 from datetime import datetime
 import hashlib
+import logging
 import secrets
 
+import numpy as np
+
+from answer_sheet import kodla
+from scoring import anahtar_derle, basari_yuzdeleri, puanla, soru_detaylari, toplam_puanlar
+
+logger = logging.getLogger('omr.db')
+
 class Database:
     def __init__(self, db_name='optic_forms.db'):
         self.db_name = db_name
@@ -98,6 +106,20 @@ class Database:
             )
         ''')
         
+        # kağıt tespit stratejisi istatistikleri (device = '' şablon geneli)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS strategy_stats (
+                template TEXT NOT NULL,
+                device TEXT NOT NULL DEFAULT '',
+                strategy TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                total_time REAL NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (template, device, strategy)
+            )
+        ''')
+        
         conn.commit()
         conn.close()
     
@@ -176,7 +198,7 @@ class Database:
             return answer_key_id
         except Exception as e:
             conn.rollback()
-            print(f"Error creating answer key: {e}")
+            logger.error("Error creating answer key: %s", e)
             return None
         finally:
             conn.close()
@@ -221,6 +243,8 @@ class Database:
         
         return dict(key) if key else None
     
+    # Anahtarı günceller ve kayıtlı sonuçları aynı transaction içinde yeniden puanlar.
+    # Dönüş: (yeniden puanlanan sonuç, puanı değişen sonuç) sayıları; hata olursa None
     def update_answer_key(self, answer_key_id, user_id, school_type, subjects_data, form_template):
         conn = self.get_connection()
         cursor = conn.cursor()
@@ -262,23 +286,145 @@ class Database:
                         VALUES (?, ?, ?, ?)
                     ''', (subject_id, i, answer, subject['points'][i-1] if 'points' in subject else subject['points_per_question']))
             
+            # eski ders kimliklerine bağlı kalan öğrenci cevaplarını yeni anahtara göre puanla
+            regraded = self._regrade_results(cursor, answer_key_id)
+            
             conn.commit()
-            return True
+            return regraded
         except Exception as e:
             conn.rollback()
-            print(f"Error updating answer key: {e}")
-            return False
+            logger.error("Error updating answer key: %s", e)
+            return None
         finally:
             conn.close()
     
+    # Anahtarın kayıtlı tüm sonuçlarını yeniden puanlar (kendi transaction'ı ile)
+    def regrade_answer_key(self, answer_key_id):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            regraded = self._regrade_results(cursor, answer_key_id)
+            conn.commit()
+            return regraded
+        except Exception as e:
+            conn.rollback()
+            logger.error("Error regrading answer key: %s", e)
+            return None
+        finally:
+            conn.close()
+    
+    # Kayıtlı öğrenci cevaplarından (görüntü tekrar okunmadan) tüm sonuçları tek matriste
+    # puanlar. Cevaplar genel soru numarasıyla eşleşir; yeni anahtarda olup kaydı olmayan
+    # sorular boş sayılır. Okunan cevaplar hiç silinmez: anahtardaki sorular yerinde
+    # güncellenir, anahtar dışında kalanlar doğru cevapsız ve 0 puanla saklanır, böylece anahtar
+    # tekrar genişletilirse yeniden puanlanabilir. Dönüş: (sonuç sayısı, değişen sonuç sayısı);
+    # puan, doğru/yanlış/boş sayısı ya da başarı yüzdesinden biri değişen sonuç değişmiş sayılır.
+    def _regrade_results(self, cursor, answer_key_id):
+        cursor.execute('''
+            SELECT id, total_score, success_rate FROM student_results
+            WHERE answer_key_id = ?
+            ORDER BY id
+        ''', (answer_key_id,))
+        results = cursor.fetchall()
+        if not results:
+            return 0, 0
+        
+        result_ids = [row['id'] for row in results]
+        index = {result_id: i for i, result_id in enumerate(result_ids)}
+        
+        cursor.execute('''
+            SELECT id, result_id, question_number, student_answer, correct_answer, is_correct
+            FROM student_answers
+            WHERE result_id IN (SELECT id FROM student_results WHERE answer_key_id = ?)
+        ''', (answer_key_id,))
+        stored = cursor.fetchall()
+        
+        anahtar = anahtar_derle({'subjects': self._get_subjects(cursor, answer_key_id)})
+        width = max([anahtar.soru_sayisi] + [row['question_number'] for row in stored])
+        codes = np.zeros((len(result_ids), width), dtype=np.uint8)
+        # Önceki puanlamanın sayıları: sadece o anahtardaki (doğru cevabı olan) satırlar
+        old_counts = np.zeros((len(result_ids), 3), dtype=np.int64)
+        row_ids = {}
+        for row in stored:
+            i = index[row['result_id']]
+            if row['question_number'] >= 1:
+                codes[i, row['question_number'] - 1] = kodla(row['student_answer'])
+            row_ids[(row['result_id'], row['question_number'])] = row['id']
+            if row['correct_answer'] is not None:
+                if row['is_correct']:
+                    old_counts[i, 0] += 1
+                elif kodla(row['student_answer']) == 0:
+                    old_counts[i, 2] += 1
+                else:
+                    old_counts[i, 1] += 1
+        
+        sonuc = puanla(codes, anahtar)
+        totals = np.round(toplam_puanlar(sonuc), 2).tolist()
+        rates = np.round(basari_yuzdeleri(sonuc, anahtar), 2).tolist()
+        new_counts = np.stack([sonuc['dogru'].sum(axis=1), sonuc['yanlis'].sum(axis=1),
+                               sonuc['bos'].sum(axis=1)], axis=1)
+        
+        def differs(old, new):
+            return old is None or abs(old - new) > 1e-9
+        
+        changed = sum(1 for i, row in enumerate(results)
+                      if differs(row['total_score'], totals[i]) or differs(row['success_rate'], rates[i])
+                      or (old_counts[i] != new_counts[i]).any())
+        
+        updates, inserts = [], []
+        for i, result_id in enumerate(result_ids):
+            for a in soru_detaylari(anahtar, sonuc, i):
+                row_id = row_ids.pop((result_id, a['question_number']), None)
+                values = (a['subject_id'], a['correct_answer'], a['is_correct'], a['points_earned'])
+                if row_id is None:
+                    inserts.append((result_id, a['subject_id'], a['question_number'], a['student_answer'],
+                                    a['correct_answer'], a['is_correct'], a['points_earned']))
+                else:
+                    updates.append(values + (row_id,))
+        
+        cursor.executemany('''
+            UPDATE student_answers
+            SET subject_id = ?, correct_answer = ?, is_correct = ?, points_earned = ?
+            WHERE id = ?
+        ''', updates)
+        cursor.executemany('''
+            INSERT INTO student_answers 
+            (result_id, subject_id, question_number, student_answer, correct_answer, is_correct, points_earned)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', inserts)
+        # Anahtar dışında kalan sorular: cevap saklanır, puanlamaya katılmaz
+        cursor.executemany('''
+            UPDATE student_answers
+            SET correct_answer = NULL, is_correct = 0, points_earned = 0
+            WHERE id = ?
+        ''', ((row_id,) for row_id in row_ids.values()))
+        cursor.executemany('''
+            UPDATE student_results SET total_score = ?, success_rate = ? WHERE id = ?
+        ''', zip(totals, rates, result_ids))
+        
+        logger.info("Answer key %s regraded: %d results, %d changed",
+                    answer_key_id, len(result_ids), changed)
+        return len(result_ids), changed
+    
     def get_answer_key_details(self, answer_key_id):
         conn = self.get_connection()
         cursor = conn.cursor()
         
         # cevap anahtarı bilgilerini al
         cursor.execute('SELECT * FROM answer_keys WHERE id = ?', (answer_key_id,))
-        answer_key = dict(cursor.fetchone())
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return None
+        answer_key = dict(row)
         
+        answer_key['subjects'] = self._get_subjects(cursor, answer_key_id)
+        conn.close()
+        
+        return answer_key
+    
+    def _get_subjects(self, cursor, answer_key_id):
         # dersleri al
         cursor.execute('''
             SELECT id, subject_name, question_count, points_per_question
@@ -305,10 +451,7 @@ class Database:
             subject['points'] = [dict(q)['points'] for q in questions]
             subjects.append(subject)
         
-        answer_key['subjects'] = subjects
-        conn.close()
-        
-        return answer_key
+        return subjects
     
     # öğrenci sonuçları
     def save_student_result(self, answer_key_id, student_data, answers_data, image_path=None):
@@ -340,7 +483,7 @@ class Database:
             return result_id
         except Exception as e:
             conn.rollback()
-            print(f"Error saving student result: {e}")
+            logger.error("Error saving student result: %s", e)
             return None
         finally:
             conn.close()
@@ -442,4 +585,37 @@ class Database:
         result['answers'] = answers
         
         conn.close()
-        return result
\ No newline at end of file
+        return result
+    
+    # strateji istatistikleri
+    def get_strategy_stats(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT template, device, strategy, attempts, successes, total_time
+            FROM strategy_stats
+        ''')
+        
+        stats = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return stats
+    
+    def add_strategy_stats(self, rows):
+        # rows: (template, device, strategy, attempts, successes, total_time) artışları
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany('''
+                INSERT INTO strategy_stats (template, device, strategy, attempts, successes, total_time)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (template, device, strategy) DO UPDATE SET
+                    attempts = attempts + excluded.attempts,
+                    successes = successes + excluded.successes,
+                    total_time = total_time + excluded.total_time,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
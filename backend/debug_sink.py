@@ -0,0 +1,112 @@
+import atexit
+import glob
+import itertools
+import logging
+import os
+import queue
+import shutil
+import threading
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Hangi okumaların debug görüntüleri diske yazılır:
+#   hepsi       - her okuma
+#   her_n       - her N. okuma (diğerlerinde debug görüntüsü hiç üretilmez)
+#   basarisiz   - sadece başarısız okumalar
+#   dusuk_guven - başarısız ya da güveni guven_esigi altında kalan okumalar
+ORNEKLEME_POLITIKALARI = ('hepsi', 'her_n', 'basarisiz', 'dusuk_guven')
+
+Artefaktlar = List[Tuple[str, np.ndarray]]
+
+logger = logging.getLogger('omr.debug')
+
+
+# Okuma bağlamında biriken debug görüntülerini örnekleme kararına göre arka plan iş
+# parçacığına verir. Her okuma kendi alt klasörüne (okuma_id) yazılır; en yeni `saklanan`
+# okuma tutulur. JPEG kodlama ve disk yazımı istek süresine eklenmez; kuyruk doluysa okuma
+# beklemez, o okumanın görüntüleri atılır. Kuyrukta kalanlar süreç çıkışında yazılır.
+class DebugKaydedici:
+
+    def __init__(self, klasor: str, politika: str = 'hepsi', her_n: int = 10,
+                 guven_esigi: float = 0.3, kuyruk_boyutu: int = 4, saklanan: int = 20):
+        if politika not in ORNEKLEME_POLITIKALARI:
+            raise ValueError(f"Bilinmeyen örnekleme politikası: {politika}")
+
+        self.klasor = klasor
+        self.politika = politika
+        self.her_n = max(1, her_n)
+        self.guven_esigi = guven_esigi
+        self.saklanan = max(1, saklanan)
+        self.dusurulen = 0
+
+        self._kuyruk: queue.Queue = queue.Queue(maxsize=kuyruk_boyutu)
+        self._sayac = itertools.count()
+
+        os.makedirs(self.klasor, exist_ok=True)
+        self._is_parcacigi = threading.Thread(target=self._calis, name='debug-kaydedici', daemon=True)
+        self._is_parcacigi.start()
+        atexit.register(self.bekle)
+
+    # Okuma başında çağrılır: bu okuma için debug görüntüsü üretilsin mi
+    def ornekle(self) -> bool:
+        no = next(self._sayac)
+        return self.politika != 'her_n' or no % self.her_n == 0
+
+    # Okuma sonunda çağrılır; örnekleme kararına göre bağlamın görüntülerini yazma
+    # kuyruğuna verir. Kuyruğa alındıysa True döner.
+    def okuma_bitir(self, baglam, basarili: bool, guven: Optional[float] = None) -> bool:
+        if not baglam.debug or not baglam.artefaktlar:
+            return False
+
+        if self.politika == 'basarisiz' and basarili:
+            return False
+        if self.politika == 'dusuk_guven' and basarili and (guven is None or guven >= self.guven_esigi):
+            return False
+
+        try:
+            self._kuyruk.put_nowait((baglam.okuma_id, baglam.artefaktlar))
+        except queue.Full:
+            self.dusurulen += 1
+            logger.warning("Debug kuyruğu dolu, okuma görüntüleri atlandı (toplam %d)", self.dusurulen)
+            return False
+        return True
+
+    # Kuyruktaki tüm görüntüler yazılana kadar bekler
+    def bekle(self):
+        self._kuyruk.join()
+
+    def _calis(self):
+        self._eski_dosyalari_temizle()
+        while True:
+            okuma_id, artefaktlar = self._kuyruk.get()
+            try:
+                self._yaz(okuma_id, artefaktlar)
+                self._eski_okumalari_sil()
+            except Exception as e:
+                logger.exception("Debug görüntüleri yazılamadı: %s", e)
+            finally:
+                self._kuyruk.task_done()
+
+    def _yaz(self, okuma_id: str, artefaktlar: Artefaktlar):
+        hedef = os.path.join(self.klasor, okuma_id)
+        os.makedirs(hedef, exist_ok=True)
+        for ad, goruntu in artefaktlar:
+            cv2.imwrite(os.path.join(hedef, f"{ad}.jpg"), goruntu)
+
+    # okuma_id zaman damgasıyla başladığı için ada göre sıralama = zamana göre sıralama
+    def _eski_okumalari_sil(self):
+        okumalar = sorted(ad for ad in os.listdir(self.klasor)
+                          if os.path.isdir(os.path.join(self.klasor, ad)))
+        for ad in okumalar[:-self.saklanan]:
+            shutil.rmtree(os.path.join(self.klasor, ad), ignore_errors=True)
+
+    # Açılışta klasör kökünde kalmış (eski düz düzendeki) görüntüleri bir kez temizler
+    def _eski_dosyalari_temizle(self):
+        for pattern in ('*.jpg', '*.jpeg', '*.png', '*.gif'):
+            for dosya in glob.glob(os.path.join(self.klasor, pattern)):
+                try:
+                    os.remove(dosya)
+                except OSError as e:
+                    logger.warning("Dosya silinemedi: %s - %s", dosya, e)
@@ -1,5 +1,5 @@
 
-from flask import Flask, render_template_string, send_from_directory, jsonify
+from flask import Flask, render_template_string, send_from_directory, jsonify, request
 import os
 from datetime import datetime
 
@@ -217,7 +217,7 @@ HTML_TEMPLATE = """
                             <span>{{ img.size }}</span>
                         </div>
                         <div class="card-body">
-                            <img src="/debug/{{ img.filename }}" alt="{{ img.name }}" onclick="openModal(this.src)">
+                            <img src="/debug/{{ img.path }}" alt="{{ img.name }}" onclick="openModal(this.src)">
                         </div>
                     </div>
                     {% endfor %}
@@ -264,9 +264,27 @@ HTML_TEMPLATE = """
 </html>
 """
 
-def get_image_info(filename):
+def get_read_dir(read_id=None):
+    """Okuma klasörü: verilen okuma ya da en yenisi (okumalar DEBUG_DIR altında alt klasördür)"""
+    # Klasör silinmiş olabilir (temiz kurulum / elle temizlik): boş liste gösterilir
+    if not os.path.exists(DEBUG_DIR):
+        return None
+    reads = sorted(d for d in os.listdir(DEBUG_DIR) if os.path.isdir(os.path.join(DEBUG_DIR, d)))
+    if read_id in reads:
+        return read_id
+    return reads[-1] if reads else None
+
+def list_images(read_id):
+    images = []
+    if read_id and os.path.isdir(os.path.join(DEBUG_DIR, read_id)):
+        for filename in sorted(os.listdir(os.path.join(DEBUG_DIR, read_id))):
+            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
+                images.append(get_image_info(read_id, filename))
+    return images
+
+def get_image_info(read_id, filename):
     """Görüntü bilgilerini al"""
-    filepath = os.path.join(DEBUG_DIR, filename)
+    filepath = os.path.join(DEBUG_DIR, read_id, filename)
     size = os.path.getsize(filepath)
     if size > 1024 * 1024:
         size_str = f"{size / (1024 * 1024):.1f} MB"
@@ -307,6 +325,7 @@ def get_image_info(filename):
     
     return {
         'filename': filename,
+        'path': f"{read_id}/{filename}",
         'name': display_name,
         'size': size_str
     }
@@ -339,13 +358,8 @@ def categorize_images(images):
 
 @app.route('/')
 def index():
-    """Ana sayfa - debug görüntülerini listele"""
-    images = []
-    
-    if os.path.exists(DEBUG_DIR):
-        for filename in sorted(os.listdir(DEBUG_DIR)):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                images.append(get_image_info(filename))
+    """Ana sayfa - son okumanın (ya da ?read=<id>) debug görüntülerini listele"""
+    images = list_images(get_read_dir(request.args.get('read')))
     
     categories = categorize_images(images)
     
@@ -357,7 +371,7 @@ def index():
         category_count=len(categories)
     )
 
-@app.route('/debug/<filename>')
+@app.route('/debug/<path:filename>')
 def serve_debug_image(filename):
     """Debug görüntüsünü serve et"""
     return send_from_directory(DEBUG_DIR, filename)
@@ -365,12 +379,9 @@ def serve_debug_image(filename):
 @app.route('/api/images')
 def api_images():
     """API: Görüntü listesi"""
-    images = []
-    if os.path.exists(DEBUG_DIR):
-        for filename in sorted(os.listdir(DEBUG_DIR)):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-                images.append(get_image_info(filename))
-    return jsonify({'images': images, 'count': len(images)})
+    read_id = get_read_dir(request.args.get('read'))
+    images = list_images(read_id)
+    return jsonify({'read': read_id, 'images': images, 'count': len(images)})
 
 @app.route('/api/clear')
 def api_clear():
@@ -380,9 +391,11 @@ def api_clear():
     # Korunacak dosyalar - ana form görüntüsü
     protected_files = ['0_orijinal.jpg', '0_orijinal.png']
     
-    if os.path.exists(DEBUG_DIR):
-        for filename in os.listdir(DEBUG_DIR):
-            filepath = os.path.join(DEBUG_DIR, filename)
+    read_id = get_read_dir(request.args.get('read'))
+    if read_id:
+        read_dir = os.path.join(DEBUG_DIR, read_id)
+        for filename in os.listdir(read_dir):
+            filepath = os.path.join(read_dir, filename)
             if os.path.isfile(filepath):
                 # Korunan dosyaları silme
                 if filename in protected_files:
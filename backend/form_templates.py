@@ -77,6 +77,26 @@ YGS_TEMPLATE = {
         }
     ],
     
+    # Basılı formun normalize sayfadaki (1600x2264) kutuları, sayfa boyutuna oranla (x1, y1, x2, y2).
+    # header: kutunun üstündeki başlık şeridinin kutu yüksekliğine oranı (baloncuklar altından başlar).
+    # Referans taraması verilmemişse hizalama referansı bu geometriden çizilir (registration.py).
+    'page_layout': {
+        'name_boxes': [(0.080, 0.092, 0.280, 0.500), (0.080, 0.530, 0.280, 0.940)],
+        'name_header': 0.065,
+        'answer_boxes': [(0.315, 0.385, 0.420, 0.940), (0.450, 0.385, 0.585, 0.940),
+                         (0.595, 0.385, 0.745, 0.940), (0.750, 0.385, 0.890, 0.940)],
+        'answer_header': 0.02,
+    },
+    
+    # Baloncuk kafesi - normalize sayfadan (1600x2264) kırpılan bölgeye göre oranlar.
+    # Satırlar bölgeyi eşit böler; cevap şıklarının yatay konumları choice_x ile verilir.
+    # Yarıçaplar satır yüksekliğine oranlıdır.
+    'bubble_lattice': {
+        'choice_x': (0.30, 0.44, 0.58, 0.72, 0.86),
+        'answer_radius': 0.30,
+        'name_radius': 0.28,
+    },
+    
     # Bubble tespit ayarları
     'bubble_detection': {
         'color_detection': True,
@@ -91,7 +111,12 @@ YGS_TEMPLATE = {
   
     'perspective_correction': {
         'enabled': True,
-    }
+    },
+    
+    # Boş formun normalize sayfa (1600x2264) taraması, backend klasörüne göre yol. Fotoğraf
+    # basılı forma anahtar noktalarla hizalanır (registration.py); None ise referans
+    # page_layout'tan çizilir. Hizalama tutmazsa kağıt kenarı tespit stratejileri kullanılır.
+    'reference_image': None,
 }
 
 FORM_TEMPLATES = {
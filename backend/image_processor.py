@@ -1,19 +1,425 @@
 import cv2
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple, Optional
+import io
+import itertools
+import logging
 import os
-import glob
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import cached_property
+
+from bubble_lattice import (daire_istatistikleri, izgaraya_yerlestir, kafes_ornekle, secim_guvenleri,
+                            secim_kararlari)
+from answer_sheet import CevapDizisi, kodlari_coz
+from debug_sink import DebugKaydedici
+from registration import sablon_hizalayici
+from scoring import puanla, sozlukten_derle
+
+logger = logging.getLogger('omr.okuyucu')
+tespit_logger = logging.getLogger('omr.okuyucu.tespit')
+
+
+# İşleme profilleri (hız/doğruluk dengesi):
+#   iyilestirme: perspektif sonrası iyileştirme - 'yok', 'gri' (tek kanal NLM) veya 'nlm' (3 kanal NLM)
+#   tespit_uzun_kenar: kağıt tespitinin çalıştığı piramit seviyesinin uzun kenarı (piksel)
+#   stratejiler: izin verilen kağıt tespit stratejileri (None = hepsi)
+ISLEME_PROFILLERI = {
+    # Temiz tarayıcı görüntüleri için: gürültü azaltma yok, sadece renk tabanlı tespit
+    'fast': {
+        'iyilestirme': 'yok',
+        'tespit_uzun_kenar': 800,
+        'cozme_uzun_kenar': 1600,
+        'stratejiler': ['lab_kagit_tespit', 'beyaz_kagit_bul', 'saturation_kagit_tespit'],
+    },
+    'balanced': {
+        'iyilestirme': 'gri',
+        'tespit_uzun_kenar': 1000,
+        'cozme_uzun_kenar': 2000,
+        'stratejiler': ['lab_kagit_tespit', 'beyaz_kagit_bul', 'saturation_kagit_tespit',
+                        'kenar_ile_dikdortgen_bul', 'gradient_kenar_tespit'],
+    },
+    # Zor telefon fotoğrafları için: tam NLM ve tüm stratejiler
+    'thorough': {
+        'iyilestirme': 'nlm',
+        'tespit_uzun_kenar': 1400,
+        'cozme_uzun_kenar': 2000,
+        'stratejiler': None,
+    },
+}
+
+VARSAYILAN_PROFIL = 'thorough'
+
+
+# cozme_uzun_kenar: büyük JPEG'ler uzun kenarı bu değerden küçük düşmeyecek en büyük 1/2, 1/4,
+# 1/8 ölçekte çözülür (libjpeg DCT ölçekleme, tam çözüp küçültmekten çok daha ucuz). Değerler
+# 2264 piksellik düzeltilmiş sayfa yüksekliğine yakın tutulur: 4000x3000 telefon fotoğrafı
+# yarı ölçekte çözülür; sonuç zayıfsa okuma tam çözünürlükle tekrarlanır.
+_INDIRGEMELI_COZME = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4),
+                      (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+# SOF işaretleri (DHT=C4, JPG=C8, DAC=CC hariç C0..CF)
+_SOF_ISARETLERI = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+# JPEG başlığından (genişlik, yükseklik) okur; JPEG değilse ya da SOF bulunamazsa None.
+# Sadece segment başlıkları okunur, görüntü verisine dokunulmaz.
+def jpeg_boyutu(akis: BinaryIO) -> Optional[Tuple[int, int]]:
+    if akis.read(2) != b'\xff\xd8':
+        return None
+    while True:
+        bayt = akis.read(1)
+        while bayt == b'\xff':
+            bayt = akis.read(1)
+        if not bayt:
+            return None
+        isaret = bayt[0]
+        if isaret in (0xD8, 0x01) or 0xD0 <= isaret <= 0xD7:
+            continue
+        if isaret == 0xD9 or isaret == 0xDA:
+            return None
+        uzunluk_baytlari = akis.read(2)
+        if len(uzunluk_baytlari) < 2:
+            return None
+        uzunluk = int.from_bytes(uzunluk_baytlari, 'big')
+        if isaret in _SOF_ISARETLERI:
+            veri = akis.read(5)
+            if len(veri) < 5:
+                return None
+            return int.from_bytes(veri[3:5], 'big'), int.from_bytes(veri[1:3], 'big')
+        akis.seek(uzunluk - 2, os.SEEK_CUR)
+
+
+# Başlık boyutuna ve hedef uzun kenara göre imread/imdecode bayrağı: (bayrak, ölçek faktörü)
+def cozme_bayragi(boyut: Optional[Tuple[int, int]], hedef_uzun_kenar: Optional[int]) -> Tuple[int, int]:
+    if boyut is None or not hedef_uzun_kenar:
+        return cv2.IMREAD_COLOR, 1
+    uzun = max(boyut)
+    for faktor, bayrak in _INDIRGEMELI_COZME:
+        if uzun // faktor >= hedef_uzun_kenar:
+            return bayrak, faktor
+    return cv2.IMREAD_COLOR, 1
+
+
+# Dosyadan, gerekirse indirgenmiş ölçekte okur: (görüntü, ölçek faktörü)
+def goruntu_oku(yol: str, hedef_uzun_kenar: Optional[int] = None) -> Tuple[Optional[np.ndarray], int]:
+    boyut = None
+    if hedef_uzun_kenar:
+        try:
+            with open(yol, 'rb') as f:
+                boyut = jpeg_boyutu(f)
+        except OSError:
+            pass
+    bayrak, faktor = cozme_bayragi(boyut, hedef_uzun_kenar)
+    return cv2.imread(yol, bayrak), faktor
+
+
+# Bellekteki kodlanmış görüntüyü, gerekirse indirgenmiş ölçekte çözer: (görüntü, ölçek faktörü)
+def goruntu_coz(veri: bytes, hedef_uzun_kenar: Optional[int] = None) -> Tuple[Optional[np.ndarray], int]:
+    boyut = jpeg_boyutu(io.BytesIO(veri)) if hedef_uzun_kenar else None
+    bayrak, faktor = cozme_bayragi(boyut, hedef_uzun_kenar)
+    return cv2.imdecode(np.frombuffer(veri, np.uint8), bayrak), faktor
+
+
+# Normalize edilmiş tek bir sayfanın ortak ara ürünleri. Gri, bulanık, eşiklenmiş görüntü
+# ve kutu aday konturları ilk kullanımda bir kez hesaplanır; kutu bulucular ve
+# okuyucular bunları paylaşır. Bölge kırpıntıları kopya değil görünümdür.
+class SayfaAnalizi:
+    
+    def __init__(self, renkli: np.ndarray):
+        self.renkli = renkli
+        self.h, self.w = renkli.shape[:2]
+        # bölge adı -> (x1, y1, x2, y2)
+        self.bolge_kutulari: Dict[str, Tuple[int, int, int, int]] = {}
+    
+    @cached_property
+    def gri(self) -> np.ndarray:
+        return cv2.cvtColor(self.renkli, cv2.COLOR_BGR2GRAY)
+    
+    @cached_property
+    def bulanik(self) -> np.ndarray:
+        return cv2.GaussianBlur(self.gri, (3, 3), 0)
+    
+    @cached_property
+    def esik(self) -> np.ndarray:
+        return cv2.adaptiveThreshold(self.bulanik, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                     cv2.THRESH_BINARY_INV, 15, 5)
+    
+    # Tüm sayfada alanı 3000 pikselden büyük konturların sınırlayıcı kutuları
+    @cached_property
+    def kutu_adaylari(self) -> List[Dict]:
+        contours, _ = cv2.findContours(self.esik, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        
+        adaylar = []
+        for cnt in contours:
+            area = cv2.contourArea(cnt)
+            if area < 3000:
+                continue
+            x, y, bw, bh = cv2.boundingRect(cnt)
+            adaylar.append({'x': x, 'y': y, 'w': bw, 'h': bh, 'area': area})
+        return adaylar
+    
+    def bolge_ekle(self, bolge_adi: str, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        self.bolge_kutulari[bolge_adi] = (x1, y1, x2, y2)
+        return self.renkli[y1:y2, x1:x2]
+    
+    def bolge_gri(self, bolge_adi: str) -> Optional[np.ndarray]:
+        if bolge_adi not in self.bolge_kutulari:
+            return None
+        x1, y1, x2, y2 = self.bolge_kutulari[bolge_adi]
+        return self.gri[y1:y2, x1:x2]
+    
+    def bolge_esik(self, bolge_adi: str) -> Optional[np.ndarray]:
+        if bolge_adi not in self.bolge_kutulari:
+            return None
+        x1, y1, x2, y2 = self.bolge_kutulari[bolge_adi]
+        return self.esik[y1:y2, x1:x2]
+
+
+# Okuma, dinleyicisi iptal istediği için yarıda kesildi (istemci bağlantıyı kapattı vb.)
+class OkumaIptalEdildi(Exception):
+    pass
+
+
+# Tek bir form okumasına ait durum. Okuyucu paylaşılır; okumaya göre değişen her şey
+# burada taşınır: debug görüntüleri ve klasörü, aşama süreleri, ara sonuçlar ve ilerleme dinleyicisi.
+class OkumaBaglami:
+    _sayac = itertools.count(1)
+    
+    def __init__(self, profil: str, cihaz: Optional[str] = None, debug: bool = False,
+                 istasyon: Optional[str] = None, ilerleme: Optional[Callable[..., None]] = None,
+                 iptal: Optional[Callable[[], bool]] = None):
+        # Debug klasöründe bu okumanın alt klasör adı
+        self.okuma_id = f"{datetime.now():%Y%m%d_%H%M%S}_{next(OkumaBaglami._sayac):06d}"
+        self.profil = profil
+        self.cihaz = cihaz
+        # Sabit istasyon kimliği: verilirse son kağıt dörtgeni yeniden kullanılmaya çalışılır
+        self.istasyon = istasyon
+        self.debug = debug
+        self.artefaktlar: List[Tuple[str, np.ndarray]] = []
+        self.sureler: Dict[str, float] = {}
+        self.ara_sonuclar: Dict[str, object] = {}
+        # İsteğe bağlı dinleyici: ilerleme(asama, **veri) aşama sınırlarında çağrılır.
+        # iptal() True dönerse okuma bir sonraki aşama sınırında OkumaIptalEdildi ile kesilir.
+        self.ilerleme = ilerleme
+        self.iptal = iptal
+        self._baslangic = time.perf_counter()
+    
+    # Aşama süresini ölçer (aynı aşama birden çok kez ölçülürse süreler toplanır)
+    @contextmanager
+    def olc(self, asama: str):
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sureler[asama] = self.sureler.get(asama, 0.0) + time.perf_counter() - baslangic
+    
+    def debug_yaz(self, ad: str, goruntu: np.ndarray):
+        if self.debug:
+            self.artefaktlar.append((ad, goruntu))
+    
+    # Tam çözünürlük tekrarı için yeni deneme: aşama süreleri, ara sonuçlar ve strateji
+    # denemeleri sıfırlanır (toplam süre iki denemeyi de kapsar); dinleyiciye 'retry' olayı
+    # gider ve aşama olayları baştan gelir.
+    def yeni_deneme(self, neden: str):
+        self.sureler = {}
+        self.ara_sonuclar = {'tam_cozme_tekrari': True}
+        self.bildir('retry', reason=neden)
+    
+    def iptal_kontrol(self):
+        if self.iptal is not None and self.iptal():
+            raise OkumaIptalEdildi(self.okuma_id)
+    
+    # Aşama olayını dinleyiciye iletir; dinleyici hatası okumayı bozmaz
+    def bildir(self, asama: str, **veri):
+        self.iptal_kontrol()
+        if self.ilerleme is None:
+            return
+        try:
+            self.ilerleme(asama, **veri)
+        except Exception as e:
+            logger.warning("İlerleme dinleyicisi hatası (%s): %s", asama, e)
+    
+    # Sonuçta dönen zamanlama özeti (milisaniye): toplam, aşamalar ve denenen stratejiler
+    def zamanlama(self) -> Dict:
+        denemeler = self.ara_sonuclar.get('strateji_denemeleri') or []
+        return {
+            'total_ms': round((time.perf_counter() - self._baslangic) * 1000, 1),
+            'stages': {asama: round(sure * 1000, 1) for asama, sure in self.sureler.items()},
+            'strategies': {metot: {'ms': round(sure * 1000, 1), 'success': basarili}
+                           for metot, basarili, sure in denemeler}
+        }
+
+
+# Yarışa katılan stratejilerin gördüğü bağlam. Yarış bittikten sonra (bitir) süresi dolmuş
+# ama çalışmayı sürdüren stratejilerin debug görüntüleri ve süre ölçümleri okumaya yazılmaz;
+# okuma özetlenip artefaktlar boşaltıldıktan sonra bağlam değişmez. Diğer her şey asıl bağlamdır.
+class YarisBaglami:
+    
+    def __init__(self, baglam: OkumaBaglami):
+        self._baglam = baglam
+        self._bitti = threading.Event()
+        self._kilit = threading.Lock()
+    
+    def __getattr__(self, ad: str):
+        return getattr(self._baglam, ad)
+    
+    @property
+    def debug(self) -> bool:
+        return self._baglam.debug and not self._bitti.is_set()
+    
+    def bitir(self):
+        with self._kilit:
+            self._bitti.set()
+    
+    def debug_yaz(self, ad: str, goruntu: np.ndarray):
+        with self._kilit:
+            if not self._bitti.is_set():
+                self._baglam.debug_yaz(ad, goruntu)
+    
+    @contextmanager
+    def olc(self, asama: str):
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._kilit:
+                if not self._bitti.is_set():
+                    sureler = self._baglam.sureler
+                    sureler[asama] = sureler.get(asama, 0.0) + time.perf_counter() - baslangic
+
+
+# Yarış modunda stratejilerin koştuğu ortak iş parçacığı havuzu (OpenCV GIL'i bırakır).
+# _yaris_yuku havuzda bekleyen/çalışan strateji sayısıdır; CPU doluysa yarış yerine sıralı denenir.
+_yaris_havuzu: Optional[ThreadPoolExecutor] = None
+_yaris_yuku = 0
+_yaris_kilidi = threading.Lock()
+
+
+def _yaris_havuzu_al() -> ThreadPoolExecutor:
+    global _yaris_havuzu
+    with _yaris_kilidi:
+        if _yaris_havuzu is None:
+            _yaris_havuzu = ThreadPoolExecutor(max_workers=os.cpu_count() or 1,
+                                               thread_name_prefix='tespit-yarisi')
+        return _yaris_havuzu
+
+
+# Yarış için CPU'da yer var mı: havuz yükü ve (varsa) sistem yük ortalamasına bakar
+def _yaris_uygun(strateji_sayisi: int) -> bool:
+    cekirdek = os.cpu_count() or 1
+    if cekirdek < 2:
+        return False
+    with _yaris_kilidi:
+        if _yaris_yuku + strateji_sayisi > cekirdek:
+            return False
+    if hasattr(os, 'getloadavg'):
+        try:
+            if os.getloadavg()[0] >= cekirdek:
+                return False
+        except OSError:
+            pass
+    return True
+
+
+def _yaris_yuku_degistir(fark: int):
+    global _yaris_yuku
+    with _yaris_kilidi:
+        _yaris_yuku += fark
+
+
+# Dörtgen skorlaması için genişletilmiş Canny kenar haritası
+def kenar_haritasi(goruntu: np.ndarray) -> np.ndarray:
+    gri = cv2.cvtColor(goruntu, cv2.COLOR_BGR2GRAY) if len(goruntu.shape) == 3 else goruntu
+    return cv2.dilate(cv2.Canny(cv2.GaussianBlur(gri, (5, 5), 0), 50, 150), np.ones((5, 5), np.uint8))
+
+
+# Tespit edilen dörtgenin kalitesi: kenarların gerçek kenar pikseline oturma oranı x A4 oranına
+# yakınlık. Görüntünün %10'undan küçük dörtgenler elenir. kenarlar: genişletilmiş Canny çıktısı
+def dortgen_skoru(koseler: np.ndarray, kenarlar: np.ndarray) -> float:
+    h, w = kenarlar.shape[:2]
+    koseler = koseler.astype(np.float32)
+    alan = abs(cv2.contourArea(koseler))
+    genislik = np.linalg.norm(koseler[1] - koseler[0])
+    yukseklik = np.linalg.norm(koseler[3] - koseler[0])
+    if genislik <= 0 or yukseklik <= 0 or alan < 0.1 * h * w:
+        return 0.0
+    oran = max(genislik, yukseklik) / min(genislik, yukseklik)
+    oran_uyumu = max(0.0, 1 - abs(oran - 1.41) / 0.41)
+    
+    t = np.linspace(0, 1, 50, endpoint=False, dtype=np.float32)[:, None]
+    noktalar = np.concatenate([koseler[i] + t * (koseler[(i + 1) % 4] - koseler[i]) for i in range(4)])
+    xs = np.clip(np.round(noktalar[:, 0]).astype(int), 0, w - 1)
+    ys = np.clip(np.round(noktalar[:, 1]).astype(int), 0, h - 1)
+    kenar_destegi = np.count_nonzero(kenarlar[ys, xs]) / len(noktalar)
+    return float(kenar_destegi * oran_uyumu)
+
+
+# Toplu okumada her işçi sürecinin kendi okuyucusu (süreç başına bir kez kurulur)
+_isci_okuyucu = None
+
+
+def _isci_baslat(profil: str = VARSAYILAN_PROFIL):
+    global _isci_okuyucu
+    # Her süreç tek çekirdek kullansın - paralellik süreç havuzundan gelir
+    cv2.setNumThreads(1)
+    # Toplu okumada debug kapalı: işçiler aynı debug dosyalarının üzerine yazar
+    _isci_okuyucu = OptikFormOkuyucu(debug_mode=False, profil=profil)
+
+
+def _isci_oku(goruntu_yolu: str) -> Dict:
+    try:
+        return _isci_okuyucu.form_oku(goruntu_yolu)
+    except Exception as e:
+        return {'success': False, 'error': str(e)}
+
 
 class OptikFormOkuyucu:
    
 
-    def __init__(self, debug_mode: bool = False):
+    def __init__(self, debug_mode: bool = False, profil: str = VARSAYILAN_PROFIL, sablon: str = 'ygs',
+                 yaris_modu: bool = False, strateji_istatistikleri=None,
+                 debug_kaydedici: Optional[DebugKaydedici] = None, istasyon_onbellegi=None,
+                 hizalama: bool = True):
         self.debug_mode = debug_mode
+        
+        if profil not in ISLEME_PROFILLERI:
+            raise ValueError(f"Bilinmeyen işleme profili: {profil}")
+        self.profil = profil
+        
+        # Baloncuklar önce şablon kafesinden okunur; HoughCircles sadece yedek yoldur
+        self.sablon = sablon
+        self.kafes_kullan = True
+        
+        # Şablonun referans görüntüsü varsa sayfa önce basılı forma hizalanır (registration);
+        # strateji zinciri sadece hizalama başarısız olursa çalışır
+        self.hizalayici = sablon_hizalayici(sablon) if hizalama else None
+        
+        # Yarış modu: tespit stratejileri eşzamanlı çalışır, süre sonunda en iyi dörtgen seçilir
+        self.yaris_modu = yaris_modu
+        self.yaris_suresi = 3.0
+        
+        # İndirgenmiş çözülen okumanın güveni bunun altındaysa tam çözünürlükle tekrar okunur
+        self.tam_cozme_guven_esigi = 0.2
+        
+        # Strateji başarı/süre istatistikleri (strategy_stats.StratejiIstatistikleri); None ise sabit sıra
+        self.strateji_istatistikleri = strateji_istatistikleri
+        
+        # İstasyon modu (station_cache.IstasyonOnbellegi): istasyon kimliğiyle gelen okumalarda
+        # son kağıt dörtgeni kenar desteğiyle doğrulanır, tutarsa strateji zinciri atlanır
+        self.istasyon_onbellegi = istasyon_onbellegi
         self.debug_dir = os.path.join(os.path.dirname(__file__), '..', 'debug_images')
         self.debug_dir = os.path.abspath(self.debug_dir)
         
-        if self.debug_mode:
-            os.makedirs(self.debug_dir, exist_ok=True)
+        # Debug görüntüleri arka planda, örnekleme politikasına göre yazılır (debug_sink)
+        if self.debug_mode and debug_kaydedici is None:
+            debug_kaydedici = DebugKaydedici(self.debug_dir)
+        self.debug_kaydedici = debug_kaydedici if self.debug_mode else None
         
         self.secenekler = ['A', 'B', 'C', 'D', 'E']
         
@@ -28,110 +434,178 @@ class OptikFormOkuyucu:
             'fen': {'x1': 0.74, 'y1': 0.385, 'x2': 0.89, 'y2': 0.94}
         }
     
-    def debug_klasoru_temizle(self):
-        """Yeni analiz için debug klasörünü temizle"""
-        if not self.debug_mode:
+    # Debug görüntüsü bu okuma için üretilecek mi (bağlam yoksa ya da okuma örneklenmediyse False)
+    def debug_aktif(self, baglam: Optional[OkumaBaglami]) -> bool:
+        return baglam is not None and baglam.debug
+    
+    def debug_yaz(self, baglam: Optional[OkumaBaglami], ad: str, goruntu: np.ndarray):
+        if baglam is not None:
+            baglam.debug_yaz(ad, goruntu)
+    
+    # Bağlam varsa aşama süresini ölçer, yoksa hiçbir şey yapmaz
+    def asama(self, baglam: Optional[OkumaBaglami], ad: str):
+        return baglam.olc(ad) if baglam is not None else nullcontext()
+    
+    # Yeni okuma bağlamı; debug örneklemesine okuma başında karar verilir
+    def baglam_olustur(self, profil: Optional[str] = None, cihaz: Optional[str] = None,
+                       istasyon: Optional[str] = None, ilerleme: Optional[Callable[..., None]] = None,
+                       iptal: Optional[Callable[[], bool]] = None) -> OkumaBaglami:
+        debug = self.debug_kaydedici is not None and self.debug_kaydedici.ornekle()
+        return OkumaBaglami(profil or self.profil, cihaz, debug, istasyon, ilerleme, iptal)
+    
+    # Okuyucu nesnesi paylaşılabilir: okumaya ait her şey baglam'da taşınır,
+    # aynı okuyucu birden çok iş parçacığında eşzamanlı kullanılabilir.
+    def form_oku(self, goruntu_yolu: str, profil: Optional[str] = None, cihaz: Optional[str] = None,
+                 baglam: Optional[OkumaBaglami] = None, istasyon: Optional[str] = None) -> Dict:
+        return self.okuma_calistir(lambda hedef: goruntu_oku(goruntu_yolu, hedef), os.path.basename(goruntu_yolu),
+                                   profil, cihaz, baglam, istasyon)
+    
+    # Diske yazmadan, istekten gelen kodlanmış görüntü baytlarından (JPEG/PNG) okur
+    def form_oku_bytes(self, veri: bytes, profil: Optional[str] = None, cihaz: Optional[str] = None,
+                       baglam: Optional[OkumaBaglami] = None, ad: str = 'bellek',
+                       istasyon: Optional[str] = None) -> Dict:
+        return self.okuma_calistir(lambda hedef: goruntu_coz(veri, hedef), ad, profil, cihaz, baglam, istasyon)
+    
+    # Zaten çözülmüş BGR görüntüden okur
+    def form_oku_array(self, goruntu: np.ndarray, profil: Optional[str] = None, cihaz: Optional[str] = None,
+                       baglam: Optional[OkumaBaglami] = None, ad: str = 'bellek',
+                       istasyon: Optional[str] = None) -> Dict:
+        return self.okuma_calistir(lambda hedef: (goruntu, 1), ad, profil, cihaz, baglam, istasyon)
+    
+    # Okuma giriş noktalarının ortak gövdesi. yukleyici(hedef_uzun_kenar) görüntüyü ve çözme
+    # ölçek faktörünü döner (çözülemezse görüntü None); süresi 'decode' aşamasına yazılır.
+    # İndirgenmiş çözülen okuma başarısız ya da düşük güvenliyse tam çözünürlükle tekrarlanır.
+    # Bağlamın dinleyicisi iptal isterse OkumaIptalEdildi çağırana kadar yükselir.
+    def okuma_calistir(self, yukleyici: Callable[[Optional[int]], Tuple[Optional[np.ndarray], int]], ad: str,
+                       profil: Optional[str] = None, cihaz: Optional[str] = None,
+                       baglam: Optional[OkumaBaglami] = None, istasyon: Optional[str] = None) -> Dict:
+        baglam = baglam or self.baglam_olustur(profil, cihaz, istasyon)
+        hedef = ISLEME_PROFILLERI.get(baglam.profil, {}).get('cozme_uzun_kenar')
+        
+        sonuc = {'success': False}
+        try:
+            sonuc = self.formu_isle(lambda: yukleyici(hedef), ad, baglam)
+            
+            if baglam.ara_sonuclar.get('cozme_olcegi', 1) > 1 and \
+                    (not sonuc['success'] or sonuc['confidence'] < self.tam_cozme_guven_esigi):
+                logger.debug("İndirgenmiş çözme yetersiz, tam çözünürlükle tekrar okunuyor: %s", ad)
+                baglam.yeni_deneme('failed' if not sonuc['success'] else 'low_confidence')
+                sonuc = self.formu_isle(lambda: yukleyici(None), ad, baglam)
+            
+            # Strateji istatistiği sadece son denemeden kaydedilir (tekrar aynı okumayı iki kez saymaz)
+            denemeler = baglam.ara_sonuclar.get('strateji_denemeleri')
+            if self.strateji_istatistikleri is not None and denemeler:
+                self.strateji_istatistikleri.kaydet(self.sablon, baglam.cihaz, denemeler)
+            
+            sonuc['strategy'] = baglam.ara_sonuclar.get('strateji')
+            sonuc['timings'] = baglam.zamanlama()
+            self.okuma_ozeti_logla(ad, baglam, sonuc)
+            return sonuc
+        finally:
+            # Debug görüntüleri okuma boyunca biriktirilir, sonuca göre arka planda yazılır
+            if self.debug_kaydedici is not None:
+                self.debug_kaydedici.okuma_bitir(baglam, sonuc['success'], sonuc.get('confidence'))
+    
+    # Okuma başına tek INFO satırı; JSON log işleyicisi için alanlar ayrıca verilir
+    def okuma_ozeti_logla(self, ad: str, baglam: OkumaBaglami, sonuc: Dict):
+        if not logger.isEnabledFor(logging.INFO):
             return
         
-        try:
-            # Tüm görüntü dosyalarını sil
-            patterns = ['*.jpg', '*.jpeg', '*.png', '*.gif']
-            silinen = 0
-            
-            for pattern in patterns:
-                for dosya in glob.glob(os.path.join(self.debug_dir, pattern)):
-                    try:
-                        os.remove(dosya)
-                        silinen += 1
-                    except Exception as e:
-                        print(f"Dosya silinemedi: {dosya} - {e}")
-            
-            if silinen > 0:
-                print(f"🧹 Debug klasörü temizlendi: {silinen} dosya silindi")
-        except Exception as e:
-            print(f"Debug temizleme hatası: {e}")
-
-    def form_oku(self, goruntu_yolu: str) -> Dict:
+        alanlar = {
+            'okuma_id': baglam.okuma_id,
+            'dosya': ad,
+            'profil': baglam.profil,
+            'basarili': sonuc['success'],
+            'strateji': sonuc.get('strategy'),
+            'sure_ms': sonuc['timings']['total_ms'],
+        }
+        if sonuc['success']:
+            alanlar['isaretli'] = sonuc['answers'].isaretli_sayisi()
+            alanlar['guven'] = round(sonuc['confidence'], 3)
+            logger.info("okuma %s: %s, %d/%d işaretli, güven %.2f, strateji %s, %.0f ms",
+                        baglam.okuma_id, alanlar['dosya'], alanlar['isaretli'], len(sonuc['answers']),
+                        alanlar['guven'], alanlar['strateji'], alanlar['sure_ms'], extra={'alanlar': alanlar})
+        else:
+            alanlar['hata'] = sonuc.get('error')
+            logger.info("okuma %s: %s başarısız (%s), %.0f ms", baglam.okuma_id, alanlar['dosya'],
+                        alanlar['hata'], alanlar['sure_ms'], extra={'alanlar': alanlar})
+    
+    def formu_isle(self, yukleyici: Callable[[], Tuple[Optional[np.ndarray], int]], ad: str,
+                   baglam: OkumaBaglami) -> Dict:
     
         try:
-            # Yeni analiz başlamadan önce eski debug görüntülerini temizle
-            self.debug_klasoru_temizle()
+            profil = baglam.profil
+            if profil not in ISLEME_PROFILLERI:
+                return {'success': False, 'error': f'Bilinmeyen işleme profili: {profil}'}
             
-            print(f"Görüntü yükleniyor: {goruntu_yolu}")
-            orijinal = cv2.imread(goruntu_yolu)
+            logger.debug("Görüntü yükleniyor: %s", ad)
+            with baglam.olc('decode'):
+                orijinal, baglam.ara_sonuclar['cozme_olcegi'] = yukleyici()
             
             if orijinal is None:
                 return {'success': False, 'error': 'Görüntü yüklenemedi'}
+            baglam.bildir('decoded', width=orijinal.shape[1], height=orijinal.shape[0],
+                          scale=baglam.ara_sonuclar['cozme_olcegi'])
             
-            print("Perspektif düzeltme yapılıyor...")
-            duzeltilmis = self.perspektif_duzelt(orijinal)
+            logger.debug("Perspektif düzeltme yapılıyor...")
+            duzeltilmis = self.perspektif_duzelt(orijinal, profil, baglam.cihaz, baglam)
             
             if duzeltilmis is None:
                 return {'success': False, 'error': 'Perspektif düzeltme başarısız'}
+            baglam.bildir('warped')
             
-            print("Yöneliş kontrolü yapılıyor...")
-            duzeltilmis = self.yonelisini_kontrol_et(duzeltilmis)
+            logger.debug("Yöneliş kontrolü yapılıyor...")
+            with baglam.olc('orientation'):
+                duzeltilmis = self.yonelisini_kontrol_et(duzeltilmis, baglam)
             
-            print("Form bölgeleri çıkarılıyor...")
-            bolgeler = self.bolgeleri_cikar_renkli(duzeltilmis)
+            logger.debug("Form bölgeleri çıkarılıyor...")
+            with baglam.olc('regions'):
+                analiz = SayfaAnalizi(duzeltilmis)
+                bolgeler = self.bolgeleri_cikar_renkli(duzeltilmis, analiz, baglam)
+            baglam.ara_sonuclar['analiz'] = analiz
             
-            print("Ad/Soyad okunuyor...")
-            ad = self.isim_oku_renkli(bolgeler.get('ad'), 12, 'ad')
-            soyad = self.isim_oku_renkli(bolgeler.get('soyad'), 12, 'soyisim')
+            logger.debug("Ad/Soyad okunuyor...")
+            with baglam.olc('names'):
+                ad = self.isim_oku_renkli(bolgeler.get('ad'), 12, 'ad',
+                                          analiz.bolge_gri('ad'), analiz.bolge_esik('ad'), baglam)
+                soyad = self.isim_oku_renkli(bolgeler.get('soyad'), 12, 'soyisim',
+                                             analiz.bolge_gri('soyad'), analiz.bolge_esik('soyad'), baglam)
             
-            print(f"Ad Soyad: {ad} {soyad}")
+            logger.debug("Ad Soyad: %s %s", ad, soyad)
+            baglam.bildir('names_read', name=ad, surname=soyad)
         
             
-            print("Cevaplar okunuyor...")
+            logger.debug("Cevaplar okunuyor...")
             
-            tum_cevaplar = {}
-            bolum_cevaplari = {}
-            soru_sayaci = 1
+            bolum_cevaplari: Dict[str, CevapDizisi] = {}
             
             ders_isimleri = ['turkce', 'matematik', 'fen', 'sosyal']
             ders_etiketleri = ['Türkçe', 'Matematik', 'Fen', 'Sosyal']
             
             for ders, etiket in zip(ders_isimleri, ders_etiketleri):
                 if ders in bolgeler and bolgeler[ders] is not None:
-                    ders_cevaplari = self.cevaplari_oku_renkli(bolgeler[ders], 40, ders)
-                    bolum_cevaplari[ders] = ders_cevaplari
-                    
-                    # bölge bölge aldığım ders cevaplarını tüm cevaplar listesine ekliyorum.
-                    for q, ans in ders_cevaplari.items():
-                        tum_cevaplar[soru_sayaci] = ans
-                        soru_sayaci += 1
-                    
-                    bos_sayisi = sum(1 for v in ders_cevaplari.values() if v == 'BOŞ')
-                    print(f"   {etiket}: {40 - bos_sayisi}/40 işaretli")
+                    with baglam.olc(f'answers.{ders}'):
+                        ders_cevaplari = self.cevaplari_oku_renkli(bolgeler[ders], 40, ders,
+                                                                   analiz.bolge_gri(ders), analiz.bolge_esik(ders),
+                                                                   baglam)
+                    logger.debug("%s: %s/40 işaretli", etiket, ders_cevaplari.isaretli_sayisi())
                 else:
-                    print(f"{etiket} bölgesi bulunamadı")
+                    # Bulunamayan ders boş ve sıfır güvenli sayılır; sonraki derslerin soru numaraları kaymaz
+                    ders_cevaplari = CevapDizisi.bos(40)
+                    logger.warning("%s bölgesi bulunamadı", etiket)
+                bolum_cevaplari[ders] = ders_cevaplari
+                baglam.bildir('subject_read', subject=ders, marked=ders_cevaplari.isaretli_sayisi(),
+                              found=ders in bolgeler and bolgeler[ders] is not None)
             
-            print(f"Toplam {len(tum_cevaplar)} soru okundu")
+            # Dersler soru sırasıyla tek diziye eklenir (1-40 Türkçe, 41-80 Matematik, ...)
+            tum_cevaplar = CevapDizisi.birlestir(bolum_cevaplari.values())
             
-
-            # terminale cevaplar yazdırılır.
-            print("\n" + "="*60)
-            print(" OKUNAN CEVAPLAR")
-            print("="*60)
-            print(f" Öğrenci: {ad} {soyad}\n")
+            logger.debug("Toplam %d soru okundu", len(tum_cevaplar))
             
-            for ders, etiket in zip(ders_isimleri, ders_etiketleri):
-                if ders in bolum_cevaplari:
-                    print(f"\n📚 {etiket.upper()} (40 Soru)")
-                    print("-" * 60)
-                    cevaplar_listesi = []
-                    for soru_no in range(1, 41):
-                        cevap = bolum_cevaplari[ders].get(soru_no, 'BOŞ')
-                        cevaplar_listesi.append(f"{soru_no:2d}:{cevap:3s}")
-                        if soru_no % 10 == 0:
-                            print("  " + "  ".join(cevaplar_listesi))
-                            cevaplar_listesi = []
-                    if cevaplar_listesi:
-                        print("  " + "  ".join(cevaplar_listesi))
-                    isaretli = sum(1 for v in bolum_cevaplari[ders].values() if v != 'BOŞ')
-                    print(f"  ✓ İşaretli: {isaretli}/40, Boş: {40-isaretli}/40")
-            
-            print("\n" + "="*60 + "\n")
+            # Cevap tablosu sadece DEBUG seviyesinde oluşturulur
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Okunan cevaplar:\n%s",
+                             self.cevap_tablosu(f"{ad} {soyad}", bolum_cevaplari, ders_isimleri, ders_etiketleri))
             
             return {
                 'success': True,
@@ -140,93 +614,399 @@ class OptikFormOkuyucu:
                     'surname': soyad,
                     'student_number': ''
                 },
+                # CevapDizisi; harflere sadece kayıt satırlarında (scoring.soru_detaylari) çevrilir
                 'answers': tum_cevaplar,
-                'sections': bolum_cevaplari
+                'sections': bolum_cevaplari,
+                # Formun güveni = en belirsiz sorunun güveni
+                'confidence': tum_cevaplar.guven()
             }
             
+        except OkumaIptalEdildi:
+            raise
         except Exception as e:
-            print(f"❌ Hata: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Form okuma hatası: %s", e)
             return {'success': False, 'error': str(e)}
     
+    # Okunan cevapların ders ders, satırda 10 soru olacak şekilde metin tablosu
+    def cevap_tablosu(self, ogrenci: str, bolum_cevaplari: Dict[str, CevapDizisi],
+                      ders_isimleri: List[str], ders_etiketleri: List[str]) -> str:
+        satirlar = ["=" * 60, " OKUNAN CEVAPLAR", "=" * 60, f" Öğrenci: {ogrenci}"]
+        
+        for ders, etiket in zip(ders_isimleri, ders_etiketleri):
+            if ders not in bolum_cevaplari:
+                continue
+            satirlar += ["", f"📚 {etiket.upper()} (40 Soru)", "-" * 60]
+            cevaplar = [f"{soru_no:2d}:{bolum_cevaplari[ders].harf(soru_no):3s}" for soru_no in range(1, 41)]
+            for i in range(0, 40, 10):
+                satirlar.append("  " + "  ".join(cevaplar[i:i + 10]))
+            isaretli = bolum_cevaplari[ders].isaretli_sayisi()
+            satirlar.append(f"  ✓ İşaretli: {isaretli}/40, Boş: {40-isaretli}/40")
+        
+        satirlar.append("=" * 60)
+        return "\n".join(satirlar)
+    
+    # Birden çok formu süreç havuzunda okur. Sonuçlar tamamlandıkça (yol, sonuç)
+    # olarak döner; bir formdaki hata diğerlerini etkilemez. İşçi süreci çökerse (bellek,
+    # sinyal, cv2 segfault) havuz bozulur: havuz yeniden kurulur ve bitmemiş formlar tekrar
+    # gönderilir. Havuza işçi sayısı kadar form verildiği için çökme anında sadece o an
+    # çalışan formlar şüphelidir; bozulma_siniri kez şüpheli olan form tek başına denenir,
+    # tek başına da çökerse sadece o form hata sonucu alır.
+    def form_oku_batch(self, goruntu_yollari: Iterable[str],
+                       workers: Optional[int] = None,
+                       profil: Optional[str] = None,
+                       bozulma_siniri: int = 2) -> Iterator[Tuple[str, Dict]]:
+        yollar = list(goruntu_yollari)
+        if not yollar:
+            return
+        
+        profil = profil or self.profil
+        
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, len(yollar)))
+        
+        # Tek işçi için süreç açma maliyetine gerek yok
+        if workers == 1:
+            for yol in yollar:
+                try:
+                    yield yol, self.form_oku(yol, profil)
+                except Exception as e:
+                    yield yol, {'success': False, 'error': str(e)}
+            return
+        
+        def havuz_kur(isci_sayisi: int) -> ProcessPoolExecutor:
+            return ProcessPoolExecutor(max_workers=isci_sayisi, initializer=_isci_baslat, initargs=(profil,))
+        
+        bekleyen = deque(yollar)
+        # Formun çalışırken yaşadığı havuz bozulması sayısı
+        supheli = Counter()
+        # Sınırı aşan şüpheliler, ana havuz bittikten sonra tek tek denenir
+        yalniz = []
+        
+        havuz = havuz_kur(workers)
+        try:
+            gorevler = {}
+            while bekleyen or gorevler:
+                while bekleyen and len(gorevler) < workers:
+                    yol = bekleyen.popleft()
+                    gorevler[havuz.submit(_isci_oku, yol)] = yol
+                
+                biten, _ = wait(gorevler, return_when=FIRST_COMPLETED)
+                calisanlar = []
+                for gorev in biten:
+                    yol = gorevler.pop(gorev)
+                    try:
+                        sonuc = gorev.result()
+                    except BrokenProcessPool:
+                        calisanlar.append(yol)
+                        continue
+                    except Exception as e:
+                        sonuc = {'success': False, 'error': f'İşçi hatası: {e}'}
+                    yield yol, sonuc
+                
+                if not calisanlar:
+                    continue
+                
+                # Bozuk havuzdaki diğer görevler de düşer; hepsi o an çalışan formlardır
+                calisanlar += gorevler.values()
+                gorevler = {}
+                for yol in reversed(calisanlar):
+                    supheli[yol] += 1
+                    if supheli[yol] >= bozulma_siniri:
+                        yalniz.append(yol)
+                    else:
+                        bekleyen.appendleft(yol)
+                logger.warning("Toplu okumada işçi süreci çöktü (%d form tekrar denenecek), havuz yeniden kuruluyor",
+                               len(calisanlar))
+                havuz.shutdown(wait=False, cancel_futures=True)
+                havuz = havuz_kur(workers)
+            
+            for yol in yalniz:
+                try:
+                    sonuc = havuz.submit(_isci_oku, yol).result()
+                except BrokenProcessPool:
+                    logger.error("Form işçi sürecini çökertiyor: %s", yol)
+                    sonuc = {'success': False, 'error': 'İşçi hatası: form okunurken işçi süreci çöktü'}
+                    havuz.shutdown(wait=False, cancel_futures=True)
+                    havuz = havuz_kur(1)
+                except Exception as e:
+                    sonuc = {'success': False, 'error': f'İşçi hatası: {e}'}
+                yield yol, sonuc
+        finally:
+            havuz.shutdown(wait=False, cancel_futures=True)
+    
     # kağıdın yönelişini kontrol eder eğer kağıt yan çevrilmişse düzeltir.
-    def yonelisini_kontrol_et(self, goruntu: np.ndarray) -> np.ndarray:
+    def yonelisini_kontrol_et(self, goruntu: np.ndarray,
+                              baglam: Optional[OkumaBaglami] = None) -> np.ndarray:
        
         h, w = goruntu.shape[:2]
 
         if w > h:
-            print(f"Kağıt yan çevrilmiş! ({w}x{h}) → Düzeltiliyor...")
+            logger.debug("Kağıt yan çevrilmiş! (%sx%s) → Düzeltiliyor...", w, h)
             goruntu = cv2.rotate(goruntu, cv2.ROTATE_90_COUNTERCLOCKWISE)
             h, w = goruntu.shape[:2]
-            print(f"Düzeltildi: {w}x{h}")
+            logger.debug("Düzeltildi: %sx%s", w, h)
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1e_yonelisli.jpg", goruntu)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1e_yonelisli", goruntu)
         
         return goruntu
     
+    # Kağıt tespit stratejileri, deneme sırasıyla: (metot adı, açıklama)
+    tespit_stratejileri = [
+        ('lab_kagit_tespit', 'LAB renk uzayı tespiti'),
+        ('beyaz_kagit_bul', 'Gelişmiş beyaz kağıt tespiti'),
+        ('saturation_kagit_tespit', 'Saturation analizi'),
+        ('kenar_ile_dikdortgen_bul', 'Gelişmiş kenar tespiti'),
+        ('gradient_kenar_tespit', 'Gradient magnitude tespiti'),
+        ('hough_lines_dikdortgen_bul', 'Hough Lines tespiti'),
+    ]
+    
     # Çoklu strateji ile A4 kağıdını tespit eder ve perspektif düzeltme yapar.
-    # ÖNEMLİ: Orijinal görüntü kalitesi korunur, tespit işlemleri kopya üzerinde yapılır.
-    def perspektif_duzelt(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    # ÖNEMLİ: Orijinal görüntü kalitesi korunur, tespit işlemleri küçültülmüş kopya üzerinde
+    # yapılır; bulunan köşeler tam çözünürlüğe ölçeklenip yerel olarak inceltilir.
+    def perspektif_duzelt(self, goruntu: np.ndarray, profil: Optional[str] = None,
+                          cihaz: Optional[str] = None,
+                          baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
       
-        h, w = goruntu.shape[:2]
+        ayarlar = ISLEME_PROFILLERI[profil or self.profil]
+        izinli = ayarlar['stratejiler']
+        stratejiler = [s for s in self.tespit_stratejileri if izinli is None or s[0] in izinli]
+        
+        # Geçmiş istatistik varsa stratejiler beklenen maliyete göre sıralanır
+        if self.strateji_istatistikleri is not None:
+            stratejiler = self.strateji_istatistikleri.sirala(stratejiler, self.sablon, cihaz)
         
         # ÖNEMLİ: Orijinal görüntüyü koru - tespit için kopya kullan
         orijinal = goruntu.copy()
         
-        if self.debug_mode:
-            cv2.imwrite(f"{self.debug_dir}/0_orijinal.jpg", orijinal)
+        if self.debug_aktif(baglam):
+            self.debug_yaz(baglam, "0_orijinal", orijinal)
         
-        print("A4 kağıdı aranıyor (çoklu strateji)...")
+        with self.asama(baglam, 'pyramid'):
+            kucuk, olcek = self.tespit_seviyesi(goruntu, ayarlar['tespit_uzun_kenar'])
         
-        # Strateji 1: LAB renk uzayı tabanlı tespit (aydınlatmadan bağımsız)
-        print("  [1/6] LAB renk uzayı tespiti...")
-        koseler = self.lab_kagit_tespit(goruntu)
-        if koseler is not None:
-            print("  ✓ LAB tespiti başarılı!")
-            return self.perspektif_donustur(orijinal, koseler)
+        tespit_logger.debug("A4 kağıdı aranıyor (çoklu strateji, ölçek %.2f)...", olcek)
         
-        # Strateji 2: Gelişmiş beyaz kağıt tespiti 
-        print("  [2/6] Gelişmiş beyaz kağıt tespiti...")
-        koseler = self.beyaz_kagit_bul(goruntu)
-        if koseler is not None:
-            print("  ✓ Beyaz kağıt tespiti başarılı!")
-            return self.perspektif_donustur(orijinal, koseler)
+        istasyon = baglam.istasyon if baglam is not None and self.istasyon_onbellegi is not None else None
+        boyut = (kucuk.shape[1], kucuk.shape[0])
         
-        # Strateji 3: Saturation analizi
-        print("  [3/6] Saturation analizi...")
-        koseler = self.saturation_kagit_tespit(goruntu)
-        if koseler is not None:
-            print("  ✓ Saturation tespiti başarılı!")
-            return self.perspektif_donustur(orijinal, koseler)
+        koseler, kazanan, denemeler = None, None, []
+        if istasyon:
+            with self.asama(baglam, 'station_check'):
+                koseler = self.istasyon_dortgeni(kucuk, istasyon)
+            if koseler is not None:
+                kazanan = 'istasyon'
         
-        # Strateji 4: Gelişmiş kenar tespiti (CLAHE + Bilateral)
-        print("  [4/6] Gelişmiş kenar tespiti...")
-        koseler = self.kenar_ile_dikdortgen_bul(goruntu)
-        if koseler is not None:
-            print("  ✓ Kenar tespiti başarılı!")
-            return self.perspektif_donustur(orijinal, koseler)
+        if koseler is None and self.hizalayici is not None:
+            with self.asama(baglam, 'register'):
+                koseler = self.sablona_hizala(kucuk, baglam)
+            if koseler is not None:
+                kazanan = 'sablon_hizalama'
         
-        # Strateji 5: Gradient magnitude tabanlı tespit (açık arka planlar için)
-        print("  [5/6] Gradient magnitude tespiti...")
-        koseler = self.gradient_kenar_tespit(goruntu)
-        if koseler is not None:
-            print("  ✓ Gradient tespiti başarılı!")
-            return self.perspektif_donustur(orijinal, koseler)
+        if koseler is None:
+            with self.asama(baglam, 'detect'):
+                if self.yaris_modu and _yaris_uygun(len(stratejiler)):
+                    koseler, kazanan, denemeler = self.stratejileri_yaristir(kucuk, stratejiler, baglam)
+                else:
+                    koseler, kazanan, denemeler = self.stratejileri_sirayla(kucuk, stratejiler, baglam)
+        
+        if istasyon and kazanan != 'istasyon':
+            if koseler is not None:
+                self.istasyon_onbellegi.kaydet(istasyon, koseler, boyut)
+            else:
+                self.istasyon_onbellegi.unut(istasyon)
+        
+        # Bağlamlı okumada istatistik okuma sonunda okuma_calistir'da kaydedilir
+        if baglam is None and self.strateji_istatistikleri is not None and denemeler:
+            self.strateji_istatistikleri.kaydet(self.sablon, cihaz, denemeler)
+        if baglam is not None:
+            baglam.ara_sonuclar['strateji'] = kazanan
+            baglam.ara_sonuclar['strateji_denemeleri'] = denemeler
+            baglam.bildir('sheet_found', strategy=kazanan, detected=koseler is not None)
         
-        # Strateji 6: Hough Lines dikdörtgen tespiti
-        print("  [6/6] Hough Lines tespiti...")
-        koseler = self.hough_lines_dikdortgen_bul(goruntu)
         if koseler is not None:
-            print("  ✓ Hough Lines tespiti başarılı!")
-            return self.perspektif_donustur(orijinal, koseler)
+            with self.asama(baglam, 'refine'):
+                koseler = self.koseleri_incelt(orijinal, koseler, olcek)
+            return self.perspektif_donustur(orijinal, koseler, ayarlar['iyilestirme'], baglam)
+        
+        tespit_logger.warning("Tüm yöntemler başarısız, orijinal boyutlandırılıyor...")
+        return self.yeniden_boyutlandir(orijinal, ayarlar['iyilestirme'], baglam)
+    
+    # İstasyonun önbellekteki dörtgenini tespit seviyesindeki görüntüde kenar desteğiyle
+    # doğrular. Kağıt yerinden oynamışsa ya da kayıt yoksa None döner (tam arama yapılır).
+    def istasyon_dortgeni(self, goruntu: np.ndarray, istasyon: str) -> Optional[np.ndarray]:
+        koseler = self.istasyon_onbellegi.al(istasyon, (goruntu.shape[1], goruntu.shape[0]))
+        if koseler is None:
+            return None
+        
+        skor = dortgen_skoru(koseler, kenar_haritasi(goruntu))
+        isabet = skor >= self.istasyon_onbellegi.esik
+        self.istasyon_onbellegi.say(istasyon, isabet)
+        tespit_logger.debug("İstasyon %s dörtgeni: skor %.3f (%s)", istasyon, skor,
+                            "kullanılıyor" if isabet else "tam arama")
+        return koseler if isabet else None
+    
+    # Tespit seviyesindeki görüntüyü şablonun referans görüntüsüne hizalar; bulunan sayfa
+    # köşeleri kenar tabanlı stratejilerin köşeleriyle aynı yoldan (incelt + dönüştür) geçer.
+    def sablona_hizala(self, goruntu: np.ndarray,
+                       baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
+        try:
+            koseler, inlier = self.hizalayici.hizala(goruntu)
+        except cv2.error as e:
+            tespit_logger.warning("Şablon hizalama hatası: %s", e)
+            return None
+        
+        if koseler is None:
+            tespit_logger.debug("Şablon hizalama başarısız (%d inlier), stratejilere geçiliyor", inlier)
+            return None
+        
+        tespit_logger.debug("Şablon hizalama başarılı (%d inlier)", inlier)
+        if self.debug_aktif(baglam):
+            debug_img = goruntu.copy()
+            cv2.polylines(debug_img, [np.int32(koseler)], True, (0, 255, 0), 3)
+            self.debug_yaz(baglam, "1_sablon_hizalama", debug_img)
+        return koseler
+    
+    # Tek stratejiyi çalıştırır ve süresini ölçer: (köşeler, saniye)
+    def strateji_calistir(self, metot_adi: str, goruntu: np.ndarray,
+                          baglam: Optional[OkumaBaglami] = None) -> Tuple[Optional[np.ndarray], float]:
+        baslangic = time.perf_counter()
+        koseler = getattr(self, metot_adi)(goruntu, baglam)
+        return koseler, time.perf_counter() - baslangic
+    
+    # Stratejileri sırayla dener, ilk başarılı olanın köşelerini döner:
+    # (köşeler, metot adı, [(metot adı, başarılı mı, süre), ...])
+    def stratejileri_sirayla(self, goruntu: np.ndarray, stratejiler: List[Tuple[str, str]],
+                             baglam: Optional[OkumaBaglami] = None
+                             ) -> Tuple[Optional[np.ndarray], Optional[str], List[Tuple[str, bool, float]]]:
+        denemeler = []
+        toplam = len(stratejiler)
+        for i, (metot_adi, aciklama) in enumerate(stratejiler, 1):
+            # Uzun yedek zincirinde iptal her strateji öncesi kontrol edilir
+            if baglam is not None:
+                baglam.iptal_kontrol()
+            tespit_logger.debug("[%s/%s] %s...", i, toplam, aciklama)
+            koseler, sure = self.strateji_calistir(metot_adi, goruntu, baglam)
+            denemeler.append((metot_adi, koseler is not None, sure))
+            if koseler is not None:
+                tespit_logger.debug("%s başarılı!", aciklama)
+                return koseler, metot_adi, denemeler
+        return None, None, denemeler
+    
+    # Stratejileri ortak havuzda eşzamanlı çalıştırır. Süre dolana ya da hepsi bitene kadar
+    # gelen dörtgenlerden en yüksek skorlu olanı seçer; başlamamış olanları iptal eder.
+    # Skoru 0 olan dörtgenler de (küçük ya da oranı uymayan) sıralı denemedeki gibi kabul
+    # edilir, sadece daha iyisi yoksa; eşit skorda strateji sırasında önce gelen kazanır.
+    def stratejileri_yaristir(self, goruntu: np.ndarray, stratejiler: List[Tuple[str, str]],
+                              baglam: Optional[OkumaBaglami] = None
+                              ) -> Tuple[Optional[np.ndarray], Optional[str], List[Tuple[str, bool, float]]]:
+        havuz = _yaris_havuzu_al()
+        yaris_baglami = YarisBaglami(baglam) if baglam is not None else None
+        sira = {metot_adi: i for i, (metot_adi, _) in enumerate(stratejiler)}
+        
+        tespit_logger.debug("Yarış modu: %s strateji eşzamanlı çalışıyor...", len(stratejiler))
+        _yaris_yuku_degistir(len(stratejiler))
+        gorevler = {}
+        for metot_adi, aciklama in stratejiler:
+            gorev = havuz.submit(self.strateji_calistir, metot_adi, goruntu, yaris_baglami)
+            gorev.add_done_callback(lambda _: _yaris_yuku_degistir(-1))
+            gorevler[gorev] = (metot_adi, aciklama)
+        
+        son_an = time.monotonic() + self.yaris_suresi
+        # Skorlama için kenar haritası, stratejiler çalışırken hazırlanır
+        kenarlar = kenar_haritasi(goruntu)
+        bekleyen = set(gorevler)
+        en_iyi, en_iyi_skor, kazanan = None, -1.0, None
+        denemeler = []
+        
+        while bekleyen:
+            kalan = son_an - time.monotonic()
+            if kalan <= 0:
+                break
+            biten, bekleyen = wait(bekleyen, timeout=kalan, return_when=FIRST_COMPLETED)
+            for gorev in biten:
+                metot_adi, aciklama = gorevler[gorev]
+                try:
+                    koseler, sure = gorev.result()
+                except Exception as e:
+                    tespit_logger.warning("%s hatası: %s", aciklama, e)
+                    continue
+                denemeler.append((metot_adi, koseler is not None, sure))
+                if koseler is None:
+                    continue
+                skor = dortgen_skoru(koseler, kenarlar)
+                tespit_logger.debug("%s: skor %.3f", aciklama, skor)
+                if (skor, -sira[metot_adi]) > (en_iyi_skor, -sira.get(kazanan, 0)):
+                    en_iyi, en_iyi_skor, kazanan = koseler, skor, metot_adi
+        
+        # Süre dolduysa kalanlar iptal edilir. Çalışmaya başlamış olanların sonucu yok sayılır
+        # ve bundan sonra bağlama yazamazlar.
+        if yaris_baglami is not None:
+            yaris_baglami.bitir()
+        for gorev in bekleyen:
+            gorev.cancel()
+        if bekleyen:
+            tespit_logger.debug("Süre doldu, %s strateji beklenmedi", len(bekleyen))
+        
+        if kazanan is not None:
+            tespit_logger.debug("Yarışı kazanan: %s", dict(stratejiler)[kazanan])
+        return en_iyi, kazanan, denemeler
+    
+    # Tespit için piramit seviyesi: uzun kenarı uzun_kenar olacak şekilde küçültür.
+    # (küçük görüntü, ölçek) döner; ölçek 1.0 ise görüntü zaten yeterince küçüktür.
+    def tespit_seviyesi(self, goruntu: np.ndarray, uzun_kenar: int = 1000) -> Tuple[np.ndarray, float]:
+        h, w = goruntu.shape[:2]
+        olcek = uzun_kenar / max(h, w)
+        
+        if olcek >= 1.0:
+            return goruntu, 1.0
+        
+        kucuk = cv2.resize(goruntu, (int(round(w * olcek)), int(round(h * olcek))),
+                           interpolation=cv2.INTER_AREA)
+        return kucuk, olcek
+    
+    # Küçük seviyede bulunan köşeleri tam çözünürlüğe taşır ve her köşeyi
+    # çevresindeki küçük bir pencerede cornerSubPix ile inceltir.
+    def koseleri_incelt(self, goruntu: np.ndarray, koseler: np.ndarray, olcek: float) -> np.ndarray:
+        koseler = koseler.astype(np.float32) / olcek
+        
+        if olcek >= 1.0:
+            return koseler
+        
+        h, w = goruntu.shape[:2]
+        # Arama yarıçapı: küçük seviyedeki morfolojik kaymaları (~6 piksel) kapsar
+        yaricap = max(5, int(round(6.0 / olcek)))
+        kriter = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.01)
+        
+        inceltilmis = koseler.copy()
+        for i, (x, y) in enumerate(koseler):
+            # Sadece köşe çevresindeki yamayı griye çevir
+            x1, y1 = max(0, int(x) - 3 * yaricap), max(0, int(y) - 3 * yaricap)
+            x2, y2 = min(w, int(x) + 3 * yaricap + 1), min(h, int(y) + 3 * yaricap + 1)
+            yama = goruntu[y1:y2, x1:x2]
+            
+            # Pencere yamaya sığmıyorsa (görüntü kenarı) ölçeklenmiş köşe kalır
+            if yama.shape[0] < 2 * yaricap + 5 or yama.shape[1] < 2 * yaricap + 5:
+                continue
+            
+            gri = cv2.cvtColor(yama, cv2.COLOR_BGR2GRAY) if len(yama.shape) == 3 else yama
+            nokta = np.array([[[x - x1, y - y1]]], dtype=np.float32)
+            
+            try:
+                cv2.cornerSubPix(gri, nokta, (yaricap, yaricap), (-1, -1), kriter)
+            except cv2.error:
+                continue
+            
+            yeni_x, yeni_y = nokta[0, 0, 0] + x1, nokta[0, 0, 1] + y1
+            # Pencereden kaçan sonuçlara güvenme
+            if abs(yeni_x - x) <= yaricap and abs(yeni_y - y) <= yaricap:
+                inceltilmis[i] = (yeni_x, yeni_y)
         
-        print("  ✗ Tüm yöntemler başarısız, orijinal boyutlandırılıyor...")
-        return self.yeniden_boyutlandir(orijinal)
+        return inceltilmis
     
     # LAB renk uzayı tabanlı kağıt tespiti - aydınlatmadan bağımsız
-    def lab_kagit_tespit(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    def lab_kagit_tespit(self, goruntu: np.ndarray,
+                         baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
         try:
             h, w = goruntu.shape[:2]
             
@@ -265,8 +1045,8 @@ class OptikFormOkuyucu:
             # Boşlukları doldur
             combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel_large, iterations=3)
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1a_lab_mask.jpg", combined_mask)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1a_lab_mask", combined_mask)
             
             # Konturları bul
             konturlar, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -288,10 +1068,10 @@ class OptikFormOkuyucu:
             epsilon = 0.02 * cv2.arcLength(hull, True)
             yaklasik = cv2.approxPolyDP(hull, epsilon, True)
             
-            if self.debug_mode:
+            if self.debug_aktif(baglam):
                 debug_img = goruntu.copy()
                 cv2.drawContours(debug_img, [yaklasik], -1, (0, 255, 0), 3)
-                cv2.imwrite(f"{self.debug_dir}/1b_lab_kontur.jpg", debug_img)
+                self.debug_yaz(baglam, "1b_lab_kontur", debug_img)
             
             if len(yaklasik) == 4:
                 return self.koseler_sirala(yaklasik.reshape(4, 2))
@@ -311,11 +1091,12 @@ class OptikFormOkuyucu:
             return self.koseler_sirala(box.astype(np.float32))
             
         except Exception as e:
-            print(f"   LAB tespit hatası: {e}")
+            tespit_logger.warning("LAB tespit hatası: %s", e)
             return None
     
     # Saturation (doygunluk) tabanlı kağıt tespiti
-    def saturation_kagit_tespit(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    def saturation_kagit_tespit(self, goruntu: np.ndarray,
+                                baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
         try:
             h, w = goruntu.shape[:2]
             
@@ -344,8 +1125,8 @@ class OptikFormOkuyucu:
             kagit_mask = cv2.morphologyEx(kagit_mask, cv2.MORPH_CLOSE, kernel, iterations=3)
             kagit_mask = cv2.morphologyEx(kagit_mask, cv2.MORPH_OPEN, kernel, iterations=2)
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1a_saturation_mask.jpg", kagit_mask)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1a_saturation_mask", kagit_mask)
             
             # Konturları bul
             konturlar, _ = cv2.findContours(kagit_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -382,11 +1163,12 @@ class OptikFormOkuyucu:
             return self.koseler_sirala(box.astype(np.float32))
             
         except Exception as e:
-            print(f"   Saturation tespit hatası: {e}")
+            tespit_logger.warning("Saturation tespit hatası: %s", e)
             return None
     
     # Hough Lines ile dikdörtgen tespiti
-    def hough_lines_dikdortgen_bul(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    def hough_lines_dikdortgen_bul(self, goruntu: np.ndarray,
+                                   baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
         try:
             h, w = goruntu.shape[:2]
             
@@ -408,8 +1190,8 @@ class OptikFormOkuyucu:
             kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
             edges = cv2.dilate(edges, kernel, iterations=2)
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1a_hough_edges.jpg", edges)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1a_hough_edges", edges)
             
             # Hough Lines ile çizgi tespiti
             lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=100, 
@@ -489,19 +1271,20 @@ class OptikFormOkuyucu:
                 if oran < 1.2 or oran > 1.8:
                     return None
             
-            if self.debug_mode:
+            if self.debug_aktif(baglam):
                 debug_img = goruntu.copy()
                 cv2.polylines(debug_img, [koseler.astype(np.int32)], True, (0, 255, 0), 3)
-                cv2.imwrite(f"{self.debug_dir}/1b_hough_rect.jpg", debug_img)
+                self.debug_yaz(baglam, "1b_hough_rect", debug_img)
             
             return self.koseler_sirala(koseler)
             
         except Exception as e:
-            print(f"   Hough Lines hatası: {e}")
+            tespit_logger.warning("Hough Lines hatası: %s", e)
             return None
     
     # Gradient magnitude tabanlı kenar tespiti - açık arka planlarda etkili
-    def gradient_kenar_tespit(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    def gradient_kenar_tespit(self, goruntu: np.ndarray,
+                              baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
         try:
             h, w = goruntu.shape[:2]
             
@@ -532,8 +1315,8 @@ class OptikFormOkuyucu:
             edges = cv2.dilate(edges, kernel, iterations=2)
             edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=3)
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1a_gradient_edges.jpg", edges)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1a_gradient_edges", edges)
             
             # Konturları bul
             konturlar, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -567,21 +1350,22 @@ class OptikFormOkuyucu:
                     if 1.2 < oran < 1.8:
                         koseler = self.koseler_sirala(box.astype(np.float32))
                         
-                        if self.debug_mode:
+                        if self.debug_aktif(baglam):
                             debug_img = goruntu.copy()
                             cv2.drawContours(debug_img, [np.int32(koseler)], -1, (0, 255, 0), 3)
-                            cv2.imwrite(f"{self.debug_dir}/1b_gradient_rect.jpg", debug_img)
+                            self.debug_yaz(baglam, "1b_gradient_rect", debug_img)
                         
                         return koseler
             
             return None
             
         except Exception as e:
-            print(f"   Gradient tespit hatası: {e}")
+            tespit_logger.warning("Gradient tespit hatası: %s", e)
             return None
     
     # Geliştirilmiş beyaz kağıt tespiti - dinamik threshold ve çoklu strateji
-    def beyaz_kagit_bul(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    def beyaz_kagit_bul(self, goruntu: np.ndarray,
+                        baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
        
         try:
             h, w = goruntu.shape[:2]
@@ -673,17 +1457,17 @@ class OptikFormOkuyucu:
             
             en_buyuk, hull, kombine = best_result
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1a_beyaz_maske.jpg", kombine)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1a_beyaz_maske", kombine)
             
             # Poligon yaklaşımı ile 4 köşe bul
             epsilon = 0.02 * cv2.arcLength(hull, True)
             yaklasik = cv2.approxPolyDP(hull, epsilon, True)
             
-            if self.debug_mode:
+            if self.debug_aktif(baglam):
                 debug_img = goruntu.copy()
                 cv2.drawContours(debug_img, [yaklasik], -1, (0, 255, 0), 3)
-                cv2.imwrite(f"{self.debug_dir}/1b_kontur_beyaz.jpg", debug_img)
+                self.debug_yaz(baglam, "1b_kontur_beyaz", debug_img)
             
             if len(yaklasik) == 4:
                 koseler = self.koseler_sirala(yaklasik.reshape(4, 2))
@@ -700,19 +1484,20 @@ class OptikFormOkuyucu:
             box = cv2.boxPoints(rect)
             box = np.int32(box)
             
-            if self.debug_mode:
+            if self.debug_aktif(baglam):
                 debug_img = goruntu.copy()
                 cv2.drawContours(debug_img, [box], -1, (255, 0, 0), 3)
-                cv2.imwrite(f"{self.debug_dir}/1c_minrect.jpg", debug_img)
+                self.debug_yaz(baglam, "1c_minrect", debug_img)
             
             return self.koseler_sirala(box.astype(np.float32))
             
         except Exception as e:
-            print(f"   Beyaz kağıt hatası: {e}")
+            tespit_logger.warning("Beyaz kağıt hatası: %s", e)
             return None
     
     # Geliştirilmiş Canny kenar tespiti ile dikdörtgen bulur
-    def kenar_ile_dikdortgen_bul(self, goruntu: np.ndarray) -> Optional[np.ndarray]:
+    def kenar_ile_dikdortgen_bul(self, goruntu: np.ndarray,
+                                 baglam: Optional[OkumaBaglami] = None) -> Optional[np.ndarray]:
         try:
             h, w = goruntu.shape[:2]
 
@@ -752,8 +1537,8 @@ class OptikFormOkuyucu:
                 kernel_close = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
                 kenarlar = cv2.morphologyEx(kenarlar, cv2.MORPH_CLOSE, kernel_close, iterations=2)
                 
-                if self.debug_mode:
-                    cv2.imwrite(f"{self.debug_dir}/1d_kenar_{low}_{high}.jpg", kenarlar)
+                if self.debug_aktif(baglam):
+                    self.debug_yaz(baglam, f"1d_kenar_{low}_{high}", kenarlar)
                 
                 # Konturları bul
                 konturlar, _ = cv2.findContours(kenarlar, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -811,20 +1596,22 @@ class OptikFormOkuyucu:
                                     best_result = sirali
             
             if best_result is not None:
-                if self.debug_mode:
+                if self.debug_aktif(baglam):
                     debug_img = goruntu.copy()
                     cv2.drawContours(debug_img, [np.int32(best_result)], -1, (0, 255, 0), 3)
-                    cv2.imwrite(f"{self.debug_dir}/1e_dikdortgen.jpg", debug_img)
+                    self.debug_yaz(baglam, "1e_dikdortgen", debug_img)
                 
                 return best_result
             
             return None
             
         except Exception as e:
-            print(f"   Kenar tespiti hatası: {e}")
+            tespit_logger.warning("Kenar tespiti hatası: %s", e)
             return None
     
-    def perspektif_donustur(self, goruntu: np.ndarray, koseler: np.ndarray) -> np.ndarray:
+    def perspektif_donustur(self, goruntu: np.ndarray, koseler: np.ndarray,
+                            iyilestirme: str = 'nlm',
+                            baglam: Optional[OkumaBaglami] = None) -> np.ndarray:
        
         genislik = 1600
         yukseklik = 2264
@@ -836,31 +1623,41 @@ class OptikFormOkuyucu:
             [0, yukseklik - 1]
         ], dtype=np.float32)
         
-        matris = cv2.getPerspectiveTransform(koseler.astype(np.float32), hedef)
-        
-        duzeltilmis = cv2.warpPerspective(goruntu, matris, (genislik, yukseklik), 
-                                          flags=cv2.INTER_CUBIC)
+        with self.asama(baglam, 'warp'):
+            matris = cv2.getPerspectiveTransform(koseler.astype(np.float32), hedef)
+            
+            duzeltilmis = cv2.warpPerspective(goruntu, matris, (genislik, yukseklik), 
+                                              flags=cv2.INTER_CUBIC)
         
-        if self.debug_mode:
+        if self.debug_aktif(baglam):
             debug_img = goruntu.copy()
             for i, kose in enumerate(koseler):
                 cv2.circle(debug_img, (int(kose[0]), int(kose[1])), 10, (0, 255, 0), -1)
                 cv2.putText(debug_img, str(i), (int(kose[0])+15, int(kose[1])), 
                            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.imwrite(f"{self.debug_dir}/1c_koseler.jpg", debug_img)
-            cv2.imwrite(f"{self.debug_dir}/1d_perspektif_ham.jpg", duzeltilmis)
+            self.debug_yaz(baglam, "1c_koseler", debug_img)
+            self.debug_yaz(baglam, "1d_perspektif_ham", duzeltilmis)
         
-        duzeltilmis = self.perspektif_sonrasi_iyilestir_hafif(duzeltilmis)
+        with self.asama(baglam, 'enhance'):
+            duzeltilmis = self.perspektif_sonrasi_iyilestir_hafif(duzeltilmis, iyilestirme, baglam)
         
-        if self.debug_mode:
-            cv2.imwrite(f"{self.debug_dir}/1d_perspektif.jpg", duzeltilmis)
+        if self.debug_aktif(baglam):
+            self.debug_yaz(baglam, "1d_perspektif", duzeltilmis)
         
         return duzeltilmis
     
     
     # Perspektif düzeltme sonrası hafif iyileştirme
     # NOT: Daire okumayı bozmamak için çok agresif işlemler yapılmaz
-    def perspektif_sonrasi_iyilestir_hafif(self, goruntu: np.ndarray) -> np.ndarray:
+    # mod: 'yok' (dokunma), 'gri' (tek kanal NLM, okuyucular zaten griyle çalışır), 'nlm' (3 kanal)
+    def perspektif_sonrasi_iyilestir_hafif(self, goruntu: np.ndarray, mod: str = 'nlm',
+                                           baglam: Optional[OkumaBaglami] = None) -> np.ndarray:
+        
+        if mod == 'yok':
+            return goruntu
+        
+        if mod == 'gri' and len(goruntu.shape) == 3:
+            goruntu = cv2.cvtColor(goruntu, cv2.COLOR_BGR2GRAY)
         
         if len(goruntu.shape) == 3:
             canals = cv2.split(goruntu)
@@ -880,8 +1677,8 @@ class OptikFormOkuyucu:
             # Kanalları birleştir
             result = cv2.merge(processed_canals)
             
-            if self.debug_mode:
-                cv2.imwrite(f"{self.debug_dir}/1e_renkli_iyilestirilmis.jpg", result)
+            if self.debug_aktif(baglam):
+                self.debug_yaz(baglam, "1e_renkli_iyilestirilmis", result)
         else:
             # Gri tonlama için
             denoised = cv2.fastNlMeansDenoising(goruntu, None, h=5, templateWindowSize=7, searchWindowSize=21)
@@ -892,11 +1689,13 @@ class OptikFormOkuyucu:
         return result
     
     # perspektif bulunamazsa sadece yeniden boyutlandır.
-    def yeniden_boyutlandir(self, goruntu: np.ndarray) -> np.ndarray:
+    def yeniden_boyutlandir(self, goruntu: np.ndarray, iyilestirme: str = 'nlm',
+                            baglam: Optional[OkumaBaglami] = None) -> np.ndarray:
         genislik = 1600
         yukseklik = 2264
         resized = cv2.resize(goruntu, (genislik, yukseklik), interpolation=cv2.INTER_CUBIC)
-        return self.perspektif_sonrasi_iyilestir_hafif(resized)
+        with self.asama(baglam, 'enhance'):
+            return self.perspektif_sonrasi_iyilestir_hafif(resized, iyilestirme, baglam)
     
     def koseler_sirala(self, noktalar: np.ndarray) -> np.ndarray:
         
@@ -935,17 +1734,13 @@ class OptikFormOkuyucu:
         return sirali
     
     
-    def ad_soyad_kutularini_bul(self, img: np.ndarray) -> List[Dict]:
+    def ad_soyad_kutularini_bul(self, img: np.ndarray, analiz: Optional[SayfaAnalizi] = None,
+                                baglam: Optional[OkumaBaglami] = None) -> List[Dict]:
        
         h, w = img.shape[:2]
         
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-        
-        thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                        cv2.THRESH_BINARY_INV, 15, 5)
-        
-        contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        # Gri/eşik/kontur geçişleri sayfa başına bir kez yapılır
+        analiz = analiz or SayfaAnalizi(img)
         
         min_box_width = w * 0.10
         max_box_width = w * 0.25
@@ -953,12 +1748,8 @@ class OptikFormOkuyucu:
         
         candidates = []
         
-        for cnt in contours:
-            area = cv2.contourArea(cnt)
-            if area < 3000:
-                continue
-            
-            x, y, bw, bh = cv2.boundingRect(cnt)
+        for aday in analiz.kutu_adaylari:
+            x, bw, bh = aday['x'], aday['w'], aday['h']
             aspect = bw / bh if bh > 0 else 999
             
             if x > w * 0.35:  
@@ -970,11 +1761,9 @@ class OptikFormOkuyucu:
             if bw < min_box_width or bw > max_box_width:
                 continue
             
-            candidates.append({
-                'x': x, 'y': y, 'w': bw, 'h': bh, 'area': area
-            })
+            candidates.append(dict(aday))
         
-        print(f"Ad/Soyad kutu adayı sayısı: {len(candidates)}")
+        logger.debug("Ad/Soyad kutu adayı sayısı: %s", len(candidates))
         
         unique_boxes = []
         for box in candidates:
@@ -993,7 +1782,7 @@ class OptikFormOkuyucu:
             if not is_duplicate:
                 unique_boxes.append(box)
         
-        print(f"Eşsiz Ad/Soyad kutu sayısı: {len(unique_boxes)}")
+        logger.debug("Eşsiz Ad/Soyad kutu sayısı: %s", len(unique_boxes))
         
         filtered_boxes = []
         
@@ -1018,17 +1807,17 @@ class OptikFormOkuyucu:
                 else:
                     filtered_boxes = [box2, box1]
                 
-                print(f"Ad/Soyad çifti bulundu")
+                logger.debug("Ad/Soyad çifti bulundu")
                 break
             
             if filtered_boxes:
                 break
         
-        print(f"Filtrelenmiş Ad/Soyad kutu sayısı: {len(filtered_boxes)}")
+        logger.debug("Filtrelenmiş Ad/Soyad kutu sayısı: %s", len(filtered_boxes))
         for i, box in enumerate(filtered_boxes[:2]):
-            print(f" Kutu {i+1} ({'Ad' if i==0 else 'Soyad'}): x={box['x']}, y={box['y']}, w={box['w']}, h={box['h']}")
+            logger.debug("Kutu %s (%s): x=%s, y=%s, w=%s, h=%s", i+1, 'Ad' if i==0 else 'Soyad', box['x'], box['y'], box['w'], box['h'])
         
-        if self.debug_mode and len(filtered_boxes) >= 2:
+        if self.debug_aktif(baglam) and len(filtered_boxes) >= 2:
             debug_img = img.copy()
             labels = ['AD', 'SOYAD']
             colors = [(0,255,0), (255,0,0)]
@@ -1037,21 +1826,17 @@ class OptikFormOkuyucu:
                              (box['x']+box['w'], box['y']+box['h']), colors[i], 2)
                 cv2.putText(debug_img, labels[i], (box['x'], box['y']-5),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, colors[i], 2)
-            cv2.imwrite(f"{self.debug_dir}/auto_ad_soyad_boxes.jpg", debug_img)
+            self.debug_yaz(baglam, "auto_ad_soyad_boxes", debug_img)
         
         return filtered_boxes[:2] if len(filtered_boxes) >= 2 else []
     
-    def cevap_kutularini_bul(self, img: np.ndarray) -> List[Dict]:
+    def cevap_kutularini_bul(self, img: np.ndarray, analiz: Optional[SayfaAnalizi] = None,
+                             baglam: Optional[OkumaBaglami] = None) -> List[Dict]:
 
         h, w = img.shape[:2]
         
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-        
-        thresh = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                        cv2.THRESH_BINARY_INV, 15, 5)
-        
-        contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        # Gri/eşik/kontur geçişleri sayfa başına bir kez yapılır
+        analiz = analiz or SayfaAnalizi(img)
         
         min_box_width = w * 0.06
         max_box_width = w * 0.22
@@ -1059,12 +1844,8 @@ class OptikFormOkuyucu:
         
         candidates = []
         
-        for cnt in contours:
-            area = cv2.contourArea(cnt)
-            if area < 3000:
-                continue
-            
-            x, y, bw, bh = cv2.boundingRect(cnt)
+        for aday in analiz.kutu_adaylari:
+            x, bw, bh = aday['x'], aday['w'], aday['h']
             aspect = bw / bh if bh > 0 else 999
             
             if x < w * 0.25:  
@@ -1076,13 +1857,11 @@ class OptikFormOkuyucu:
             if bw < min_box_width or bw > max_box_width:
                 continue
             
-            candidates.append({
-                'x': x, 'y': y, 'w': bw, 'h': bh, 'area': area
-            })
+            candidates.append(dict(aday))
         
-        print(f"Kutu adayı sayısı: {len(candidates)}")
+        logger.debug("Kutu adayı sayısı: %s", len(candidates))
         for i, box in enumerate(candidates):
-            print(f"Aday {i+1}: x={box['x']}, y={box['y']}, w={box['w']}, h={box['h']}")
+            logger.debug("Aday %s: x=%s, y=%s, w=%s, h=%s", i+1, box['x'], box['y'], box['w'], box['h'])
         
         unique_boxes = []
         for box in candidates:
@@ -1101,7 +1880,7 @@ class OptikFormOkuyucu:
             if not is_duplicate:
                 unique_boxes.append(box)
         
-        print(f"Eşsiz kutu sayısı: {len(unique_boxes)}")
+        logger.debug("Eşsiz kutu sayısı: %s", len(unique_boxes))
         
         # x'e göre sırala soldan sağa türkçe, matematik, fen, sosyal
         unique_boxes.sort(key=lambda b: b['x'])
@@ -1121,11 +1900,11 @@ class OptikFormOkuyucu:
             if not too_close:
                 filtered_boxes.append(box)
         
-        print(f"Filtrelenmiş kutu sayısı: {len(filtered_boxes)}")
+        logger.debug("Filtrelenmiş kutu sayısı: %s", len(filtered_boxes))
         for i, box in enumerate(filtered_boxes[:4]):
-            print(f"Kutu {i+1}: x={box['x']}, w={box['w']}")
+            logger.debug("Kutu %s: x=%s, w=%s", i+1, box['x'], box['w'])
         
-        if self.debug_mode and len(filtered_boxes) >= 4:
+        if self.debug_aktif(baglam) and len(filtered_boxes) >= 4:
             debug_img = img.copy()
             ders_isimleri = ['Turkce', 'Mat', 'Sosyal', 'Fen']
             colors = [(0,255,0), (255,0,0), (0,0,255), (255,255,0)]
@@ -1134,18 +1913,21 @@ class OptikFormOkuyucu:
                              (box['x']+box['w'], box['y']+box['h']), colors[i], 2)
                 cv2.putText(debug_img, ders_isimleri[i], (box['x'], box['y']-5),
                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, colors[i], 2)
-            cv2.imwrite(f"{self.debug_dir}/auto_boxes.jpg", debug_img)
+            self.debug_yaz(baglam, "auto_boxes", debug_img)
         
         return filtered_boxes[:4] if len(filtered_boxes) >= 4 else []
     
-    def bolgeleri_cikar_renkli(self, renkli: np.ndarray) -> Dict:
+    def bolgeleri_cikar_renkli(self, renkli: np.ndarray, analiz: Optional[SayfaAnalizi] = None,
+                               baglam: Optional[OkumaBaglami] = None) -> Dict:
         h, w = renkli.shape[:2]
         bolgeler = {}
+        analiz = analiz or SayfaAnalizi(renkli)
         
-        ad_soyad_kutular = self.ad_soyad_kutularini_bul(renkli)
+        with self.asama(baglam, 'boxes'):
+            ad_soyad_kutular = self.ad_soyad_kutularini_bul(renkli, analiz, baglam)
         
         if len(ad_soyad_kutular) == 2:
-            print(" Ad/Soyad kutuları otomatik tespit edildi")
+            logger.debug("Ad/Soyad kutuları otomatik tespit edildi")
             ad_soyad_isimleri = ['ad', 'soyad']
             
             for i, kutu in enumerate(ad_soyad_kutular):
@@ -1156,12 +1938,12 @@ class OptikFormOkuyucu:
                 y += kirpma
                 bh -= kirpma
                 
-                bolgeler[bolge_adi] = renkli[y:y+bh, x:x+bw].copy()
+                bolgeler[bolge_adi] = analiz.bolge_ekle(bolge_adi, x, y, x + bw, y + bh)
                 
-                if self.debug_mode:
-                    cv2.imwrite(f"{self.debug_dir}/bolge_{bolge_adi}.jpg", bolgeler[bolge_adi])
+                if self.debug_aktif(baglam):
+                    self.debug_yaz(baglam, f"bolge_{bolge_adi}", bolgeler[bolge_adi])
         else:
-            print(f"Ad/Soyad otomatik tespit başarısız, sabit koordinat kullanılıyor")
+            logger.warning("Ad/Soyad otomatik tespit başarısız, sabit koordinat kullanılıyor")
             # sabit koordinat kullan
             ad_soyad_oranlari = {
                 'ad': {'x1': 0.080, 'y1': 0.092, 'x2': 0.28, 'y2': 0.500},
@@ -1180,16 +1962,17 @@ class OptikFormOkuyucu:
                 y1 += kirpma
                 y2 = y1 + (bh - kirpma)
                 
-                bolgeler[bolge_adi] = renkli[y1:y2, x1:x2].copy()
+                bolgeler[bolge_adi] = analiz.bolge_ekle(bolge_adi, x1, y1, x2, y2)
                 
-                if self.debug_mode:
-                    cv2.imwrite(f"{self.debug_dir}/bolge_{bolge_adi}.jpg", bolgeler[bolge_adi])
+                if self.debug_aktif(baglam):
+                    self.debug_yaz(baglam, f"bolge_{bolge_adi}", bolgeler[bolge_adi])
         
         # cevap kutularını tespit et
-        kutular = self.cevap_kutularini_bul(renkli)
+        with self.asama(baglam, 'boxes'):
+            kutular = self.cevap_kutularini_bul(renkli, analiz, baglam)
         
         if len(kutular) == 4:
-            print("4 cevap kutusu otomatik tespit edildi")
+            logger.debug("4 cevap kutusu otomatik tespit edildi")
             ders_isimleri = ['turkce', 'matematik', 'fen', 'sosyal']
             
             for i, kutu in enumerate(kutular):
@@ -1200,15 +1983,15 @@ class OptikFormOkuyucu:
                 y += kirpma
                 bh -= kirpma
                 
-                bolgeler[ders] = renkli[y:y+bh, x:x+bw].copy()
+                bolgeler[ders] = analiz.bolge_ekle(ders, x, y, x + bw, y + bh)
                 
-                if self.debug_mode:
-                    cv2.imwrite(f"{self.debug_dir}/bolge_{ders}.jpg", bolgeler[ders])
+                if self.debug_aktif(baglam):
+                    self.debug_yaz(baglam, f"bolge_{ders}", bolgeler[ders])
         
         else:
-            print(f"Otomatik tespit başarısız, sabit koordinat kullanılıyor")
+            logger.warning("Otomatik tespit başarısız, sabit koordinat kullanılıyor")
             
-            if self.debug_mode:
+            if self.debug_aktif(baglam):
                 debug_all = renkli.copy()
             
             for bolge_adi, oranlar in self.bolge_oranlari.items():
@@ -1217,11 +2000,11 @@ class OptikFormOkuyucu:
                 x2 = int(w * oranlar['x2'])
                 y2 = int(h * oranlar['y2'])
                 
-                bolge_renkli = renkli[y1:y2, x1:x2].copy()
+                bolge_renkli = analiz.bolge_ekle(bolge_adi, x1, y1, x2, y2)
                 bolgeler[bolge_adi] = bolge_renkli
                 
-                if self.debug_mode:
-                    cv2.imwrite(f"{self.debug_dir}/bolge_{bolge_adi}.jpg", bolge_renkli)
+                if self.debug_aktif(baglam):
+                    self.debug_yaz(baglam, f"bolge_{bolge_adi}", bolge_renkli)
                     renk = (0, 255, 0)
                     cv2.rectangle(debug_all, (x1, y1), (x2, y2), renk, 2)
                     cv2.putText(debug_all, bolge_adi.upper(), (x1 + 5, y1 + 20),
@@ -1229,19 +2012,30 @@ class OptikFormOkuyucu:
         
         return bolgeler
     
-    def cevaplari_oku_renkli(self, bolge_renkli: np.ndarray, soru_sayisi: int = 40, ders_adi: str = "") -> Dict[int, str]:
-        cevaplar = {}
-        
+    # bolge_gri / bolge_esik verilirse (SayfaAnalizi kırpıntıları) bölge tekrar griye çevrilmez
+    # guvenler verilirse her sorunun okuma güveni (0..1) bu sözlüğe yazılır
+    def cevaplari_oku_renkli(self, bolge_renkli: np.ndarray, soru_sayisi: int = 40, ders_adi: str = "",
+                             bolge_gri: Optional[np.ndarray] = None,
+                             bolge_esik: Optional[np.ndarray] = None,
+                             baglam: Optional[OkumaBaglami] = None) -> CevapDizisi:
         if bolge_renkli is None or bolge_renkli.size == 0:
-            return {i: 'BOŞ' for i in range(1, soru_sayisi + 1)}
+            return CevapDizisi.bos(soru_sayisi)
         
         h, w = bolge_renkli.shape[:2]
         
         # Gri tonlama
-        gri = cv2.cvtColor(bolge_renkli, cv2.COLOR_BGR2GRAY)
+        gri = bolge_gri if bolge_gri is not None else cv2.cvtColor(bolge_renkli, cv2.COLOR_BGR2GRAY)
+        
+        # Önce şablon kafesi - hizalama kontrolü geçmezse HoughCircles'a dönülür
+        if self.kafes_kullan:
+            kafes_cevaplari = self.cevaplari_oku_kafes(gri, soru_sayisi, ders_adi, bolge_renkli, bolge_esik,
+                                                       baglam)
+            if kafes_cevaplari is not None:
+                return kafes_cevaplari
+            logger.debug("%s: kafes hizalanamadı, HoughCircles kullanılıyor", ders_adi)
         
         # Debug görüntüsü
-        if self.debug_mode:
+        if self.debug_aktif(baglam):
             debug_img = bolge_renkli.copy()
         
         # Hafif blur - daireleri korumak için
@@ -1267,57 +2061,28 @@ class OptikFormOkuyucu:
         )
         
         if circles is None:
-            print(f"{ders_adi}: HoughCircles bulamadı!")
-            return {i: 'BOŞ' for i in range(1, soru_sayisi + 1)}
+            logger.warning("%s: HoughCircles bulamadı!", ders_adi)
+            return CevapDizisi.bos(soru_sayisi)
         
         detected = circles[0]
-        print(f"{ders_adi}: {len(detected)} daire tespit edildi (r:{min_r}-{max_r}px)")
+        logger.debug("%s: %s daire tespit edildi (r:%s-%spx)", ders_adi, len(detected), min_r, max_r)
         
-        daire_bilgileri = []
-        yaricap_listesi = []
-        tum_avg_degerleri = []  # Tüm parlaklık değerleri
+        # Tüm dairelerin doluluk istatistikleri tek seferde (avg, std, min)
+        detected = detected[detected[:, 2] >= min_r]
+        yaricap_listesi = detected[:, 2].tolist()
+        istatistikler = daire_istatistikleri(gri, detected)
         
-        for circle in detected:
-            cx, cy, r = float(circle[0]), float(circle[1]), float(circle[2])
-            
-            if r < min_r:
-                continue
-            
-            yaricap_listesi.append(r)
-            
-            # ROI bölge etrafında ufak bir kare oluşturur
-            x1, y1 = max(0, int(cx - r)), max(0, int(cy - r))
-            x2, y2 = min(w, int(cx + r)), min(h, int(cy + r))
-            roi = gri[y1:y2, x1:x2]
-            
-            if roi.size == 0:
-                continue
-            
-            # Dairesel maske ile ortalama parlaklık
-            mask = np.zeros(roi.shape, dtype=np.uint8)
-            mcx, mcy = roi.shape[1] // 2, roi.shape[0] // 2
-            mr = min(mcx, mcy)
-            if mr < 2:
-                continue
-            cv2.circle(mask, (mcx, mcy), mr, 255, -1)
-            
-            pixels = roi[mask == 255]
-            if len(pixels) == 0:
-                continue
-            
-            avg = float(np.mean(pixels))
-            std = float(np.std(pixels))  # Standart sapma da hesapla
-            min_val = float(np.min(pixels))  # Minimum değer
-            
-            tum_avg_degerleri.append(avg)
-            
-            satir_no = int(cy / satir_yuksekligi) + 1
-            satir_no = max(1, min(soru_sayisi, satir_no))
-            
-            daire_bilgileri.append({
-                'cx': cx, 'cy': cy, 'r': r,
-                'avg': avg, 'std': std, 'min': min_val, 'satir': satir_no
-            })
+        gecerli = ~np.isnan(istatistikler[:, 0])
+        detected, istatistikler = detected[gecerli], istatistikler[gecerli]
+        tum_avg_degerleri = istatistikler[:, 0]  # Tüm parlaklık değerleri
+        
+        satir_nolari = np.clip((detected[:, 1] / satir_yuksekligi).astype(np.int64) + 1, 1, soru_sayisi)
+        
+        daire_bilgileri = [
+            {'cx': float(cx), 'cy': float(cy), 'r': float(r),
+             'avg': float(avg), 'std': float(std), 'min': float(min_val), 'satir': int(satir_no)}
+            for (cx, cy, r), (avg, std, min_val), satir_no in zip(detected, istatistikler, satir_nolari)
+        ]
         
         # Anormal büyük daireleri filtrele
         if len(yaricap_listesi) > 10:
@@ -1329,7 +2094,7 @@ class OptikFormOkuyucu:
             daire_bilgileri = [d for d in daire_bilgileri if d['r'] <= max_kabul_edilebilir]
             
             if len(daire_bilgileri) < onceki_sayi:
-                print(f"{ders_adi}: {onceki_sayi - len(daire_bilgileri)} büyük daire filtrelendi (r>{max_kabul_edilebilir:.1f})")
+                logger.debug("%s: %s büyük daire filtrelendi (r>%.1f)", ders_adi, onceki_sayi - len(daire_bilgileri), max_kabul_edilebilir)
         
         # Dinamik eşikler hesapla - tüm dairelerin ortalamasına göre
         if len(tum_avg_degerleri) > 5:
@@ -1341,12 +2106,16 @@ class OptikFormOkuyucu:
             dinamik_esik = 130
             global_ortalama = 180
         
-        if self.debug_mode:
-            print(f"      {ders_adi} - Dinamik eşik: {dinamik_esik:.0f}, Global ort: {global_ortalama:.0f}")
+        if self.debug_aktif(baglam):
+            logger.debug("%s - Dinamik eşik: %.0f, Global ort: %.0f", ders_adi, dinamik_esik, global_ortalama)
             for d in daire_bilgileri:
                 renk = (0, 255, 0) if d['avg'] < dinamik_esik else (0, 0, 255)
                 cv2.circle(debug_img, (int(d['cx']), int(d['cy'])), int(d['r']), renk, 1)
         
+        # Güven hesabı için satır x seçenek parlaklıkları ve seçimler
+        avg_matrisi = np.full((soru_sayisi, len(self.secenekler)), np.nan)
+        secim_dizisi = np.full(soru_sayisi, -1)
+        
         # Satırlara grupla
         satirlar = {}
         for d in daire_bilgileri:
@@ -1358,7 +2127,6 @@ class OptikFormOkuyucu:
         # Her satır işlenir
         for satir_no in range(1, soru_sayisi + 1):
             if satir_no not in satirlar or len(satirlar[satir_no]) == 0:
-                cevaplar[satir_no] = 'BOŞ'
                 continue
             
             daireler = satirlar[satir_no]
@@ -1369,9 +2137,10 @@ class OptikFormOkuyucu:
             secenekler = daireler[:5]
             
             if len(secenekler) == 0:
-                cevaplar[satir_no] = 'BOŞ'
                 continue
             
+            avg_matrisi[satir_no - 1, :len(secenekler)] = [d['avg'] for d in secenekler]
+            
             #Eşik değerler(doluluk oranı kontrolleri)
             
             # En koyu olanı bul
@@ -1410,33 +2179,117 @@ class OptikFormOkuyucu:
             kesin_isaretli = kriter1_gecti and kriter2_gecti and kriter3_gecti and gecen_kriter_sayisi >= 4
             
             if kesin_isaretli:
-                cevaplar[satir_no] = self.secenekler[en_koyu_idx]
-                if self.debug_mode:
+                secim_dizisi[satir_no - 1] = en_koyu_idx
+                if self.debug_aktif(baglam):
                     cv2.circle(debug_img, (int(en_koyu['cx']), int(en_koyu['cy'])), 
                               int(en_koyu['r']) + 2, (0, 255, 0), 3)
-            else:
-                cevaplar[satir_no] = 'BOŞ'
+        
+        cevaplar = CevapDizisi.secimlerden(secim_dizisi,
+                                           secim_guvenleri(avg_matrisi, secim_dizisi, min(dinamik_esik, 135)))
              
-        if self.debug_mode:
-            cv2.imwrite(f"{self.debug_dir}/circles_{ders_adi}.jpg", debug_img)
-            ilk_10 = {k: v for k, v in list(cevaplar.items())[:10]}
-            print(f"      {ders_adi} ilk 10: {ilk_10}")
+        if self.debug_aktif(baglam):
+            self.debug_yaz(baglam, f"circles_{ders_adi}", debug_img)
+            ilk_10 = {k: cevaplar.harf(k) for k in range(1, 11)}
+            logger.debug("%s ilk 10: %s", ders_adi, ilk_10)
+        
+        logger.debug("%s: %s/%s işaretli", ders_adi, cevaplar.isaretli_sayisi(), soru_sayisi)
+        
+        return cevaplar
+    
+    
+    # Cevap bölgesini şablon kafesindeki sabit baloncuk merkezlerinden okur.
+    # Kafes bölgeye hizalanamazsa None döner (çağıran HoughCircles'a döner).
+    def cevaplari_oku_kafes(self, gri: np.ndarray, soru_sayisi: int, ders_adi: str = "",
+                            bolge_renkli: Optional[np.ndarray] = None,
+                            esik: Optional[np.ndarray] = None,
+                            baglam: Optional[OkumaBaglami] = None) -> Optional[CevapDizisi]:
+        ornek = kafes_ornekle(gri, self.sablon, 'answers', esik)
+        if ornek is None:
+            return None
+        
+        merkezler, yaricap, istatistikler = ornek
+        if merkezler.shape[0] != soru_sayisi or merkezler.shape[1] > len(self.secenekler):
+            return None
+        
+        avg, std, mn = istatistikler[..., 0], istatistikler[..., 1], istatistikler[..., 2]
+        
+        # Dinamik eşik - tüm baloncukların ortalamasına göre (Hough yolu ile aynı kural)
+        global_ortalama = float(np.mean(avg))
+        global_std = float(np.std(avg))
+        dinamik_esik = min(140, global_ortalama - global_std * 0.5)
+        
+        secimler = secim_kararlari(avg, std, mn, min(dinamik_esik, 135))
+        cevaplar = CevapDizisi.secimlerden(secimler, secim_guvenleri(avg, secimler, min(dinamik_esik, 135)))
         
-        isaretli = sum(1 for v in cevaplar.values() if v != 'BOŞ')
-        print(f"      {ders_adi}: {isaretli}/{soru_sayisi} işaretli")
+        if self.debug_aktif(baglam) and bolge_renkli is not None:
+            debug_img = bolge_renkli.copy()
+            for satir in range(merkezler.shape[0]):
+                for sutun in range(merkezler.shape[1]):
+                    cx, cy = merkezler[satir, sutun]
+                    renk = (0, 255, 0) if avg[satir, sutun] < dinamik_esik else (0, 0, 255)
+                    kalinlik = 3 if secimler[satir] == sutun else 1
+                    cv2.circle(debug_img, (int(cx), int(cy)), int(yaricap), renk, kalinlik)
+            self.debug_yaz(baglam, f"circles_{ders_adi}", debug_img)
+        
+        logger.debug("%s: %s/%s işaretli (kafes)", ders_adi, cevaplar.isaretli_sayisi(), soru_sayisi)
         
         return cevaplar
     
+    # Ad/soyad bölgesini şablon kafesinden okur (satır = harf, sütun = karakter).
+    # Kafes hizalanamazsa None döner.
+    def isim_oku_kafes(self, gri: np.ndarray, max_karakter: int, bolge_adi: str = "isim",
+                       bolge_renkli: Optional[np.ndarray] = None,
+                       esik: Optional[np.ndarray] = None,
+                       baglam: Optional[OkumaBaglami] = None) -> Optional[str]:
+        ornek = kafes_ornekle(gri, self.sablon, 'names', esik, max_karakter)
+        if ornek is None:
+            return None
+        
+        merkezler, yaricap, istatistikler = ornek
+        if merkezler.shape[0] != len(self.alfabe) or merkezler.shape[1] != max_karakter:
+            return None
+        
+        # (karakter sütunu, harf) matrisleri
+        avg = istatistikler[..., 0].T
+        std = istatistikler[..., 1].T
+        mn = istatistikler[..., 2].T
+        
+        global_ortalama = float(np.mean(avg))
+        dinamik_esik = min(130, global_ortalama - 30)
+        
+        secimler = secim_kararlari(avg, std, mn, min(dinamik_esik, 130))
+        isim_str = ''.join(self.alfabe[harf] for harf in secimler.tolist() if harf >= 0)
+        
+        if self.debug_aktif(baglam) and bolge_renkli is not None:
+            debug_img = bolge_renkli.copy()
+            for sutun, harf in enumerate(secimler.tolist()):
+                if harf >= 0:
+                    cx, cy = merkezler[harf, sutun]
+                    cv2.circle(debug_img, (int(cx), int(cy)), int(yaricap) + 2, (0, 255, 0), 3)
+            self.debug_yaz(baglam, f"{bolge_adi}_circles", debug_img)
+            logger.debug("%s tespit (kafes): %s", bolge_adi.capitalize(), isim_str)
+        
+        return isim_str
     
-    def isim_oku_renkli(self, bolge_renkli: np.ndarray, max_karakter: int = 12, bolge_adi: str = "isim") -> str:
+    def isim_oku_renkli(self, bolge_renkli: np.ndarray, max_karakter: int = 12, bolge_adi: str = "isim",
+                        bolge_gri: Optional[np.ndarray] = None,
+                        bolge_esik: Optional[np.ndarray] = None,
+                        baglam: Optional[OkumaBaglami] = None) -> str:
         if bolge_renkli is None or bolge_renkli.size == 0:
             return ""
         
         h, w = bolge_renkli.shape[:2]
         
-        gri = cv2.cvtColor(bolge_renkli, cv2.COLOR_BGR2GRAY)
+        gri = bolge_gri if bolge_gri is not None else cv2.cvtColor(bolge_renkli, cv2.COLOR_BGR2GRAY)
         
-        if self.debug_mode:
+        # Önce şablon kafesi - hizalama kontrolü geçmezse HoughCircles'a dönülür
+        if self.kafes_kullan:
+            kafes_isim = self.isim_oku_kafes(gri, max_karakter, bolge_adi, bolge_renkli, bolge_esik, baglam)
+            if kafes_isim is not None:
+                return kafes_isim
+            logger.debug("%s: kafes hizalanamadı, HoughCircles kullanılıyor", bolge_adi)
+        
+        if self.debug_aktif(baglam):
             debug_img = bolge_renkli.copy()
         
         blurred = cv2.GaussianBlur(gri, (5, 5), 0)
@@ -1462,161 +2315,74 @@ class OptikFormOkuyucu:
         )
         
         if circles is None:
-            print(f"{bolge_adi}: HoughCircles bulamadı!")
+            logger.warning("%s: HoughCircles bulamadı!", bolge_adi)
             return ""
         
         detected = circles[0]
-        print(f"{bolge_adi}: {len(detected)} daire tespit edildi (r:{min_r}-{max_r}px)")
+        logger.debug("%s: %s daire tespit edildi (r:%s-%spx)", bolge_adi, len(detected), min_r, max_r)
         
-        daire_bilgileri = []
-        tum_avg_degerleri = []  # Tüm parlaklık değerleri
+        detected = detected[detected[:, 2] >= min_r]
+        istatistikler = daire_istatistikleri(gri, detected)
         
-        for circle in detected:
-            cx, cy, r = float(circle[0]), float(circle[1]), float(circle[2])
-            
-            if r < min_r:
-                continue
-            
-            x1, y1 = max(0, int(cx - r)), max(0, int(cy - r))
-            x2, y2 = min(w, int(cx + r)), min(h, int(cy + r))
-            roi = gri[y1:y2, x1:x2]
-            
-            if roi.size == 0:
-                continue
-            
-            mask = np.zeros(roi.shape, dtype=np.uint8)
-            mcx, mcy = roi.shape[1] // 2, roi.shape[0] // 2
-            mr = min(mcx, mcy)
-            if mr < 2:
-                continue
-            cv2.circle(mask, (mcx, mcy), mr, 255, -1)
-            
-            pixels = roi[mask == 255]
-            if len(pixels) == 0:
-                continue
-            
-            avg = float(np.mean(pixels))
-            std = float(np.std(pixels))
-            min_val = float(np.min(pixels))
-            
-            tum_avg_degerleri.append(avg)
-            
-            sutun_no = int(cx / sutun_genisligi)
-            satir_no = int(cy / satir_yuksekligi)
-            
-            if sutun_no < 0 or sutun_no >= max_karakter:
-                continue
-            if satir_no < 0 or satir_no >= satir_sayisi:
-                continue
-            
-            daire_bilgileri.append({
-                'cx': cx, 'cy': cy, 'r': r,
-                'avg': avg, 'std': std, 'min': min_val, 'sutun': sutun_no, 'satir': satir_no
-            })
-        
-        # Dinamik eşik hesapla
+        # Dinamik eşik hesapla - ızgara dışına düşenler dahil ölçülen tüm dairelerden
+        tum_avg_degerleri = istatistikler[~np.isnan(istatistikler[:, 0]), 0]
         if len(tum_avg_degerleri) > 5:
             global_ortalama = float(np.mean(tum_avg_degerleri))
             dinamik_esik = min(130, global_ortalama - 30)
         else:
             dinamik_esik = 120
-      
-        if self.debug_mode:
-            for d in daire_bilgileri:
-                renk = (0, 255, 0) if d['avg'] < dinamik_esik else (0, 0, 255)
-                cv2.circle(debug_img, (int(d['cx']), int(d['cy'])), int(d['r']), renk, 1)
         
-        sutunlar = {}
-        for d in daire_bilgileri:
-            s = d['sutun']
-            if s not in sutunlar:
-                sutunlar[s] = []
-            sutunlar[s].append(d)
-        
-        isim = []
-        for sutun_no in range(max_karakter):
-            if sutun_no not in sutunlar or len(sutunlar[sutun_no]) == 0:
-                continue
-            
-            daireler = sutunlar[sutun_no]
-            
-            en_koyu = min(daireler, key=lambda d: d['avg'])
-            
-            diger = [d['avg'] for d in daireler if d != en_koyu]
-            diger_ortalama = sum(diger) / len(diger) if diger else 255
-            
-            # Doluluk kriterleri
-            mutlak_esik = min(dinamik_esik, 130)
-            min_fark = 25
-            oran_esik = 0.85
-            
-            kriter1 = en_koyu['avg'] < mutlak_esik
-            kriter2 = (diger_ortalama - en_koyu['avg']) > min_fark
-            kriter3 = (en_koyu['avg'] / diger_ortalama) < oran_esik if diger_ortalama > 0 else False
-            kriter4 = en_koyu['std'] < 50
-            kriter5 = en_koyu['min'] < 100
-            
-            gecen_kriter = sum([kriter1, kriter2, kriter3, kriter4, kriter5])
-            kesin_isaretli = kriter1 and kriter2 and kriter3 and gecen_kriter >= 4
-            
-            if kesin_isaretli:
-                harf_idx = en_koyu['satir']
-                if 0 <= harf_idx < len(self.alfabe):
-                    isim.append((sutun_no, self.alfabe[harf_idx]))
-                    
-                    if self.debug_mode:
-                        cv2.circle(debug_img, (int(en_koyu['cx']), int(en_koyu['cy'])), 
-                                  int(en_koyu['r']) + 2, (0, 255, 0), 3)
+        # (karakter sütunu, harf) ızgarası; aynı hücredeki dairelerden en koyusu kalır
+        sutun_nolari = (detected[:, 0] / sutun_genisligi).astype(np.int64)
+        satir_nolari = (detected[:, 1] / satir_yuksekligi).astype(np.int64)
+        izgara, kaynak = izgaraya_yerlestir(sutun_nolari, satir_nolari, istatistikler,
+                                            max_karakter, satir_sayisi)
         
-        isim.sort(key=lambda x: x[0])
-        isim_str = ''.join([h for _, h in isim])
+        secimler = secim_kararlari(izgara[..., 0], izgara[..., 1], izgara[..., 2], min(dinamik_esik, 130))
+        isim_str = ''.join(self.alfabe[harf] for harf in secimler.tolist() if harf >= 0)
         
-       
-        if self.debug_mode:
-            cv2.imwrite(f"{self.debug_dir}/{bolge_adi}_circles.jpg", debug_img)
-            print(f"{bolge_adi.capitalize()} tespit: {isim_str}")
+        if self.debug_aktif(baglam):
+            yerlesen = kaynak[kaynak >= 0]
+            for (cx, cy, r), avg in zip(detected[yerlesen], istatistikler[yerlesen, 0]):
+                renk = (0, 255, 0) if avg < dinamik_esik else (0, 0, 255)
+                cv2.circle(debug_img, (int(cx), int(cy)), int(r), renk, 1)
+            for sutun, harf in enumerate(secimler.tolist()):
+                if harf >= 0:
+                    cx, cy, r = detected[kaynak[sutun, harf]]
+                    cv2.circle(debug_img, (int(cx), int(cy)), int(r) + 2, (0, 255, 0), 3)
+            
+            self.debug_yaz(baglam, f"{bolge_adi}_circles", debug_img)
+            logger.debug("%s tespit: %s", bolge_adi.capitalize(), isim_str)
         
         return isim_str
     
     
-    def sonuclari_karsilastir(self, ogrenci_cevaplari: Dict[int, str], 
+    # Okunan cevapları {soru_no: doğru harf} anahtarıyla karşılaştırır (scoring modülüne devreder)
+    def sonuclari_karsilastir(self, ogrenci_cevaplari: CevapDizisi,
                                dogru_cevaplar: Dict[int, str]) -> Dict:
-      
-        dogru = 0
-        yanlis = 0
-        bos = 0
-        detaylar = []
-        
-        for soru_no, dogru_cevap in dogru_cevaplar.items():
-            ogrenci_cevap = ogrenci_cevaplari.get(soru_no, 'BOŞ')
-            
-            if ogrenci_cevap == 'BOŞ':
-                bos += 1
-                sonuc = 'boş'
-            elif ogrenci_cevap == dogru_cevap:
-                dogru += 1
-                sonuc = 'doğru'
-            else:
-                yanlis += 1
-                sonuc = 'yanlış'
-            
-            detaylar.append({
-                'soru': soru_no,
-                'ogrenci': ogrenci_cevap,
-                'dogru': dogru_cevap,
-                'sonuc': sonuc
-            })
-        
-        toplam = len(dogru_cevaplar)
+        anahtar = sozlukten_derle(dogru_cevaplar)
+        sonuc = puanla(ogrenci_cevaplari, anahtar)
+        
+        durumlar = np.where(sonuc['dogru_mu'][0], 'doğru',
+                            np.where(sonuc['kodlar'][0] == 0, 'boş', 'yanlış')).tolist()
+        detaylar = [
+            {'soru': soru_no, 'ogrenci': ogrenci_cevap, 'dogru': dogru_cevap, 'sonuc': durum}
+            for soru_no, ogrenci_cevap, dogru_cevap, durum in zip(
+                anahtar.soru_nolari.tolist(), kodlari_coz(sonuc['kodlar'][0].tolist()),
+                dogru_cevaplar.values(), durumlar)
+        ]
+        
+        dogru = int(sonuc['dogru'][0, 0])
+        toplam = anahtar.soru_sayisi
         basari = (dogru / toplam * 100) if toplam > 0 else 0
         
         return {
             'dogru_sayisi': dogru,
-            'yanlis_sayisi': yanlis,
-            'bos_sayisi': bos,
+            'yanlis_sayisi': int(sonuc['yanlis'][0, 0]),
+            'bos_sayisi': int(sonuc['bos'][0, 0]),
             'toplam_soru': toplam,
             'basari_yuzdesi': round(basari, 2),
-            'net': round(dogru - (yanlis / 4), 2),  
+            'net': round(float(sonuc['net'][0, 0]), 2),
             'detaylar': detaylar
         }
 
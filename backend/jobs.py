@@ -0,0 +1,227 @@
+import collections
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger('omr.isler')
+
+# İş durumları
+BEKLIYOR = 'queued'
+CALISIYOR = 'running'
+BITTI = 'done'
+HATA = 'failed'
+IPTAL = 'cancelled'
+
+
+class KuyrukDolu(Exception):
+    pass
+
+
+# Kuyruğa alınmış tek iş. Sonuç, işin döndürdüğü (gövde, HTTP durum kodu) çiftidir.
+# İş çalışırken ilerleme() ile aşama olayları ekler; dinleyiciler olaylari_bekle() ile izler.
+class Is:
+    __slots__ = ('id', 'sahip', 'durum', 'olusturma', 'baslama', 'bitis', 'sonuc', 'http_durumu',
+                 'hata', 'olaylar', '_hedef', '_bitti', '_degisti', '_iptal')
+
+    def __init__(self, hedef: Callable[['Is'], tuple], sahip=None):
+        self.id = uuid.uuid4().hex
+        self.sahip = sahip
+        self.durum = BEKLIYOR
+        self.olusturma = time.time()
+        self.baslama: Optional[float] = None
+        self.bitis: Optional[float] = None
+        self.sonuc: Optional[Dict] = None
+        self.http_durumu: Optional[int] = None
+        self.hata: Optional[str] = None
+        self.olaylar: List[Dict] = []
+        self._hedef = hedef
+        self._bitti = threading.Event()
+        self._degisti = threading.Condition()
+        self._iptal = threading.Event()
+
+    @property
+    def tamamlandi(self) -> bool:
+        return self.durum in (BITTI, HATA, IPTAL)
+
+    def bekle(self, zaman_asimi: Optional[float] = None) -> bool:
+        return self._bitti.wait(zaman_asimi)
+
+    @property
+    def iptal_istendi(self) -> bool:
+        return self._iptal.is_set()
+
+    # Bekleyen iş hiç çalıştırılmaz; çalışan iş hedefin bir sonraki iptal kontrolünde kesilir
+    def iptal_et(self):
+        self._iptal.set()
+        self._haber_ver()
+
+    # Aşama olayı: {'stage', 'elapsed_ms' (iş oluşturulmasından beri), ...veri}
+    def ilerleme(self, asama: str, **veri):
+        olay = {'stage': asama, 'elapsed_ms': round((time.time() - self.olusturma) * 1000, 1), **veri}
+        with self._degisti:
+            self.olaylar.append(olay)
+            self._degisti.notify_all()
+
+    # baslangic indeksinden sonraki olaylar; yeni olay yoksa iş bitene ya da zaman aşımına
+    # kadar bekler (boş liste dönerse çağıran tamamlandi'ya bakar)
+    def olaylari_bekle(self, baslangic: int, zaman_asimi: Optional[float] = None) -> List[Dict]:
+        with self._degisti:
+            self._degisti.wait_for(lambda: len(self.olaylar) > baslangic or self.tamamlandi, zaman_asimi)
+            return self.olaylar[baslangic:]
+
+    def _haber_ver(self):
+        with self._degisti:
+            self._degisti.notify_all()
+
+    # GET /jobs/<id> yanıtı
+    def ozet(self) -> Dict:
+        simdi = time.time()
+        veri = {
+            'job_id': self.id,
+            'status': self.durum,
+            'created_at': self.olusturma,
+            'wait_ms': round(((self.baslama or simdi) - self.olusturma) * 1000, 1),
+        }
+        if self.olaylar:
+            veri['stage'] = self.olaylar[-1]['stage']
+        if self.baslama is not None:
+            veri['run_ms'] = round(((self.bitis or simdi) - self.baslama) * 1000, 1)
+        if self.tamamlandi:
+            veri['http_status'] = self.http_durumu
+            veri['result'] = self.sonuc
+        return veri
+
+
+# Sınırlı iş kuyruğu ve sabit sayıda işçi iş parçacığı. Kuyruk doluysa gonder() bekletmez,
+# KuyrukDolu fırlatır (istemciye 503). Biten işler saklama_suresi kadar sorgulanabilir.
+class IsKuyrugu:
+
+    def __init__(self, isci_sayisi: int = 2, max_bekleyen: int = 32, saklama_suresi: float = 600.0,
+                 olcum_penceresi: int = 100):
+        self.isci_sayisi = max(1, isci_sayisi)
+        self.saklama_suresi = saklama_suresi
+        self._kuyruk: queue.Queue = queue.Queue(maxsize=max_bekleyen)
+        self._isler: Dict[str, Is] = {}
+        self._kilit = threading.Lock()
+
+        self._calisan = 0
+        self._sayaclar = collections.Counter()
+        # Son işlerin bekleme ve çalışma süreleri (saniye)
+        self._beklemeler = collections.deque(maxlen=olcum_penceresi)
+        self._calismalar = collections.deque(maxlen=olcum_penceresi)
+
+        sira = itertools.count(1)
+        self._isciler = [threading.Thread(target=self._calis, name=f'is-iscisi-{next(sira)}', daemon=True)
+                         for _ in range(self.isci_sayisi)]
+        for isci in self._isciler:
+            isci.start()
+
+    # hedef(is_) -> (gövde, HTTP durum kodu); hedef ilerleme ve iptal için işi alır
+    def gonder(self, hedef: Callable[[Is], tuple], sahip=None) -> Is:
+        self._eskileri_temizle()
+        is_ = Is(hedef, sahip)
+        with self._kilit:
+            self._isler[is_.id] = is_
+        try:
+            self._kuyruk.put_nowait(is_)
+        except queue.Full:
+            with self._kilit:
+                del self._isler[is_.id]
+                self._sayaclar['reddedilen'] += 1
+            raise KuyrukDolu()
+        with self._kilit:
+            self._sayaclar['gonderilen'] += 1
+        return is_
+
+    def al(self, is_id: str) -> Optional[Is]:
+        with self._kilit:
+            return self._isler.get(is_id)
+
+    # Kuyruk derinliği, çalışan iş sayısı ve son işlerin ortalama/en kötü süreleri
+    def istatistikler(self) -> Dict:
+        with self._kilit:
+            beklemeler = list(self._beklemeler)
+            calismalar = list(self._calismalar)
+            veri = {
+                'workers': self.isci_sayisi,
+                'queue_depth': self._kuyruk.qsize(),
+                'queue_capacity': self._kuyruk.maxsize,
+                'running': self._calisan,
+                'submitted': self._sayaclar['gonderilen'],
+                'rejected': self._sayaclar['reddedilen'],
+                'completed': self._sayaclar['biten'],
+                'failed': self._sayaclar['hatali'],
+                'cancelled': self._sayaclar['iptal'],
+                'tracked_jobs': len(self._isler),
+            }
+
+        def ms(degerler, fonksiyon):
+            return round(fonksiyon(degerler) * 1000, 1) if degerler else None
+
+        veri['wait_ms'] = {'avg': ms(beklemeler, lambda d: sum(d) / len(d)), 'max': ms(beklemeler, max)}
+        veri['run_ms'] = {'avg': ms(calismalar, lambda d: sum(d) / len(d)), 'max': ms(calismalar, max)}
+        return veri
+
+    def _calis(self):
+        while True:
+            is_ = self._kuyruk.get()
+            if is_.iptal_istendi:
+                self._iptal_edildi(is_)
+                self._kuyruk.task_done()
+                continue
+
+            is_.baslama = time.time()
+            is_.durum = CALISIYOR
+            with self._kilit:
+                self._calisan += 1
+                self._beklemeler.append(is_.baslama - is_.olusturma)
+
+            try:
+                is_.sonuc, is_.http_durumu = is_._hedef(is_)
+                is_.durum = BITTI
+            except Exception as e:
+                # İptal istenmişse hedefin yükselttiği hata iptalin kendisidir
+                if is_.iptal_istendi:
+                    is_.sonuc, is_.http_durumu = {'error': 'İş iptal edildi'}, None
+                    is_.durum = IPTAL
+                else:
+                    logger.exception("İş %s başarısız: %s", is_.id, e)
+                    is_.sonuc, is_.http_durumu = {'error': str(e)}, 500
+                    is_.hata = str(e)
+                    is_.durum = HATA
+            finally:
+                is_.bitis = time.time()
+                is_._hedef = None
+                with self._kilit:
+                    self._calisan -= 1
+                    self._calismalar.append(is_.bitis - is_.baslama)
+                    self._sayaclar[{BITTI: 'biten', HATA: 'hatali', IPTAL: 'iptal'}[is_.durum]] += 1
+                is_._bitti.set()
+                is_._haber_ver()
+                self._kuyruk.task_done()
+                logger.debug("İş %s bitti: %s, bekleme %.0f ms, çalışma %.0f ms", is_.id, is_.durum,
+                             (is_.baslama - is_.olusturma) * 1000, (is_.bitis - is_.baslama) * 1000)
+
+    # Başlamadan iptal edilen iş
+    def _iptal_edildi(self, is_: Is):
+        is_.bitis = time.time()
+        is_.sonuc, is_.http_durumu = {'error': 'İş iptal edildi'}, None
+        is_.durum = IPTAL
+        is_._hedef = None
+        with self._kilit:
+            self._sayaclar['iptal'] += 1
+        is_._bitti.set()
+        is_._haber_ver()
+        logger.debug("İş %s başlamadan iptal edildi", is_.id)
+
+    def _eskileri_temizle(self):
+        sinir = time.time() - self.saklama_suresi
+        with self._kilit:
+            eskiler = [is_id for is_id, is_ in self._isler.items()
+                       if is_.tamamlandi and is_.bitis is not None and is_.bitis < sinir]
+            for is_id in eskiler:
+                del self._isler[is_id]
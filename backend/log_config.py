@@ -0,0 +1,76 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from datetime import datetime, timezone
+from typing import Optional
+
+# Uygulamanın tüm logger'ları bu kökün altındadır: omr.api, omr.okuyucu, omr.okuyucu.tespit, ...
+KOK_LOGGER = 'omr'
+
+_dinleyici: Optional[logging.handlers.QueueListener] = None
+
+
+# Her kaydı tek satır JSON olarak yazar. extra={'alanlar': {...}} ile verilen alanlar
+# satıra eklenir (ör. okuma özeti: strateji, süre, güven).
+class JsonSatirBicimleyici(logging.Formatter):
+
+    def format(self, kayit: logging.LogRecord) -> str:
+        veri = {
+            'ts': datetime.fromtimestamp(kayit.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': kayit.levelname,
+            'logger': kayit.name,
+            'thread': kayit.threadName,
+            'msg': kayit.getMessage(),
+        }
+        alanlar = getattr(kayit, 'alanlar', None)
+        if alanlar:
+            veri.update(alanlar)
+        if kayit.exc_info:
+            veri['exc'] = self.formatException(kayit.exc_info)
+        return json.dumps(veri, ensure_ascii=False, default=str)
+
+
+# Kuyruk aynı süreç içinde kalır, kaydın dizilenebilir olması gerekmez. Varsayılan prepare
+# kaydı çağıran iş parçacığında biçimlendirir; burada kayıt olduğu gibi geçer ve mesaj
+# dahil tüm biçimlendirme dinleyici iş parçacığında yapılır.
+class BicimlemeyenKuyrukIsleyici(logging.handlers.QueueHandler):
+
+    def prepare(self, kayit: logging.LogRecord) -> logging.LogRecord:
+        return kayit
+
+
+# Kök logger'ı kurar. İstek iş parçacıkları sadece kuyruğa yazar; biçimlendirme ve
+# konsol/dosya yazımı QueueListener iş parçacığında yapılır.
+#   seviye      - LOG_LEVEL (varsayılan INFO)
+#   json_dosyasi - LOG_JSON_FILE verilirse ayrıca JSON satırları bu dosyaya yazılır
+def logging_ayarla(seviye: Optional[str] = None, json_dosyasi: Optional[str] = None) -> logging.Logger:
+    global _dinleyici
+
+    kok = logging.getLogger(KOK_LOGGER)
+    if _dinleyici is not None:
+        return kok
+
+    seviye = (seviye or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    json_dosyasi = json_dosyasi or os.environ.get('LOG_JSON_FILE')
+
+    konsol = logging.StreamHandler()
+    konsol.setFormatter(logging.Formatter('%(asctime)s %(levelname)-7s %(name)s: %(message)s'))
+    isleyiciler = [konsol]
+
+    if json_dosyasi:
+        dosya = logging.FileHandler(json_dosyasi, encoding='utf-8')
+        dosya.setFormatter(JsonSatirBicimleyici())
+        isleyiciler.append(dosya)
+
+    kuyruk = queue.SimpleQueue()
+    _dinleyici = logging.handlers.QueueListener(kuyruk, *isleyiciler, respect_handler_level=True)
+    _dinleyici.start()
+    atexit.register(_dinleyici.stop)
+
+    kok.setLevel(seviye)
+    kok.addHandler(BicimlemeyenKuyrukIsleyici(kuyruk))
+    kok.propagate = False
+    return kok
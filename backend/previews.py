@@ -0,0 +1,91 @@
+import hashlib
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from image_processor import goruntu_coz, goruntu_oku
+
+logger = logging.getLogger('omr.onizleme')
+
+# Sonuç görüntülerinin önizleme boyutları (uzun kenar, piksel) ve JPEG kaliteleri.
+# 600: sonuç detayındaki gömülü görsel, 1200: tam ekran görüntüleme.
+ONIZLEME_BOYUTLARI = {600: 50, 1200: 80}
+# Önizlemeler yüklemenin yanındaki bu alt klasörde tutulur
+ONIZLEME_KLASORU = 'previews'
+
+
+# uploads/20240101_120000_form.jpg -> uploads/previews/20240101_120000_form_600.jpg
+def onizleme_yolu(orijinal_yol: str, boyut: int) -> str:
+    klasor, ad = os.path.split(orijinal_yol)
+    return os.path.join(klasor, ONIZLEME_KLASORU, f"{os.path.splitext(ad)[0]}_{boyut}.jpg")
+
+
+def _kucult(goruntu: np.ndarray, boyut: int) -> np.ndarray:
+    h, w = goruntu.shape[:2]
+    if max(h, w) <= boyut:
+        return goruntu
+    olcek = boyut / max(h, w)
+    return cv2.resize(goruntu, (int(w * olcek), int(h * olcek)), interpolation=cv2.INTER_AREA)
+
+
+# Eşzamanlı üretimde yarım dosya okunmasın diye geçici dosyaya yazılıp yerine taşınır
+def _yaz(goruntu: np.ndarray, yol: str, kalite: int):
+    basarili, tampon = cv2.imencode('.jpg', goruntu, [cv2.IMWRITE_JPEG_QUALITY, kalite])
+    if not basarili:
+        raise ValueError(f"Önizleme kodlanamadı: {yol}")
+    os.makedirs(os.path.dirname(yol), exist_ok=True)
+    gecici = f"{yol}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(gecici, 'wb') as f:
+        f.write(tampon.tobytes())
+    os.replace(gecici, yol)
+
+
+# Orijinalin tüm önizlemelerini üretir: {boyut: yol}. Görüntü en büyük önizleme boyutuna
+# indirgenmiş ölçekte bir kez çözülür, her önizleme bir öncekinden küçültülür. veri
+# verilirse (yükleme anı) dosya yeniden okunmaz. Çözülemeyen görüntü için boş sözlük.
+def onizlemeleri_uret(orijinal_yol: str, veri: Optional[bytes] = None) -> Dict[int, str]:
+    en_buyuk = max(ONIZLEME_BOYUTLARI)
+    if veri is not None:
+        goruntu, _ = goruntu_coz(veri, en_buyuk)
+    else:
+        goruntu, _ = goruntu_oku(orijinal_yol, en_buyuk)
+    if goruntu is None:
+        logger.warning("Önizleme için görüntü çözülemedi: %s", orijinal_yol)
+        return {}
+
+    yollar = {}
+    for boyut in sorted(ONIZLEME_BOYUTLARI, reverse=True):
+        goruntu = _kucult(goruntu, boyut)
+        yollar[boyut] = onizleme_yolu(orijinal_yol, boyut)
+        _yaz(goruntu, yollar[boyut], ONIZLEME_BOYUTLARI[boyut])
+    logger.debug("Önizlemeler üretildi: %s", orijinal_yol)
+    return yollar
+
+
+# Önizlemenin yolu. Önbellek öncesi yüklemeler için ilk erişimde üretilir; orijinal yoksa
+# ya da çözülemiyorsa None.
+def onizleme_al(orijinal_yol: str, boyut: int) -> Optional[str]:
+    yol = onizleme_yolu(orijinal_yol, boyut)
+    if os.path.exists(yol):
+        return yol
+    if not os.path.exists(orijinal_yol):
+        return None
+    return onizlemeleri_uret(orijinal_yol).get(boyut)
+
+
+@lru_cache(maxsize=4096)
+def _dosya_ozeti(yol: str, degisme_zamani: int, bayt: int) -> str:
+    with open(yol, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+# Önizleme içeriğinin kısa özeti (sha256'nın ilk 16 hanesi): görüntü URL'sinin sürümü ve ETag.
+# Dosya (değişme zamanı, boyut) değişmedikçe özet yeniden hesaplanmaz.
+def onizleme_ozeti(yol: str) -> str:
+    bilgi = os.stat(yol)
+    return _dosya_ozeti(yol, bilgi.st_mtime_ns, bilgi.st_size)
@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from form_templates import get_template
+
+logger = logging.getLogger('omr.hizalama')
+
+# Şablondaki reference_image yolları backend klasörüne görelidir
+_TEMEL_KLASOR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Fotoğrafı şablonun referans görüntüsüne (boş formun normalize sayfa taraması) ORB anahtar
+# noktalarıyla eşler ve homografiyi RANSAC ile tek geçişte bulur. Kağıt kenarı yerine basılı
+# formun kendisine hizalandığı için kenarı görünmeyen ya da arka planla karışan kağıtlarda da
+# çalışır. Maliyet sabittir: tek ORB çıkarımı, tek eşleştirme, tek findHomography.
+# Tekrarlı baloncuk ızgarası yanlış eşleşmelere açık olduğundan bulunan homografi, fotoğrafın
+# referans çerçevesine çekilmiş küçük bir kopyasının referansla korelasyonuyla doğrulanır.
+# Referanstan fotoğraftakinden az anahtar nokta çıkarılır: eşleştirme maliyeti ikisinin
+# çarpımıdır ve az sayıda belirgin referans noktası tekrarlı ızgarada daha az karışır.
+class SablonHizalayici:
+
+    def __init__(self, referans: np.ndarray, uzun_kenar: int = 1000, ozellik_sayisi: int = 3000,
+                 referans_ozellik_sayisi: int = 1000, oran_esigi: float = 0.75, min_inlier: int = 25, ransac_esigi: float = 5.0,
+                 min_korelasyon: float = 0.35, dogrulama_genisligi: int = 200):
+        self.oran_esigi = oran_esigi
+        self.min_inlier = min_inlier
+        self.ransac_esigi = ransac_esigi
+        self.min_korelasyon = min_korelasyon
+        self.ozellik_sayisi = ozellik_sayisi
+
+        gri = cv2.cvtColor(referans, cv2.COLOR_BGR2GRAY) if len(referans.shape) == 3 else referans
+        h, w = gri.shape[:2]
+        olcek = min(1.0, uzun_kenar / max(h, w))
+        if olcek < 1.0:
+            gri = cv2.resize(gri, (int(round(w * olcek)), int(round(h * olcek))), interpolation=cv2.INTER_AREA)
+        h, w = gri.shape[:2]
+
+        # Referans sayfanın köşeleri (sol üst, sağ üst, sağ alt, sol alt)
+        self.referans_koseleri = np.float32([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]]).reshape(-1, 1, 2)
+        self._referans_noktalari, self._referans_tanimlayicilari = \
+            cv2.ORB_create(referans_ozellik_sayisi).detectAndCompute(gri, None)
+        if self._referans_tanimlayicilari is None or len(self._referans_noktalari) < min_inlier:
+            raise ValueError("Referans görüntüde yeterli anahtar nokta yok")
+
+        # Doğrulama için referansın bulanıklaştırılmış küçük kopyası ve ölçeği
+        self._dogrulama_olcegi = dogrulama_genisligi / w
+        self._dogrulama_referansi = cv2.GaussianBlur(
+            cv2.resize(gri, (dogrulama_genisligi, int(round(h * self._dogrulama_olcegi))),
+                       interpolation=cv2.INTER_AREA), (5, 5), 0)
+
+        # ORB nesneleri iş parçacıkları arasında paylaşılmaz; her iş parçacığı kendininkini kurar
+        self._yerel = threading.local()
+
+    def _orb(self):
+        if not hasattr(self._yerel, 'orb'):
+            self._yerel.orb = cv2.ORB_create(self.ozellik_sayisi)
+            self._yerel.eslestirici = cv2.BFMatcher(cv2.NORM_HAMMING)
+        return self._yerel.orb, self._yerel.eslestirici
+
+    # Homografi (referans -> fotoğraf) ile fotoğrafı küçük referans çerçevesine çeker ve
+    # referansla normalize korelasyonunu döner
+    def korelasyon(self, gri: np.ndarray, matris: np.ndarray) -> float:
+        h, w = self._dogrulama_referansi.shape[:2]
+        olcek = np.diag([1 / self._dogrulama_olcegi, 1 / self._dogrulama_olcegi, 1.0])
+        cekilmis = cv2.warpPerspective(cv2.GaussianBlur(gri, (5, 5), 0), matris @ olcek, (w, h),
+                                       flags=cv2.WARP_INVERSE_MAP | cv2.INTER_AREA)
+        return float(cv2.matchTemplate(cekilmis, self._dogrulama_referansi, cv2.TM_CCOEFF_NORMED)[0, 0])
+
+    # Referans sayfanın fotoğraftaki köşeleri (4, 2); eşleşme yetersizse, sonuç makul bir
+    # dörtgen değilse ya da korelasyon doğrulaması tutmazsa None. Dönüş: (köşeler, inlier sayısı)
+    def hizala(self, goruntu: np.ndarray) -> Tuple[Optional[np.ndarray], int]:
+        orb, eslestirici = self._orb()
+        gri = cv2.cvtColor(goruntu, cv2.COLOR_BGR2GRAY) if len(goruntu.shape) == 3 else goruntu
+        noktalar, tanimlayicilar = orb.detectAndCompute(gri, None)
+        if tanimlayicilar is None or len(noktalar) < self.min_inlier:
+            return None, 0
+
+        # Lowe oran testi: en iyi eşleşme ikinciden belirgin şekilde iyi olmalı
+        iyiler = [m[0] for m in eslestirici.knnMatch(self._referans_tanimlayicilari, tanimlayicilar, k=2)
+                  if len(m) == 2 and m[0].distance < self.oran_esigi * m[1].distance]
+        if len(iyiler) < self.min_inlier:
+            return None, 0
+
+        kaynak = np.float32([self._referans_noktalari[m.queryIdx].pt for m in iyiler]).reshape(-1, 1, 2)
+        hedef = np.float32([noktalar[m.trainIdx].pt for m in iyiler]).reshape(-1, 1, 2)
+        matris, maske = cv2.findHomography(kaynak, hedef, cv2.RANSAC, self.ransac_esigi)
+        inlier = int(maske.sum()) if maske is not None else 0
+        if matris is None or inlier < self.min_inlier:
+            return None, inlier
+
+        koseler = cv2.perspectiveTransform(self.referans_koseleri, matris).reshape(4, 2)
+
+        # Kendi üzerine katlanan ya da görüntüye göre çok küçük dörtgenler reddedilir
+        h, w = gri.shape[:2]
+        if not cv2.isContourConvex(koseler.astype(np.float32)) or \
+                abs(cv2.contourArea(koseler)) < 0.1 * h * w:
+            return None, inlier
+
+        korelasyon = self.korelasyon(gri, matris)
+        if korelasyon < self.min_korelasyon:
+            logger.debug("Hizalama doğrulanamadı: korelasyon %.3f (%d inlier)", korelasyon, inlier)
+            return None, inlier
+        return koseler, inlier
+
+
+# Şablonun basılı geometrisinden (page_layout, bubble_lattice) boş formun normalize sayfa
+# çizimi: kutular, başlık şeritleri, baloncuk halkaları, şık harfleri ve soru numaraları.
+def referans_ciz(sablon_adi: str, boyut: Tuple[int, int] = (1600, 2264)) -> np.ndarray:
+    sablon = get_template(sablon_adi)
+    if sablon is None or 'page_layout' not in sablon:
+        raise ValueError(f"Şablonun sayfa düzeni yok: {sablon_adi}")
+    duzen, kafes = sablon['page_layout'], sablon['bubble_lattice']
+    w, h = boyut
+    sayfa = np.full((h, w), 255, dtype=np.uint8)
+
+    def kutu_ciz(oranlar, baslik):
+        x1, y1, x2, y2 = (int(round(o * k)) for o, k in zip(oranlar, (w, h, w, h)))
+        cv2.rectangle(sayfa, (x1, y1), (x2, y2), 40, 3)
+        ust = y1 + int((y2 - y1) * baslik)
+        cv2.line(sayfa, (x1, ust), (x2, ust), 40, 2)
+        return x1, ust, x2, y2
+
+    satir_sayisi = len(sablon['name_section']['alphabet'])
+    for oranlar in duzen['name_boxes']:
+        x1, y1, x2, y2 = kutu_ciz(oranlar, duzen['name_header'])
+        satir_h, sutun_w = (y2 - y1) / satir_sayisi, (x2 - x1) / 12
+        for sutun in range(12):
+            for satir in range(satir_sayisi):
+                merkez = (int(x1 + (sutun + 0.5) * sutun_w), int(y1 + (satir + 0.5) * satir_h))
+                cv2.circle(sayfa, merkez, int(kafes['name_radius'] * satir_h), 120, 1)
+
+    bolumler = sablon['answer_sections']
+    for oranlar, bolum in zip(duzen['answer_boxes'], bolumler):
+        x1, y1, x2, y2 = kutu_ciz(oranlar, duzen['answer_header'])
+        satir_h = (y2 - y1) / bolum['questions']
+        for satir in range(bolum['questions']):
+            cy = int(y1 + (satir + 0.5) * satir_h)
+            cv2.putText(sayfa, str(bolum['start_question'] + satir), (x1 + 4, cy + 5),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.35, 60, 1)
+            for oran, harf in zip(kafes['choice_x'], bolum['choices']):
+                cx = int(x1 + oran * (x2 - x1))
+                cv2.circle(sayfa, (cx, cy), int(kafes['answer_radius'] * satir_h), 120, 1)
+                cv2.putText(sayfa, harf, (cx - 4, cy + 4), cv2.FONT_HERSHEY_SIMPLEX, 0.3, 120, 1)
+
+    return sayfa
+
+
+# Şablonun hizalayıcısı (süreç başına bir kez kurulur). Referans, şablonun reference_image
+# taraması; o yoksa page_layout'tan çizilir. İkisi de yoksa ya da dosya okunamazsa None -
+# okuyucu kağıt tespit stratejilerine düşer.
+@lru_cache(maxsize=8)
+def sablon_hizalayici(sablon_adi: str) -> Optional[SablonHizalayici]:
+    sablon = get_template(sablon_adi)
+    if sablon is None:
+        return None
+
+    yol = sablon.get('reference_image')
+    if yol:
+        yol = os.path.join(_TEMEL_KLASOR, yol)
+        referans = cv2.imread(yol)
+        if referans is None:
+            logger.warning("Şablon referans görüntüsü okunamadı: %s", yol)
+            return None
+    elif 'page_layout' in sablon:
+        referans = referans_ciz(sablon_adi)
+    else:
+        return None
+
+    try:
+        return SablonHizalayici(referans)
+    except ValueError as e:
+        logger.warning("Şablon hizalayıcı kurulamadı (%s): %s", sablon_adi, e)
+        return None
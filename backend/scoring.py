@@ -0,0 +1,133 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from answer_sheet import BOS_KODU, CevapDizisi, kodla, kodlari_coz
+
+# Yanlış başına düşülen doğru sayısı (4 yanlış 1 doğruyu götürür)
+NET_KATSAYISI = 0.25
+
+
+# Cevap anahtarının dizi hali: soru başına doğru cevap kodu, puan ve formdaki soru numarası;
+# dersler soru dizisinde ardışık aralıklardır (sinirlar[i]..sinirlar[i+1]).
+class DerlenmisAnahtar:
+    __slots__ = ('dogru_kodlar', 'puanlar', 'soru_nolari', 'sinirlar', 'ders_adlari', 'ders_idleri')
+
+    def __init__(self, dogru_kodlar: np.ndarray, puanlar: np.ndarray, soru_nolari: np.ndarray,
+                 sinirlar: np.ndarray, ders_adlari: List[str], ders_idleri: Optional[List] = None):
+        self.dogru_kodlar = np.asarray(dogru_kodlar, dtype=np.uint8)
+        self.puanlar = np.asarray(puanlar, dtype=np.float64)
+        self.soru_nolari = np.asarray(soru_nolari, dtype=np.int64)
+        self.sinirlar = np.asarray(sinirlar, dtype=np.int64)
+        self.ders_adlari = ders_adlari
+        self.ders_idleri = ders_idleri or [None] * len(ders_adlari)
+
+    @property
+    def soru_sayisi(self) -> int:
+        return len(self.dogru_kodlar)
+
+    # Soru başına ders indeksi
+    def ders_indeksleri(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self.ders_adlari)), np.diff(self.sinirlar))
+
+
+# Veritabanındaki cevap anahtarını (get_answer_key_details) derler. Dersler sırayla
+# numaralanır: ilk dersin soruları 1..n, ikincininki n+1.. (formdaki soru sırası).
+def anahtar_derle(answer_key: Dict) -> DerlenmisAnahtar:
+    kodlar, puanlar, adlar, idler, sinirlar = [], [], [], [], [0]
+    for subject in answer_key['subjects']:
+        kodlar.extend(kodla(cevap) for cevap in subject['answers'])
+        puanlar.extend(subject['points'])
+        adlar.append(subject['subject_name'])
+        idler.append(subject.get('id'))
+        sinirlar.append(len(kodlar))
+    return DerlenmisAnahtar(kodlar, puanlar, np.arange(1, len(kodlar) + 1), sinirlar, adlar, idler)
+
+
+# {soru_no: doğru harf} sözlüğünü tek dersli, soru başına 1 puanlık anahtara çevirir
+def sozlukten_derle(dogru_cevaplar: Dict[int, str], ders_adi: str = '') -> DerlenmisAnahtar:
+    soru_nolari = list(dogru_cevaplar)
+    return DerlenmisAnahtar([kodla(dogru_cevaplar[n]) for n in soru_nolari], np.ones(len(soru_nolari)),
+                            soru_nolari, [0, len(soru_nolari)], [ders_adi])
+
+
+# Okunan cevapları (CevapDizisi, tek formun kodları ya da (N, soru) kod matrisi) anahtarın
+# sorularına hizalar. Formda olmayan sorular boş sayılır.
+def kod_matrisi(cevaplar, anahtar: DerlenmisAnahtar) -> np.ndarray:
+    if isinstance(cevaplar, CevapDizisi):
+        cevaplar = cevaplar.kodlar
+    kodlar = np.atleast_2d(np.asarray(cevaplar, dtype=np.uint8))
+
+    dolgulu = np.zeros((kodlar.shape[0], kodlar.shape[1] + 1), dtype=np.uint8)
+    dolgulu[:, 1:] = kodlar
+    # Soru numarası 1'den başlar; 0. sütun aralık dışı sorular için boş dolgudur
+    indeks = np.where((anahtar.soru_nolari >= 1) & (anahtar.soru_nolari <= kodlar.shape[1]),
+                      anahtar.soru_nolari, 0)
+    return dolgulu[:, indeks]
+
+
+# Formları puanlar. cevaplar: CevapDizisi, (soru,) ya da (N, soru) kod dizisi.
+# Dönüş (N form, S ders): 'dogru', 'yanlis', 'bos' sayıları, 'net' ve 'puan'; ayrıca soru
+# bazında (N, Q) 'kodlar' ve 'dogru_mu'. Tek form verilirse ilk eksen düşürülmez (N = 1).
+def puanla(cevaplar, anahtar: DerlenmisAnahtar, net_katsayisi: float = NET_KATSAYISI) -> Dict[str, np.ndarray]:
+    kodlar = kod_matrisi(cevaplar, anahtar)
+
+    bos = kodlar == BOS_KODU
+    dogru = (kodlar == anahtar.dogru_kodlar) & ~bos
+    yanlis = ~dogru & ~bos
+
+    # Ders toplamları: kümülatif toplamın ders sınırlarındaki farkları (boş ders 0 verir)
+    def ders_toplami(degerler: np.ndarray) -> np.ndarray:
+        kumulatif = np.zeros((degerler.shape[0], degerler.shape[1] + 1), dtype=np.float64)
+        np.cumsum(degerler, axis=1, out=kumulatif[:, 1:])
+        return kumulatif[:, anahtar.sinirlar[1:]] - kumulatif[:, anahtar.sinirlar[:-1]]
+
+    dogru_sayisi = ders_toplami(dogru).astype(np.int64)
+    yanlis_sayisi = ders_toplami(yanlis).astype(np.int64)
+    return {
+        'kodlar': kodlar,
+        'dogru_mu': dogru,
+        'dogru': dogru_sayisi,
+        'yanlis': yanlis_sayisi,
+        'bos': ders_toplami(bos).astype(np.int64),
+        'net': dogru_sayisi - yanlis_sayisi * net_katsayisi,
+        'puan': ders_toplami(np.where(dogru, anahtar.puanlar, 0.0)),
+    }
+
+
+# Tek formun puanlamasından soru başına kayıt satırları (student_answers tablosu biçimi)
+def soru_detaylari(anahtar: DerlenmisAnahtar, sonuc: Dict[str, np.ndarray], form: int = 0) -> List[Dict]:
+    ders_idleri = [anahtar.ders_idleri[i] for i in anahtar.ders_indeksleri().tolist()]
+    ogrenci = kodlari_coz(sonuc['kodlar'][form].tolist())
+    dogru_cevaplar = kodlari_coz(anahtar.dogru_kodlar.tolist())
+    dogru_mu = sonuc['dogru_mu'][form].tolist()
+    kazanilan = np.where(sonuc['dogru_mu'][form], anahtar.puanlar, 0.0).tolist()
+    return [
+        {'subject_id': ders_id, 'question_number': soru_no, 'student_answer': cevap,
+         'correct_answer': dogru_cevap, 'is_correct': isabet, 'points_earned': puan}
+        for ders_id, soru_no, cevap, dogru_cevap, isabet, puan
+        in zip(ders_idleri, anahtar.soru_nolari.tolist(), ogrenci, dogru_cevaplar, dogru_mu, kazanilan)
+    ]
+
+
+# Ders adlarına göre özet: {ad: {'score', 'correct', 'wrong', 'blank', 'net', 'total'}}
+def ders_ozeti(anahtar: DerlenmisAnahtar, sonuc: Dict[str, np.ndarray], form: int = 0) -> Dict[str, Dict]:
+    toplamlar = np.diff(anahtar.sinirlar).tolist()
+    return {
+        ad: {'score': round(puan, 2), 'correct': dogru, 'wrong': yanlis, 'blank': bos,
+             'net': round(net, 2), 'total': toplam}
+        for ad, puan, dogru, yanlis, bos, net, toplam in zip(
+            anahtar.ders_adlari, sonuc['puan'][form].tolist(), sonuc['dogru'][form].tolist(),
+            sonuc['yanlis'][form].tolist(), sonuc['bos'][form].tolist(), sonuc['net'][form].tolist(),
+            toplamlar)
+    }
+
+
+def toplam_puanlar(sonuc: Dict[str, np.ndarray]) -> np.ndarray:
+    return sonuc['puan'].sum(axis=1)
+
+
+def basari_yuzdeleri(sonuc: Dict[str, np.ndarray], anahtar: DerlenmisAnahtar) -> np.ndarray:
+    if anahtar.soru_sayisi == 0:
+        return np.zeros(sonuc['dogru'].shape[0])
+    return sonuc['dogru'].sum(axis=1) / anahtar.soru_sayisi * 100
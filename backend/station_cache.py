@@ -0,0 +1,56 @@
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger('omr.istasyon')
+
+
+# Sabit kameralı/tarayıcılı istasyonlar için son kabul edilen kağıt dörtgeni. Köşeler görüntü
+# boyutuna göre normalize (0..1) tutulur; böylece farklı çözme ölçeklerinde de kullanılabilir.
+# Dörtgen sadece aynı en-boy oranındaki görüntülere uygulanır.
+class IstasyonOnbellegi:
+
+    def __init__(self, esik: float = 0.6, oran_toleransi: float = 0.02):
+        # Önbellekteki dörtgenin kabulü için gereken en düşük dortgen_skoru
+        self.esik = esik
+        self.oran_toleransi = oran_toleransi
+        self._dortgenler: Dict[str, Tuple[np.ndarray, float]] = {}
+        self._sayaclar: Dict[str, list] = {}
+        self._kilit = threading.Lock()
+
+    # İstasyonun son dörtgeni (w, h) boyutundaki görüntünün piksel koordinatlarında; yoksa None
+    def al(self, istasyon: str, boyut: Tuple[int, int]) -> Optional[np.ndarray]:
+        w, h = boyut
+        with self._kilit:
+            kayit = self._dortgenler.get(istasyon)
+        if kayit is None:
+            return None
+
+        normal, oran = kayit
+        if abs(w / h - oran) > self.oran_toleransi * oran:
+            return None
+        return normal * np.array([w, h], dtype=np.float32)
+
+    # Tam aramada bulunan dörtgeni (w, h) boyutundaki görüntünün koordinatlarında kaydeder
+    def kaydet(self, istasyon: str, koseler: np.ndarray, boyut: Tuple[int, int]):
+        w, h = boyut
+        normal = koseler.astype(np.float32) / np.array([w, h], dtype=np.float32)
+        with self._kilit:
+            self._dortgenler[istasyon] = (normal, w / h)
+
+    def unut(self, istasyon: str):
+        with self._kilit:
+            self._dortgenler.pop(istasyon, None)
+
+    # Önbellek kontrolünün sonucunu sayar (isabet / ıska)
+    def say(self, istasyon: str, isabet: bool):
+        with self._kilit:
+            sayac = self._sayaclar.setdefault(istasyon, [0, 0])
+            sayac[0 if isabet else 1] += 1
+
+    # İstasyon başına isabet/ıska sayıları
+    def istatistikler(self) -> Dict[str, Dict[str, int]]:
+        with self._kilit:
+            return {istasyon: {'hits': s[0], 'misses': s[1]} for istasyon, s in self._sayaclar.items()}
@@ -0,0 +1,110 @@
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger('omr.istatistik')
+
+# (şablon, cihaz, strateji) -> [deneme, başarı, toplam süre]
+Anahtar = Tuple[str, str, str]
+
+
+# Kağıt tespit stratejilerinin başarı/süre istatistikleri. Her deneme (şablon, cihaz, strateji)
+# anahtarıyla ve şablon geneli ('' cihazı) altında sayılır. Sıralama beklenen başarıya kadar
+# maliyete göredir: ortalama süre / başarı olasılığı küçük olan önce denenir.
+# Okuma yolunda veritabanına yazılmaz: artışlar bellekte biriktirilir ve arka plan iş
+# parçacığı yazma_araligi saniyede bir tek toplu upsert ile yazar (çıkışta kalanlar da).
+# Kayıtlar açılışta geri yüklenir.
+class StratejiIstatistikleri:
+
+    def __init__(self, db=None, min_deneme: int = 5, yazma_araligi: float = 5.0):
+        self.db = db
+        self.min_deneme = min_deneme
+        self.yazma_araligi = yazma_araligi
+        self._sayaclar: Dict[Anahtar, List[float]] = {}
+        # Henüz yazılmamış artışlar
+        self._bekleyen: Dict[Anahtar, List[float]] = {}
+        self._kilit = threading.Lock()
+        self._yazici: Optional[threading.Thread] = None
+
+        if db is not None:
+            try:
+                for satir in db.get_strategy_stats():
+                    anahtar = (satir['template'], satir['device'], satir['strategy'])
+                    self._sayaclar[anahtar] = [satir['attempts'], satir['successes'], satir['total_time']]
+            except Exception as e:
+                logger.warning("Strateji istatistikleri yüklenemedi: %s", e)
+
+    # Stratejileri beklenen maliyete göre sıralar. Cihazın yeterli kaydı yoksa şablon
+    # geneline, o da yoksa verilen (sabit) sıraya düşer.
+    def sirala(self, stratejiler: List[Tuple[str, str]], sablon: str,
+               cihaz: Optional[str] = None) -> List[Tuple[str, str]]:
+        with self._kilit:
+            for seviye in ([cihaz, ''] if cihaz else ['']):
+                sayaclar = [self._sayaclar.get((sablon, seviye, s[0])) for s in stratejiler]
+                if sum(s[0] for s in sayaclar if s) >= self.min_deneme:
+                    break
+            else:
+                return list(stratejiler)
+
+        # Hiç denenmemiş stratejiye bilinenlerin medyan süresi ve 0.5 başarı olasılığı verilir
+        sureler = sorted(s[2] / s[0] for s in sayaclar if s and s[0])
+        medyan_sure = sureler[len(sureler) // 2] if sureler else 1.0
+
+        def maliyet(i: int) -> float:
+            s = sayaclar[i]
+            if not s or not s[0]:
+                return medyan_sure / 0.5
+            olasilik = (s[1] + 1) / (s[0] + 2)
+            return (s[2] / s[0]) / olasilik
+
+        # Eşit maliyette sabit sıra korunur (sorted kararlıdır)
+        sira = sorted(range(len(stratejiler)), key=maliyet)
+        return [stratejiler[i] for i in sira]
+
+    # Bir okumadaki denemeleri kaydeder: denemeler = [(strateji, başarılı mı, süre sn), ...]
+    def kaydet(self, sablon: str, cihaz: Optional[str],
+               denemeler: Iterable[Tuple[str, bool, float]]):
+        denemeler = list(denemeler)
+        if not denemeler:
+            return
+
+        with self._kilit:
+            for seviye in ([cihaz, ''] if cihaz else ['']):
+                for strateji, basarili, sure in denemeler:
+                    for tablo in ((self._sayaclar, self._bekleyen) if self.db is not None else (self._sayaclar,)):
+                        sayac = tablo.setdefault((sablon, seviye, strateji), [0, 0, 0.0])
+                        sayac[0] += 1
+                        sayac[1] += int(basarili)
+                        sayac[2] += sure
+            if self.db is not None and self._yazici is None:
+                self._yazici_baslat()
+
+    # Bekleyen artışları veritabanına yazar. Yazılamazsa artışlar bir sonraki yazmaya kalır.
+    def bosalt(self):
+        with self._kilit:
+            bekleyen, self._bekleyen = self._bekleyen, {}
+        if not bekleyen or self.db is None:
+            return
+
+        try:
+            self.db.add_strategy_stats([anahtar + tuple(artis) for anahtar, artis in bekleyen.items()])
+        except Exception as e:
+            logger.warning("Strateji istatistikleri kaydedilemedi: %s", e)
+            with self._kilit:
+                for anahtar, artis in bekleyen.items():
+                    sayac = self._bekleyen.setdefault(anahtar, [0, 0, 0.0])
+                    for i, deger in enumerate(artis):
+                        sayac[i] += deger
+
+    # Kilit altında çağrılır; ilk kayıtta bir kez
+    def _yazici_baslat(self):
+        def calis():
+            while True:
+                time.sleep(self.yazma_araligi)
+                self.bosalt()
+
+        self._yazici = threading.Thread(target=calis, name='strateji-istatistik-yazici', daemon=True)
+        self._yazici.start()
+        atexit.register(self.bosalt)
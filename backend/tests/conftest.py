@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Backend modülleri paket değil, düz modül olarak içe aktarılır (app.py'deki gibi)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,151 @@
+import cv2
+import numpy as np
+import pytest
+
+from bubble_lattice import daire_istatistikleri, kafes_ornekle
+from image_processor import OptikFormOkuyucu
+
+
+# Vektörleştirme öncesi cevaplari_oku_renkli'deki daire başına maske döngüsü
+def _eski_olcum(gri, daire):
+    h, w = gri.shape[:2]
+    cx, cy, r = float(daire[0]), float(daire[1]), float(daire[2])
+    x1, y1 = max(0, int(cx - r)), max(0, int(cy - r))
+    x2, y2 = min(w, int(cx + r)), min(h, int(cy + r))
+    roi = gri[y1:y2, x1:x2]
+    if roi.size == 0:
+        return [np.nan] * 3
+
+    mask = np.zeros(roi.shape, dtype=np.uint8)
+    mcx, mcy = roi.shape[1] // 2, roi.shape[0] // 2
+    mr = min(mcx, mcy)
+    if mr < 2:
+        return [np.nan] * 3
+    cv2.circle(mask, (mcx, mcy), mr, 255, -1)
+
+    pixels = roi[mask == 255]
+    if len(pixels) == 0:
+        return [np.nan] * 3
+    return [float(np.mean(pixels)), float(np.std(pixels)), float(np.min(pixels))]
+
+
+@pytest.fixture
+def gri():
+    return np.random.default_rng(7).integers(0, 256, (120, 160), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('tohum', range(3))
+def test_daire_istatistikleri_eski_dongu_ile_ayni(gri, tohum):
+    rng = np.random.default_rng(tohum)
+    n = 2000
+    daireler = np.column_stack([
+        rng.uniform(0, gri.shape[1], n),
+        rng.uniform(0, gri.shape[0], n),
+        # Yarısı 0-4 px: ölçülemeyen ve en küçük ölçülebilir diskler
+        np.where(rng.random(n) < 0.5, rng.uniform(0, 4, n), rng.uniform(0, 14, n)),
+    ])
+
+    beklenen = np.array([_eski_olcum(gri, d) for d in daireler])
+    np.testing.assert_allclose(daire_istatistikleri(gri, daireler), beklenen, atol=1e-9)
+
+
+def test_daire_istatistikleri_kenar_ve_kucuk_yaricap(gri):
+    h, w = gri.shape
+    daireler = np.array([
+        [0, 0, 6], [w - 1, h - 1, 6], [0.4, h / 2, 9.7], [w - 0.2, 3, 5.5],  # köşe ve kenarlar
+        [w / 2, 0, 3], [w / 2, h - 0.5, 4.9],
+        [40, 40, 0], [40, 40, 1.9], [40, 40, 2.0], [40, 40, 2.5], [40.7, 40.3, 3.99],  # küçük yarıçaplar
+    ])
+
+    beklenen = np.array([_eski_olcum(gri, d) for d in daireler])
+    np.testing.assert_allclose(daire_istatistikleri(gri, daireler), beklenen, atol=1e-9)
+    assert np.isnan(beklenen[6:8]).all() and not np.isnan(beklenen[8:]).any()
+
+
+def test_daire_istatistikleri_goruntu_disindaki_merkez_olculmez(gri):
+    # Eski döngüde negatif x2/y2 dilimi görüntünün öbür ucuna sarıyordu
+    daireler = np.array([[-4.8, 7.4, 2.6], [112.5, -4.9, 2.3], [-30, -30, 10]])
+    assert np.isnan(daire_istatistikleri(gri, daireler)).all()
+
+
+def test_daire_istatistikleri_bos_girdi(gri):
+    assert daire_istatistikleri(gri, np.empty((0, 3))).shape == (0, 3)
+
+
+# Normalize sayfadan kırpılmış bir cevap bölgesi (YGS: 40 soru, ~266x2264): kutu çerçevesi,
+# şık harfli baloncuk halkaları ve tamamen doldurulmuş işaretler. bas: ilk şıkkın x oranı,
+# kaydir_y: satırların satır yüksekliği cinsinden kayması.
+def _cevap_bolgesi(secimler, bas=0.30, kaydir_y=0.0, h=2264, w=266):
+    gri = np.full((h, w), 235, dtype=np.uint8)
+    cv2.rectangle(gri, (1, 1), (w - 2, h - 2), 40, 2)
+    satir_yuksekligi = h / len(secimler)
+    r = int(0.30 * satir_yuksekligi)
+    for satir, secim in enumerate(secimler):
+        cy = int((satir + 0.5 + kaydir_y) * satir_yuksekligi)
+        for sik in range(5):
+            cx = int((bas + 0.14 * sik) * w)
+            cv2.circle(gri, (cx, cy), r, 90, 2)
+            cv2.putText(gri, 'ABCDE'[sik], (cx - 7, cy + 7), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 110, 2)
+            if secim == sik:
+                cv2.circle(gri, (cx, cy), r, 30, -1)
+    return gri
+
+
+# Ad/soyad bölgesi (~533x1132): 29 harf satırı, karakter başına bir sütun
+def _isim_bolgesi(metin, alfabe, karakter=12, h=1132, w=533):
+    gri = np.full((h, w), 235, dtype=np.uint8)
+    satir_yuksekligi, sutun_genisligi = h / len(alfabe), w / karakter
+    r = int(0.28 * satir_yuksekligi)
+    for sutun in range(karakter):
+        for satir, harf in enumerate(alfabe):
+            merkez = (int((sutun + 0.5) * sutun_genisligi), int((satir + 0.5) * satir_yuksekligi))
+            cv2.circle(gri, merkez, r, 90, 2)
+            if sutun < len(metin) and metin[sutun] == harf:
+                cv2.circle(gri, merkez, r, 30, -1)
+    return gri
+
+
+@pytest.fixture(scope='module')
+def okuyucu():
+    return OptikFormOkuyucu(hizalama=False)
+
+
+@pytest.fixture
+def secimler():
+    # -1 boş satır
+    return np.random.default_rng(0).integers(-1, 5, 40)
+
+
+def test_kafes_isaretli_satirlari_okur(okuyucu, secimler):
+    cevaplar = okuyucu.cevaplari_oku_kafes(_cevap_bolgesi(secimler), 40)
+
+    assert cevaplar is not None
+    np.testing.assert_array_equal(cevaplar.kodlar.astype(int) - 1, secimler)
+
+
+@pytest.mark.parametrize('bas,kaydir_y', [(0.26, 0.0), (0.34, 0.0), (0.35, 0.2)])
+def test_kafes_kaymis_baloncuklara_hizalanir(okuyucu, secimler, bas, kaydir_y):
+    gri = _cevap_bolgesi(secimler, bas, kaydir_y)
+    h, w = gri.shape
+
+    merkezler, _, _ = kafes_ornekle(gri, 'ygs', 'answers')
+    # Şablondaki choice_x'ten 0.05w'ye kadar kaymış sütunlar basılı baloncuklara oturur
+    np.testing.assert_allclose(merkezler[0, :, 0], (bas + 0.14 * np.arange(5)) * w, atol=3)
+    np.testing.assert_allclose(merkezler[:, 0, 1], (np.arange(40) + 0.5 + kaydir_y) * h / 40, atol=3)
+
+    cevaplar = okuyucu.cevaplari_oku_kafes(gri, 40)
+    np.testing.assert_array_equal(cevaplar.kodlar.astype(int) - 1, secimler)
+
+
+def test_kafes_hizalanamayan_bolgede_none_doner(okuyucu, secimler):
+    # Sütunlar 0.20w'den başlıyor: beklenen konumların arama penceresi dışında
+    gri = _cevap_bolgesi(secimler, bas=0.20)
+
+    assert kafes_ornekle(gri, 'ygs', 'answers') is None
+    assert okuyucu.cevaplari_oku_kafes(gri, 40) is None
+
+
+def test_kafes_isim_karakter_sayisini_cagirandan_alir(okuyucu):
+    gri = _isim_bolgesi('ÇAĞLAR', okuyucu.alfabe)
+
+    assert okuyucu.isim_oku_kafes(gri, 12) == 'ÇAĞLAR'
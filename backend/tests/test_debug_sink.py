@@ -0,0 +1,51 @@
+import os
+
+import numpy as np
+import pytest
+
+from debug_sink import DebugKaydedici
+from image_processor import OkumaBaglami
+
+
+def _baglam(kaydedici):
+    baglam = OkumaBaglami('balanced', debug=kaydedici.ornekle())
+    if baglam.debug:
+        baglam.debug_yaz('0_orijinal', np.zeros((8, 8, 3), dtype=np.uint8))
+    return baglam
+
+
+def _yazilan_okumalar(klasor):
+    return sorted(os.listdir(klasor))
+
+
+@pytest.mark.parametrize('politika,sonuclar,yazilan', [
+    ('hepsi', [(True, 0.9), (False, None), (True, 0.1)], [0, 1, 2]),
+    ('basarisiz', [(True, 0.9), (False, None), (True, 0.1)], [1]),
+    ('dusuk_guven', [(True, 0.9), (False, None), (True, 0.1)], [1, 2]),
+    ('her_n', [(True, 0.9), (False, None), (True, 0.1), (True, 0.9)], [0, 2]),
+])
+def test_orneklenen_okumalar_yazilir(tmp_path, politika, sonuclar, yazilan):
+    kaydedici = DebugKaydedici(str(tmp_path), politika=politika, her_n=2)
+    baglamlar = [_baglam(kaydedici) for _ in sonuclar]
+    for baglam, (basarili, guven) in zip(baglamlar, sonuclar):
+        kaydedici.okuma_bitir(baglam, basarili, guven)
+    kaydedici.bekle()
+
+    assert _yazilan_okumalar(tmp_path) == [baglamlar[i].okuma_id for i in yazilan]
+    for i in yazilan:
+        assert os.listdir(tmp_path / baglamlar[i].okuma_id) == ['0_orijinal.jpg']
+
+
+def test_en_yeni_okumalar_saklanir(tmp_path):
+    kaydedici = DebugKaydedici(str(tmp_path), saklanan=2)
+    baglamlar = [_baglam(kaydedici) for _ in range(4)]
+    for baglam in baglamlar:
+        kaydedici.okuma_bitir(baglam, True, 0.9)
+        kaydedici.bekle()
+
+    assert _yazilan_okumalar(tmp_path) == [b.okuma_id for b in baglamlar[-2:]]
+
+
+def test_bilinmeyen_politika(tmp_path):
+    with pytest.raises(ValueError):
+        DebugKaydedici(str(tmp_path), politika='bazen')
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from image_processor import OkumaBaglami, OptikFormOkuyucu
+
+
+# A4 oranında, görüntünün büyük kısmını kaplayan ve %10'undan küçük iki dörtgen
+BUYUK = np.array([[100, 60], [540, 60], [540, 680], [100, 680]], dtype=np.float32)
+KUCUK = np.array([[10, 10], [60, 10], [60, 80], [10, 80]], dtype=np.float32)
+
+
+@pytest.fixture
+def goruntu():
+    gri = np.full((800, 640, 3), 40, dtype=np.uint8)
+    gri[60:680, 100:540] = 230
+    return gri
+
+
+@pytest.fixture
+def okuyucu():
+    okuyucu = OptikFormOkuyucu(yaris_modu=True, hizalama=False)
+    okuyucu.yaris_suresi = 0.2
+    return okuyucu
+
+
+def test_yaris_skoru_sifir_olan_dortgeni_yedek_olarak_tutar(okuyucu, goruntu):
+    okuyucu.kucuk_kagit = lambda goruntu, baglam=None: KUCUK
+    okuyucu.bulamayan = lambda goruntu, baglam=None: None
+    stratejiler = [('bulamayan', 'yok'), ('kucuk_kagit', 'küçük')]
+
+    koseler, kazanan, _ = okuyucu.stratejileri_yaristir(goruntu, stratejiler)
+    sirali_koseler, sirali_kazanan, _ = okuyucu.stratejileri_sirayla(goruntu, stratejiler)
+
+    assert kazanan == sirali_kazanan == 'kucuk_kagit'
+    np.testing.assert_array_equal(koseler, sirali_koseler)
+
+
+def test_yaris_skoru_yuksek_dortgeni_secer(okuyucu, goruntu):
+    okuyucu.kucuk_kagit = lambda goruntu, baglam=None: KUCUK
+    okuyucu.buyuk_kagit = lambda goruntu, baglam=None: BUYUK
+
+    _, kazanan, _ = okuyucu.stratejileri_yaristir(goruntu, [('kucuk_kagit', 'küçük'), ('buyuk_kagit', 'büyük')])
+
+    assert kazanan == 'buyuk_kagit'
+
+
+def test_yaris_sonrasi_geciken_strateji_baglama_yazmaz(okuyucu, goruntu):
+    baglam = OkumaBaglami('balanced', debug=True)
+    geciken_bitti = threading.Event()
+
+    def hizli(goruntu, baglam=None):
+        okuyucu.debug_yaz(baglam, 'hizli', goruntu)
+        return BUYUK
+
+    def geciken(goruntu, baglam=None):
+        try:
+            time.sleep(0.5)
+            okuyucu.debug_yaz(baglam, 'geciken', goruntu)
+            with okuyucu.asama(baglam, 'geciken'):
+                pass
+            return BUYUK
+        finally:
+            geciken_bitti.set()
+
+    okuyucu.hizli, okuyucu.geciken = hizli, geciken
+    koseler, kazanan, denemeler = okuyucu.stratejileri_yaristir(
+        goruntu, [('hizli', 'hızlı'), ('geciken', 'geciken')], baglam)
+
+    assert kazanan == 'hizli' and [d[0] for d in denemeler] == ['hizli']
+    assert geciken_bitti.wait(2)
+    assert [ad for ad, _ in baglam.artefaktlar] == ['hizli']
+    assert 'geciken' not in baglam.sureler
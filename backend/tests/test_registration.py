@@ -0,0 +1,66 @@
+import cv2
+import numpy as np
+import pytest
+
+from registration import referans_ciz, sablon_hizalayici
+
+
+# Şablon çiziminden işaretli bir form: baloncuk halkalarından rastgele 200 tanesi doldurulur
+def _isaretli_form(tohum):
+    rng = np.random.default_rng(tohum)
+    sayfa = cv2.cvtColor(referans_ciz('ygs'), cv2.COLOR_GRAY2BGR)
+    _, _, kutular, merkezler = cv2.connectedComponentsWithStats((referans_ciz('ygs') < 200).astype(np.uint8))
+    halkalar = merkezler[(kutular[:, 2] > 12) & (kutular[:, 2] < 40) & (kutular[:, 3] > 12) & (kutular[:, 3] < 40)]
+    for merkez in halkalar[rng.choice(len(halkalar), 200, replace=False)]:
+        cv2.circle(sayfa, (int(merkez[0]), int(merkez[1])), 10, (30, 30, 30), -1)
+    return sayfa
+
+
+# Formu tespit seviyesi boyutundaki (750x1000) bir fotoğrafa bilinen homografiyle yerleştirir.
+# Dönüş: (fotoğraf, sayfa köşelerinin fotoğraftaki yerleri)
+def _fotograf(sayfa, tohum, genislik=750, yukseklik=1000):
+    rng = np.random.default_rng(tohum)
+    arka = cv2.add(np.full((yukseklik, genislik, 3), (60, 50, 40), dtype=np.uint8),
+                   rng.integers(0, 20, (yukseklik, genislik, 3), dtype=np.uint8))
+    kenar = 0.08
+    hedef = np.float32([[genislik * kenar, yukseklik * kenar], [genislik * (1 - kenar), yukseklik * kenar],
+                        [genislik * (1 - kenar), yukseklik * (1 - kenar)], [genislik * kenar, yukseklik * (1 - kenar)]])
+    hedef += rng.uniform(-30, 30, hedef.shape).astype(np.float32)
+
+    h, w = sayfa.shape[:2]
+    matris = cv2.getPerspectiveTransform(np.float32([[0, 0], [w - 1, 0], [w - 1, h - 1], [0, h - 1]]), hedef)
+    cekilmis = cv2.warpPerspective(sayfa, matris, (genislik, yukseklik), flags=cv2.INTER_AREA)
+    maske = cv2.warpPerspective(np.full((h, w), 255, dtype=np.uint8), matris, (genislik, yukseklik))
+    arka[maske > 0] = cekilmis[maske > 0]
+    return arka, hedef
+
+
+def test_referans_sablon_geometrisinden_cizilir():
+    referans = referans_ciz('ygs')
+
+    assert referans.shape == (2264, 1600)
+    assert sablon_hizalayici('ygs') is not None
+
+
+@pytest.mark.parametrize('tohum', range(6))
+def test_hizalama_bilinen_homografiyi_bulur(tohum):
+    foto, gercek = _fotograf(_isaretli_form(tohum), tohum)
+
+    koseler, inlier = sablon_hizalayici('ygs').hizala(foto)
+
+    assert koseler is not None and inlier >= 25
+    np.testing.assert_allclose(koseler, gercek, atol=4)
+    # Köşelerden kurulan homografi sayfa içini de doğru taşır (cevap bölgesinin ortası)
+    kaynak = np.float32([[0, 0], [1, 0], [1, 1], [0, 1]])
+    bulunan = cv2.perspectiveTransform(np.float32([[[0.6, 0.66]]]), cv2.getPerspectiveTransform(kaynak, koseler))
+    beklenen = cv2.perspectiveTransform(np.float32([[[0.6, 0.66]]]), cv2.getPerspectiveTransform(kaynak, gercek))
+    np.testing.assert_allclose(bulunan, beklenen, atol=4)
+
+
+def test_form_olmayan_goruntu_hizalanmaz():
+    rng = np.random.default_rng(0)
+    goruntu = cv2.GaussianBlur(rng.integers(0, 256, (1000, 750, 3), dtype=np.uint8), (5, 5), 0)
+
+    koseler, _ = sablon_hizalayici('ygs').hizala(goruntu)
+
+    assert koseler is None
@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+
+from answer_sheet import CevapDizisi, kodla
+from database import Database
+from scoring import anahtar_derle, basari_yuzdeleri, puanla, soru_detaylari, toplam_puanlar
+
+DERSLER = [
+    {'name': 'Türkçe', 'question_count': 3, 'points_per_question': 1, 'answers': ['A', 'B', 'C']},
+    {'name': 'Matematik', 'question_count': 2, 'points_per_question': 2, 'answers': ['D', 'E']},
+]
+
+# Öğrenci -> okunan cevaplar (genel soru numarası sırasıyla)
+OGRENCILER = {
+    'Ayşe': ['A', 'B', 'C', 'D', 'E'],
+    'Ali': ['A', 'C', 'BOŞ', 'D', 'A'],
+    'Can': ['B', 'BOŞ', 'C', 'BOŞ', 'E'],
+}
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'test.db'))
+
+
+# Anahtarı oluşturur ve öğrenci sonuçlarını form okunmuş gibi kaydeder
+@pytest.fixture
+def anahtar_id(db):
+    user_id = db.create_user('ogretmen', 'ogretmen@example.com', 'parola', 'Öğretmen')
+    answer_key_id = db.create_answer_key(user_id, 'Deneme', 'lise', DERSLER)
+    anahtar = anahtar_derle(db.get_answer_key_details(answer_key_id))
+    for ad, harfler in OGRENCILER.items():
+        sonuc = puanla(CevapDizisi(np.array([kodla(h) for h in harfler], dtype=np.uint8)), anahtar)
+        db.save_student_result(answer_key_id, {
+            'name': ad,
+            'total_score': round(float(toplam_puanlar(sonuc)[0]), 2),
+            'success_rate': round(float(basari_yuzdeleri(sonuc, anahtar)[0]), 2),
+        }, soru_detaylari(anahtar, sonuc))
+    return answer_key_id
+
+
+def _puanlar(db, answer_key_id):
+    return {r['student_name']: (r['total_score'], r['success_rate'])
+            for r in db.get_student_results(answer_key_id)}
+
+
+def _cevap_satirlari(db, answer_key_id, ogrenci):
+    conn = db.get_connection()
+    try:
+        rows = conn.execute('''
+            SELECT a.question_number, a.student_answer, a.correct_answer, a.is_correct, a.points_earned
+            FROM student_answers a JOIN student_results r ON r.id = a.result_id
+            WHERE r.answer_key_id = ? AND r.student_name = ?
+            ORDER BY a.question_number
+        ''', (answer_key_id, ogrenci)).fetchall()
+    finally:
+        conn.close()
+    return {row['question_number']: dict(row) for row in rows}
+
+
+def test_degismeyen_anahtar_sonuclari_degistirmez(db, anahtar_id):
+    once = _puanlar(db, anahtar_id)
+
+    assert db.regrade_answer_key(anahtar_id) == (3, 0)
+    assert _puanlar(db, anahtar_id) == once
+
+
+def test_cevap_degisikligi_etkilenen_sonuclari_sayar(db, anahtar_id):
+    # 2. sorunun cevabı B -> C: Ayşe bir doğru kaybeder, Ali bir doğru kazanır, Can boş bırakmış
+    dersler = [dict(DERSLER[0], answers=['A', 'C', 'C']), DERSLER[1]]
+
+    assert db.update_answer_key(anahtar_id, 1, 'lise', dersler, 'simple') == (3, 2)
+
+    puanlar = _puanlar(db, anahtar_id)
+    assert puanlar['Ayşe'] == (6.0, 80.0)
+    assert puanlar['Ali'] == (4.0, 60.0)
+    assert puanlar['Can'] == (3.0, 40.0)
+    satir = _cevap_satirlari(db, anahtar_id, 'Ali')[2]
+    assert (satir['correct_answer'], satir['is_correct'], satir['points_earned']) == ('C', 1, 1)
+
+
+def test_anahtardan_cikan_sorular_saklanir_ve_geri_puanlanir(db, anahtar_id):
+    once = _puanlar(db, anahtar_id)
+
+    # Matematik çıkarılır: 4. ve 5. sorular anahtar dışında kalır
+    assert db.update_answer_key(anahtar_id, 1, 'lise', DERSLER[:1], 'simple') == (3, 3)
+
+    assert _puanlar(db, anahtar_id) == {'Ayşe': (3.0, 100.0), 'Ali': (1.0, 33.33), 'Can': (1.0, 33.33)}
+    satirlar = _cevap_satirlari(db, anahtar_id, 'Ayşe')
+    assert sorted(satirlar) == [1, 2, 3, 4, 5]
+    for soru in (4, 5):
+        assert satirlar[soru]['correct_answer'] is None
+        assert satirlar[soru]['is_correct'] == 0
+        assert satirlar[soru]['points_earned'] == 0
+    assert [satirlar[s]['student_answer'] for s in (4, 5)] == ['D', 'E']
+
+    # Anahtar tekrar genişletilince saklanan cevaplar ilk puanlamaya döner
+    assert db.update_answer_key(anahtar_id, 1, 'lise', DERSLER, 'simple') == (3, 3)
+    assert _puanlar(db, anahtar_id) == once
+    satir = _cevap_satirlari(db, anahtar_id, 'Ayşe')[5]
+    assert (satir['correct_answer'], satir['is_correct'], satir['points_earned']) == ('E', 1, 2)
+
+
+def test_anahtara_eklenen_soru_bos_cevapla_eklenir(db, anahtar_id):
+    dersler = [DERSLER[0], dict(DERSLER[1], question_count=3, answers=['D', 'E', 'A'])]
+
+    assert db.update_answer_key(anahtar_id, 1, 'lise', dersler, 'simple') == (3, 3)
+
+    satir = _cevap_satirlari(db, anahtar_id, 'Ayşe')[6]
+    assert (satir['student_answer'], satir['correct_answer'], satir['is_correct']) == ('BOŞ', 'A', 0)
+    assert _puanlar(db, anahtar_id)['Ayşe'] == (7.0, 83.33)
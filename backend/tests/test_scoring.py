@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from answer_sheet import SECENEKLER, CevapDizisi, kodlari_coz
+from image_processor import OptikFormOkuyucu
+from scoring import (anahtar_derle, basari_yuzdeleri, ders_ozeti, puanla, soru_detaylari,
+                     toplam_puanlar)
+
+
+# Dizi tabanlı puanlamadan önceki app.compare_answers (sözlük döngüsü)
+def _eski_compare_answers(answer_key, student_answers):
+    total_score = 0
+    correct_count = 0
+    total_questions = 0
+    subject_scores = {}
+    detailed_answers = []
+    question_counter = 1
+
+    for subject in answer_key['subjects']:
+        subject_score = 0
+        subject_correct = 0
+        for i, correct_answer in enumerate(subject['answers']):
+            student_answer = student_answers.get(question_counter, 'BOŞ')
+            is_correct = (student_answer == correct_answer)
+            points_earned = subject['points'][i] if is_correct else 0
+            if is_correct:
+                correct_count += 1
+                subject_correct += 1
+                subject_score += points_earned
+                total_score += points_earned
+            detailed_answers.append({
+                'subject_id': subject['id'],
+                'question_number': question_counter,
+                'student_answer': student_answer,
+                'correct_answer': correct_answer,
+                'is_correct': is_correct,
+                'points_earned': points_earned
+            })
+            question_counter += 1
+            total_questions += 1
+
+        subject_scores[subject['subject_name']] = {
+            'score': subject_score, 'correct': subject_correct, 'total': len(subject['answers'])
+        }
+
+    success_rate = (correct_count / total_questions * 100) if total_questions > 0 else 0
+    return {
+        'total_score': round(total_score, 2),
+        'correct_count': correct_count,
+        'total_questions': total_questions,
+        'success_rate': round(success_rate, 2),
+        'subject_scores': subject_scores,
+        'detailed_answers': detailed_answers
+    }
+
+
+# Dizi tabanlı puanlamadan önceki OptikFormOkuyucu.sonuclari_karsilastir
+def _eski_sonuclari_karsilastir(ogrenci_cevaplari, dogru_cevaplar):
+    dogru = yanlis = bos = 0
+    detaylar = []
+    for soru_no, dogru_cevap in dogru_cevaplar.items():
+        ogrenci_cevap = ogrenci_cevaplari.get(soru_no, 'BOŞ')
+        if ogrenci_cevap == 'BOŞ':
+            bos += 1
+            sonuc = 'boş'
+        elif ogrenci_cevap == dogru_cevap:
+            dogru += 1
+            sonuc = 'doğru'
+        else:
+            yanlis += 1
+            sonuc = 'yanlış'
+        detaylar.append({'soru': soru_no, 'ogrenci': ogrenci_cevap, 'dogru': dogru_cevap, 'sonuc': sonuc})
+
+    toplam = len(dogru_cevaplar)
+    basari = (dogru / toplam * 100) if toplam > 0 else 0
+    return {
+        'dogru_sayisi': dogru,
+        'yanlis_sayisi': yanlis,
+        'bos_sayisi': bos,
+        'toplam_soru': toplam,
+        'basari_yuzdesi': round(basari, 2),
+        'net': round(dogru - (yanlis / 4), 2),
+        'detaylar': detaylar
+    }
+
+
+# Rastgele çok dersli anahtar (get_answer_key_details biçimi) ve okunan cevaplar. Okunan
+# dizi anahtardan kısa ya da uzun olabilir; kısa kalan sorular eski sözlükte de boştur.
+def _rastgele_sinav(rng):
+    subjects = []
+    for ders in range(rng.integers(1, 5)):
+        soru = int(rng.integers(1, 16))
+        subjects.append({
+            'id': 10 + ders,
+            'subject_name': f'Ders {ders}',
+            'answers': [SECENEKLER[i] for i in rng.integers(0, 5, soru)],
+            'points': np.round(rng.uniform(0.25, 3, soru), 2).tolist(),
+        })
+    toplam = sum(len(s['answers']) for s in subjects)
+    kodlar = rng.integers(0, 6, int(rng.integers(max(1, toplam - 5), toplam + 5))).astype(np.uint8)
+    return {'subjects': subjects}, CevapDizisi(kodlar)
+
+
+@pytest.mark.parametrize('tohum', range(50))
+def test_puanlama_eski_sozluk_karsilastirmasiyla_ayni(tohum):
+    answer_key, cevaplar = _rastgele_sinav(np.random.default_rng(tohum))
+    eski = _eski_compare_answers(answer_key, dict(enumerate(kodlari_coz(cevaplar.kodlar.tolist()), 1)))
+
+    anahtar = anahtar_derle(answer_key)
+    sonuc = puanla(cevaplar, anahtar)
+
+    assert round(float(toplam_puanlar(sonuc)[0]), 2) == pytest.approx(eski['total_score'])
+    assert int(sonuc['dogru'].sum()) == eski['correct_count']
+    assert anahtar.soru_sayisi == eski['total_questions']
+    assert round(float(basari_yuzdeleri(sonuc, anahtar)[0]), 2) == eski['success_rate']
+
+    ozet = ders_ozeti(anahtar, sonuc)
+    for ad, eski_ders in eski['subject_scores'].items():
+        assert ozet[ad]['score'] == pytest.approx(round(eski_ders['score'], 2))
+        assert ozet[ad]['correct'] == eski_ders['correct']
+        assert ozet[ad]['total'] == eski_ders['total']
+        assert ozet[ad]['correct'] + ozet[ad]['wrong'] + ozet[ad]['blank'] == eski_ders['total']
+
+    yeni_detay = soru_detaylari(anahtar, sonuc)
+    assert len(yeni_detay) == len(eski['detailed_answers'])
+    for yeni, eski_satir in zip(yeni_detay, eski['detailed_answers']):
+        assert yeni == pytest.approx(eski_satir)
+
+
+@pytest.fixture(scope='module')
+def okuyucu():
+    return OptikFormOkuyucu(hizalama=False)
+
+
+@pytest.mark.parametrize('tohum', range(20))
+def test_sonuclari_karsilastir_eski_sozluk_karsilastirmasiyla_ayni(okuyucu, tohum):
+    rng = np.random.default_rng(tohum)
+    cevaplar = CevapDizisi(rng.integers(0, 6, 40).astype(np.uint8))
+    # Anahtar formdaki tüm soruları kapsamayabilir, formda olmayan soru içerebilir ve sırasız olabilir
+    soru_nolari = rng.choice(np.arange(1, 46), int(rng.integers(1, 45)), replace=False).tolist()
+    dogru_cevaplar = {n: SECENEKLER[int(rng.integers(0, 5))] for n in soru_nolari}
+
+    yeni = okuyucu.sonuclari_karsilastir(cevaplar, dogru_cevaplar)
+    eski = _eski_sonuclari_karsilastir(dict(enumerate(kodlari_coz(cevaplar.kodlar.tolist()), 1)),
+                                       dogru_cevaplar)
+
+    assert yeni == eski
@@ -27,6 +27,7 @@ class _StudentResultDetailScreenState extends State<StudentResultDetailScreen>
   String? _error;
   late TabController _tabController;
   Uint8List? _imageBytes;
+  String? _imageUrl;
 
   @override
   void initState() {
@@ -68,7 +69,10 @@ class _StudentResultDetailScreenState extends State<StudentResultDetailScreen>
             final result = data['result'];
             debugPrint('✅ Deneme $attempt BAŞARILI - Veri alındı');
 
-            // Base64 görseli decode et
+            // Görsel ayrı, sürümlü adresten yüklenir (önbelleğe alınabilir);
+            // base64 sadece include_image=1 istenirse gelir
+            final String? imgUrl = result['image_url'] as String?;
+
             Uint8List? imgBytes;
             if (result['image_base64'] != null &&
                 result['image_base64'].isNotEmpty) {
@@ -79,14 +83,15 @@ class _StudentResultDetailScreenState extends State<StudentResultDetailScreen>
               } catch (e) {
                 debugPrint('❌ Base64 decode hatası: $e');
               }
-            } else {
-              debugPrint('⚠️ Görsel base64 boş veya null');
+            } else if (imgUrl == null) {
+              debugPrint('⚠️ Görsel adresi yok');
             }
 
             if (mounted) {
               setState(() {
                 _resultData = result;
                 _imageBytes = imgBytes;
+                _imageUrl = imgUrl;
                 _loading = false;
               });
             }
@@ -226,6 +231,32 @@ class _StudentResultDetailScreenState extends State<StudentResultDetailScreen>
   }
 
   Widget _buildImageWidget() {
+    if (_imageUrl != null) {
+      return ClipRRect(
+        borderRadius: const BorderRadius.only(
+          bottomLeft: Radius.circular(16),
+          bottomRight: Radius.circular(16),
+        ),
+        child: InteractiveViewer(
+          minScale: 0.5,
+          maxScale: 4.0,
+          child: Image.network(
+            '${ApiConfig.baseUrl}$_imageUrl',
+            headers: AuthService.getAuthHeaders(),
+            fit: BoxFit.contain,
+            loadingBuilder: (context, child, progress) => progress == null
+                ? child
+                : const SizedBox(
+                    height: 200,
+                    child: Center(child: CircularProgressIndicator()),
+                  ),
+            errorBuilder: (context, error, stackTrace) =>
+                _buildImagePlaceholder(),
+          ),
+        ),
+      );
+    }
+
     if (_imageBytes != null) {
       return ClipRRect(
         borderRadius: const BorderRadius.only(
@@ -243,6 +274,10 @@ class _StudentResultDetailScreenState extends State<StudentResultDetailScreen>
       );
     }
 
+    return _buildImagePlaceholder();
+  }
+
+  Widget _buildImagePlaceholder() {
     return Container(
       height: 200,
       alignment: Alignment.center,